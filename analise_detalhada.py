@@ -0,0 +1,83 @@
+import streamlit as st
+import plotly.express as px
+import analitica
+from db_manager import get_db_manager
+from utils import selecionar_atleta, selecionar_competicao
+
+db_manager = get_db_manager()
+
+categorias = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+
+
+@st.cache_data(ttl=60, show_spinner="Carregando lutas...")
+def carregar_dados(atleta_id, campeonato_id, categoria, data_inicio, data_fim):
+    # Os DataFrames da seleção são reaproveitados entre as interações da página por até 60 segundos
+    return analitica.carregar_dados(
+        db_manager, atleta_id=atleta_id, campeonato_id=campeonato_id, categoria=categoria,
+        data_inicio=data_inicio, data_fim=data_fim
+    )
+
+
+st.header("Análise Detalhada")
+
+# ----- Filtros da seleção -----
+col_atleta, col_competicao, col_categoria, col_periodo = st.columns(4)
+with col_atleta:
+    atleta_selecionado = selecionar_atleta(db_manager)
+with col_competicao:
+    competicao_selecionada = selecionar_competicao(db_manager)
+with col_categoria:
+    categoria = st.selectbox("Categoria", options=categorias, index=None)
+with col_periodo:
+    periodo = st.date_input("Período", value=())
+
+data_inicio = periodo[0] if len(periodo) > 0 else None
+data_fim = periodo[1] if len(periodo) > 1 else None
+atleta_id = atleta_selecionado[0] if atleta_selecionado else None
+campeonato_id = competicao_selecionada[0] if competicao_selecionada else None
+
+dados = carregar_dados(atleta_id, campeonato_id, categoria, data_inicio, data_fim)
+
+if dados["confrontos"].empty:
+    st.write("Nenhuma luta encontrada para a seleção.")
+    st.stop()
+
+st.caption(f"{len(dados['confrontos'])} lutas, {len(dados['acoes'])} ações e {len(dados['shido'])} shidos na seleção.")
+
+# ----- Resumo por atleta -----
+resumo = analitica.resumo_atletas(dados["confrontos"], dados["acoes"], dados["shido"])
+nomes = db_manager.nomes_atletas(resumo.index.tolist())
+resumo.index = resumo.index.map(nomes)
+st.subheader("Resumo por atleta")
+st.dataframe(resumo, column_config={
+    "taxa_vitoria": st.column_config.ProgressColumn("Taxa de vitória", format="percent"),
+    "taxa_pontuacao": st.column_config.ProgressColumn("Taxa de pontuação", format="percent"),
+})
+
+if atleta_id is None:
+    st.info("Selecione um atleta para ver o perfil completo.")
+    st.stop()
+
+# ----- Perfil do atleta selecionado -----
+perfil = analitica.perfil_atleta(dados, atleta_id)
+st.subheader(f"Perfil de {atleta_selecionado[1]}")
+
+col_pegadas, col_quadrantes = st.columns(2)
+with col_pegadas:
+    st.write("Pegadas x efetividade do golpe")
+    st.dataframe(perfil["pegadas"])
+with col_quadrantes:
+    st.write("Grupo de golpe por quadrante")
+    if not perfil["quadrantes"].empty:
+        st.plotly_chart(px.imshow(perfil["quadrantes"], text_auto=True, aspect="auto"), use_container_width=True)
+
+col_direcao, col_partida, col_shidos = st.columns(3)
+with col_direcao:
+    st.write("Ne-waza por direção")
+    st.dataframe(perfil["newaza_direcao"])
+with col_partida:
+    st.write("Ne-waza por partida")
+    st.dataframe(perfil["newaza_partida"])
+with col_shidos:
+    st.write("Shidos por luta em cada minuto")
+    st.dataframe(perfil["shidos_tempo"])
@@ -1,51 +1,66 @@
 import streamlit as st
 import time
 from datetime import datetime
+import analitica
+import consultas_paralelas
+import entrada_rapida
+import instrumentacao
+import relogio_luta
+import vocabulario
 from db_manager import get_db_manager
+from diario_eventos import obter_sincronizador
+from geometria_tatame import DIRECOES_NEWAZA, LARGURA_TATAME, QUADRANTES
+from imagens import IMAGEM_TATAME, IMAGEM_TATAME_NEWAZA, carregar_imagem
 from streamlit_image_coordinates import streamlit_image_coordinates
+from utils import selecionar_atleta, selecionar_competicao
 
 
 
 db_manager = get_db_manager()
 
+# Diário local de ações e shidos: a marcação não espera a rede, um sincronizador envia os eventos ao banco
+sincronizador = obter_sincronizador()
+
+
+@st.fragment(run_every=2)
+def status_sincronizacao():
+    """Mostra quantos eventos aguardam envio, o atraso da sincronização e o último erro."""
+    status = sincronizador.status()
+    if status["pendentes"]:
+        st.caption(f"{status['pendentes']} evento(s) aguardando envio (atraso de {status['atraso']:.0f} s)")
+    else:
+        st.caption("Todos os eventos sincronizados")
+    if status["ultimo_erro"]:
+        st.caption(f"Sem conexão com o banco, nova tentativa em instantes: {status['ultimo_erro']}")
+    if status["rejeitados"]:
+        st.caption(f"{status['rejeitados']} evento(s) rejeitado(s) pelo banco")
+
+
 @st.dialog("Adicionar Luta")
 def adicionar_luta_dialog(**kwargs):
     st.header("Adicionar Luta - Análise Rápida")
     
-    # Selecione a Competição
-    competicoes = db_manager.listar_competicoes()
-    if not competicoes:
-        st.error("Nenhuma competição encontrada. Cadastre uma competição primeiro.")
-        return
-    # Cria um dicionário para mapear a exibição da competição com seu ID
-    dict_competicoes = { f"{comp[1]} - {comp[2]}": comp[0] for comp in competicoes }
-    comp_selecionada = st.selectbox("Selecione a Competição", options=list(dict_competicoes.keys()), index=None)
+    # Selecione a Competição (busca no servidor: só as competições encontradas vão para o navegador)
+    competicao = selecionar_competicao(db_manager, "Competição", key="luta_competicao")
 
-    # Seleção dos Atletas (Atleta 1 e Atleta 2)
-    atletas = db_manager.listar_todos_atletas()
-    if not atletas:
-        st.error("Nenhum atleta cadastrado.")
-        return
-    # Cria um dicionário onde a chave é o nome do atleta e o valor é seu ID
-    dict_atletas = {atleta[1]: atleta[0] for atleta in atletas}
-    atleta1 = st.selectbox("Selecione o Atleta 1", options=list(dict_atletas.keys()), index=None)
-    atleta2 = st.selectbox("Selecione o Atleta 2", options=list(dict_atletas.keys()), index=None)
-
-    # Seleção da Categoria
+    # Seleção da Categoria, que restringe a busca dos atletas
     categorias = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
     categoria = st.selectbox("Selecione a Categoria", options=categorias, index=None)
 
+    # Seleção dos Atletas (Atleta 1 e Atleta 2)
+    atleta1 = selecionar_atleta(db_manager, "Atleta 1", key="luta_atleta1", categoria=categoria)
+    atleta2 = selecionar_atleta(db_manager, "Atleta 2", key="luta_atleta2", categoria=categoria)
+
     # Botão para cadastrar a luta
     if st.button("Cadastrar Luta", key="adicionar_luta_dialog"):
         # Recupera os IDs com base nos seletores
-        comp_id = dict_competicoes.get(comp_selecionada)
-        atleta1_id = dict_atletas.get(atleta1)
-        atleta2_id = dict_atletas.get(atleta2)
+        comp_id = competicao[0] if competicao else None
+        atleta1_id = atleta1[0] if atleta1 else None
+        atleta2_id = atleta2[0] if atleta2 else None
         # Os campos "vencedor" e "tempo_luta" não são preenchidos no momento (tempo_luta definido como None)
         resultado = db_manager.adicionar_confronto(comp_id, atleta1_id, atleta2_id, categoria, None)
         if isinstance(resultado, str):
             st.error(resultado)
-            db_manager.rollback()
         else:
             st.success("Luta adicionada com sucesso!")
             time.sleep(1)
@@ -63,20 +78,18 @@ def finalizar_luta_dialog(finalizar_confronto_id: int = None):
         return
 
     try:
-        # Recupera os detalhes do confronto (categoria e IDs dos atletas)
-        sql = "SELECT categoria, atleta1_id, atleta2_id FROM confrontos WHERE id = %s"
-        db_manager.cursor.execute(sql, (confronto_id,))
-        resultado = db_manager.cursor.fetchone()
+        # Os detalhes do confronto (categoria, IDs e nomes dos atletas) já foram lidos com a luta em marcação;
+        # o banco só é consultado se o diálogo for aberto para outro confronto
+        luta = st.session_state.get("luta_marcacao")
+        if luta is not None and luta["confronto_id"] == confronto_id:
+            resultado = (luta["categoria"], luta["atletas"]["Atleta 1"], luta["nomes"]["Atleta 1"],
+                         luta["atletas"]["Atleta 2"], luta["nomes"]["Atleta 2"])
+        else:
+            resultado = db_manager.obter_confronto(confronto_id)
         if not resultado:
             st.error("Confronto não encontrado.")
             return
-        categoria, atleta1_id, atleta2_id = resultado
-
-        # Obtém os nomes dos atletas envolvidos
-        db_manager.cursor.execute("SELECT nome FROM atletas WHERE id = %s", (atleta1_id,))
-        atleta1_nome = db_manager.cursor.fetchone()[0]
-        db_manager.cursor.execute("SELECT nome FROM atletas WHERE id = %s", (atleta2_id,))
-        atleta2_nome = db_manager.cursor.fetchone()[0]
+        categoria, atleta1_id, atleta1_nome, atleta2_id, atleta2_nome = resultado
 
         # Exibe as informações do confronto para o usuário
         st.markdown(f"**Confronto:** {atleta1_nome} vs {atleta2_nome}")
@@ -86,50 +99,399 @@ def finalizar_luta_dialog(finalizar_confronto_id: int = None):
         vencedor_selecionado = st.radio("Selecione o Vencedor", options=[atleta1_nome, atleta2_nome])
 
         # Campo para o usuário informar o tempo total da luta (formato 'HH:MM:SS')
-        tempo_total = st.text_input("Tempo Total da Luta (HH:MM:SS)", value="00:00:00")
+        relogio = st.session_state.get("relogio_luta")
+        tempo_inicial = relogio.intervalo()[:8] if relogio and relogio.iniciado else "00:00:00"
+        tempo_total = st.text_input("Tempo Total da Luta (HH:MM:SS)", value=tempo_inicial)
 
         if st.button("Finalizar Luta", key="finalizar_luta_button"):
             # Determina o ID do vencedor com base na seleção realizada
             vencedor_id = atleta1_id if vencedor_selecionado == atleta1_nome else atleta2_id
 
-            # Atualiza os campos 'vencedor_id' e 'tempo_luta' na tabela 'confrontos'
-            sql_update = "UPDATE confrontos SET vencedor_id = %s, tempo_luta = %s WHERE id = %s"
-            db_manager.cursor.execute(sql_update, (vencedor_id, tempo_total, confronto_id))
-            db_manager.conn.commit()
+            # Envia os eventos ainda no diário antes de encerrar a luta; se a rede estiver fora,
+            # eles continuam no diário e são sincronizados depois
+            resultado = sincronizador.sincronizar()
+            if isinstance(resultado, str):
+                st.warning(f"Eventos pendentes serão enviados quando a conexão voltar: {resultado}")
 
-            st.success("Luta finalizada com sucesso!")
-            st.rerun()
+            # Atualiza os campos 'vencedor_id' e 'tempo_luta' na tabela 'confrontos'
+            resultado = db_manager.finalizar_confronto(confronto_id, vencedor_id, tempo_total)
+            if isinstance(resultado, str):
+                st.error(f"Erro ao finalizar a luta: {resultado}")
+            else:
+                st.success("Luta finalizada com sucesso!")
+                # Recarrega a luta e os perfis atualizados na próxima execução
+                st.session_state.pop("luta_marcacao", None)
+                st.rerun()
 
     except Exception as e:
         st.error(f"Erro ao finalizar a luta: {e}")
-        db_manager.rollback()
 
 
 
 
+# Tempo gravado para cada opção do seletor de tempo
+TEMPOS = {
+    "Minuto 0": "00:00:00",
+    "Minuto 1": "00:01:00",
+    "Minuto 2": "00:02:00",
+    "Minuto 3": "00:03:00",
+    "Golden Score": "00:04:00",
+}
+
+
+# Função para extrair somente o primeiro e o último nome
+def primeiro_e_ultimo_nome(nome_completo: str) -> str:
+    partes = nome_completo.split()
+    if len(partes) >= 2:
+        return partes[0] + " " + partes[-1]
+    return nome_completo
+
+
+@instrumentacao.cronometrar()
+def carregar_luta(confronto_id):
+    """
+    Retorna os dados da luta em marcação (atletas e perfis de scouting), guardados em st.session_state.
+    O banco só é consultado quando o confronto selecionado muda; as interações da marcação não fazem leituras.
+    """
+    luta = st.session_state.get("luta_marcacao")
+    if luta is None or luta["confronto_id"] != confronto_id:
+        resultado = db_manager.obter_confronto(confronto_id)
+        if not resultado:
+            return None
+        categoria, atleta1_id, atleta1_nome, atleta2_id, atleta2_nome = resultado
+        luta = {
+            "confronto_id": confronto_id,
+            "categoria": categoria,
+            "atletas": {"Atleta 1": atleta1_id, "Atleta 2": atleta2_id},
+            "nomes": {"Atleta 1": atleta1_nome, "Atleta 2": atleta2_nome},
+            # Os dois perfis são lidos em paralelo
+            "perfis": consultas_paralelas.reunir(**{
+                "Atleta 1": (db_manager.obter_perfil_atleta, atleta1_id),
+                "Atleta 2": (db_manager.obter_perfil_atleta, atleta2_id),
+            }),
+        }
+        st.session_state["luta_marcacao"] = luta
+        # Cliques da luta anterior não valem para a nova
+        st.session_state.pop("quadrante", None)
+        st.session_state.pop("direcao_newaza", None)
+        st.session_state.pop("relogio_luta", None)
+    return luta
+
+
+@instrumentacao.cronometrar()
+def exibir_scouting(luta):
+    """Perfis de scouting materializados dos dois atletas, lidos junto com a luta em `carregar_luta`."""
+    for coluna, posicao in zip(st.columns(2), ("Atleta 1", "Atleta 2")):
+        with coluna:
+            st.write(f"**{primeiro_e_ultimo_nome(luta['nomes'][posicao])}**")
+            perfil = luta["perfis"][posicao]
+            if perfil is None:
+                st.caption("Sem lutas registradas.")
+                continue
+            st.caption(f"{perfil.vitorias} vitórias em {perfil.lutas} lutas, {perfil.acoes} ações.")
+            tabelas = analitica.tabelas_perfil_materializado(perfil)
+            st.dataframe(tabelas["pegadas"].head(3), column_config={
+                "taxa": st.column_config.ProgressColumn("Pontuação", format="percent"),
+            })
+            st.dataframe(tabelas["grupos_golpe"], column_config={
+                "taxa": st.column_config.ProgressColumn("Pontuação", format="percent"),
+            })
+            st.write("Quadrantes:", tabelas["quadrantes"].to_dict())
+            st.write("Ne-waza (direção):", tabelas["newaza_direcao"]["total"].to_dict()
+                     if not tabelas["newaza_direcao"].empty else {})
+            st.write("Shidos:", tabelas["shidos_tipo"].to_dict())
+
+
+# A marcação é dividida em fragmentos: cada interação reexecuta apenas o próprio fragmento, e o estado
+# compartilhado (relógio, tempo, quadrante e direção) fica em st.session_state e é lido pelos formulários no envio.
+
+def obter_relogio():
+    return st.session_state.setdefault("relogio_luta", relogio_luta.RelogioLuta())
+
+
+@st.fragment
+@instrumentacao.cronometrar()
+def seletor_tempo():
+    relogio = obter_relogio()
+    col_relogio, col_hajime, col_matte, col_zerar = st.columns([3, 1, 1, 1], vertical_alignment="center")
+    # Os callbacks alteram o relógio antes da reexecução do fragmento, então os botões já aparecem atualizados
+    with col_hajime:
+        st.button("Hajime", key="relogio_hajime", on_click=relogio.hajime, disabled=relogio.rodando,
+                  use_container_width=True)
+    with col_matte:
+        st.button("Matte", key="relogio_matte", on_click=relogio.matte, disabled=not relogio.rodando,
+                  use_container_width=True)
+    with col_zerar:
+        st.button("Zerar", key="relogio_zerar", on_click=relogio.zerar, disabled=relogio.rodando,
+                  use_container_width=True)
+    with col_relogio:
+        relogio_luta.exibir(relogio)
+
+    # Sem o relógio, o tempo das ações vem das faixas de minuto
+    if not relogio.iniciado:
+        st.pills("Tempo", list(TEMPOS), key="selected_tempo_acao")
+
+
+def tempo_selecionado():
+    """Tempo da ação: o decorrido no relógio de luta, se ele foi iniciado, ou a faixa de minuto selecionada."""
+    relogio = obter_relogio()
+    if relogio.iniciado:
+        return relogio.intervalo()
+    return TEMPOS.get(st.session_state.get("selected_tempo_acao"))
+
+
+@st.fragment
+@instrumentacao.cronometrar()
+def tatame():
+    st.subheader(" ")
+    st.subheader(" ")
+    # Exibe a imagem e captura as coordenadas clicadas
+    coordinates = streamlit_image_coordinates(carregar_imagem(IMAGEM_TATAME, LARGURA_TATAME), key="local", width=LARGURA_TATAME)
+    if coordinates is not None:
+        try:
+            st.session_state["quadrante"] = QUADRANTES.localizar_clique(coordinates, LARGURA_TATAME)
+        except Exception as e:
+            st.error(f"Erro ao processar coordenadas: {e}")
+
+    #Mostrador tachi waza
+    st.write("Quadrante Tachi-Waza")
+    st.subheader(st.session_state.get("quadrante", "Não Definida"))
+
+    coordinates_newaza = streamlit_image_coordinates(carregar_imagem(IMAGEM_TATAME_NEWAZA, LARGURA_TATAME), key="local_newaza", width=LARGURA_TATAME)
+    if coordinates_newaza is not None:
+        try:
+            # O centro da imagem não corresponde a nenhuma direção
+            st.session_state["direcao_newaza"] = DIRECOES_NEWAZA.localizar_clique(coordinates_newaza, LARGURA_TATAME) or "Desconhecido"
+        except Exception as e:
+            st.error(f"Erro ao processar coordenadas newaza: {e}")
+
+    #Mostrador direção newaza
+    st.write("Direção Ne-Waza")
+    st.subheader(st.session_state.get("direcao_newaza", "Não definida"))
+
+
+def atleta_selecionado(luta, posicao, campo):
+    """
+    ID do atleta da luta na `posicao` escolhida ("Atleta 1" ou "Atleta 2") para o `campo` obrigatório.
+    Sem seleção, mostra o erro e retorna None: o evento não deve ir para o diário sem o atleta.
+    """
+    atleta_id = luta["atletas"].get(posicao)
+    if atleta_id is None:
+        st.error(f"Selecione {campo}.")
+    return atleta_id
+
+
+@st.fragment
+@instrumentacao.cronometrar()
+def formulario_entrada_rapida(luta):
+    """Registra uma ação inteira digitada como sequência de teclas (ver entrada_rapida) com um único envio."""
+    # Últimas pegadas de cada atleta, lembradas entre as lutas da sessão
+    memoria_pegadas = st.session_state.setdefault("ultimas_pegadas", {})
+
+    with st.form("forms_entrada_rapida", clear_on_submit=True):
+        sequencia = st.text_input(
+            "Entrada rápida",
+            placeholder="1 G M A W q3",
+            help="autor, pegadas (opcionais), grupo, efetividade e, opcionalmente, q<quadrante> t<minuto> "
+                 "n<atleta do ne-waza> d<direção> p<partida> e<efetividade>. Enter registra a ação.",
+        )
+        enviar_form = st.form_submit_button("Registrar")
+
+    with st.expander("Códigos da entrada rápida"):
+        for titulo, tabela in (
+            ("Pegadas", entrada_rapida.PEGADAS), ("Grupo do golpe", entrada_rapida.GRUPOS_GOLPE),
+            ("Efetividade", entrada_rapida.EFETIVIDADES_GOLPE), ("Partida ne-waza (p)", entrada_rapida.PARTIDAS_NEWAZA),
+            ("Efetividade ne-waza (e)", entrada_rapida.EFETIVIDADES_NEWAZA),
+        ):
+            st.caption(f"**{titulo}:** " + ", ".join(f"{codigo} = {nome}" for codigo, nome in tabela.items()))
+
+    if enviar_form and sequencia:
+        ultimas_pegadas = {
+            autor: memoria_pegadas.get(atleta_id, (None, None)) for autor, atleta_id in luta["atletas"].items()
+        }
+        try:
+            acao = entrada_rapida.interpretar(sequencia, ultimas_pegadas)
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        atleta_id = atleta_selecionado(luta, acao.autor, "o autor da ação")
+        atleta_id_nw = atleta_selecionado(luta, acao.autor_newaza, "quem fez o ne-waza") if acao.newaza else None
+        if atleta_id is None or (acao.newaza and atleta_id_nw is None):
+            return
+        memoria_pegadas[atleta_id] = (acao.mao_direita, acao.mao_esquerda)
+        quadrante = acao.quadrante or st.session_state.get("quadrante")
+
+        # Mesmo caminho do formulário completo: diário local, gravação em "acoes" em segundo plano
+        sincronizador.diario.registrar("acao", dict(
+            confronto_id=luta["confronto_id"],
+            atleta_id=atleta_id,
+            quadrante=quadrante if isinstance(quadrante, int) else None,
+            grupo_golpe=acao.grupo_golpe,
+            tempo_ocorrido=acao.tempo or tempo_selecionado(),
+            mao_direita=acao.mao_direita,
+            mao_esquerda=acao.mao_esquerda,
+            efetividade_golpe=acao.efetividade_golpe,
+            newaza=acao.newaza,
+            atleta_id_nw=atleta_id_nw,
+            direcao=acao.direcao,
+            partida=acao.partida,
+            efetividade_newaza=acao.efetividade_newaza,
+        ))
+        st.toast(f"Ação registrada: {entrada_rapida.descrever(acao)}")
+
+
+@st.fragment
+@instrumentacao.cronometrar()
+def formulario_evento(luta):
+    with st.form("forms_evento", clear_on_submit=True):
+        col_1, col_2, col_3 = st.columns(3)
+
+        with col_1:
+            st.write("Adicionar Evento")
+
+            # Seleciona o atleta que executou a ação
+            autor = st.pills(
+                "Selecione o autor da ação",
+                ["Atleta 1", "Atleta 2"]
+            )
+
+        with col_2:
+            # Seleção da Mão
+            mao_direita = st.selectbox("Mão Direita", vocabulario.PEGADAS, index=None)
+            mao_esquerda = st.selectbox("Mão Esquerda", vocabulario.PEGADAS, index=None)
+
+        with col_3:
+            # Grupo do golpe e efetividade do golpe
+            grupo_golpe = st.pills(
+                "Selecione o grupo do golpe",
+                vocabulario.GRUPOS_GOLPE
+            )
+
+            efetividade_golpe = st.pills(
+                "Selecione a efetividade do golpe",
+                vocabulario.EFETIVIDADES_GOLPE
+            )
+
+        st.markdown("----")
+
+        col1_ , col2_, col3_ = st.columns(3)
+
+        # Dados para a passagem (caso haja passagem, ou newaza)
+        with col1_:
+            newaza = st.toggle(" ", key="newaza_toggle")
+
+            id_newaza = st.pills(
+                "Selecione quem fez o ne-waza",
+                ["Atleta 1", "Atleta 2"]
+            )
+
+        with col2_:
+            partida = st.pills(
+                "Selecione de onde partiu a passagem",
+                vocabulario.PARTIDAS_NEWAZA
+            )
+
+        with col3_:
+            efetividade_newaza = st.pills(
+                "Selecione a efetividade da passagem",
+                vocabulario.EFETIVIDADES_NEWAZA
+            )
+
+        enviar_form = st.form_submit_button("Enviar")
+
+    if enviar_form:
+        atleta_id = atleta_selecionado(luta, autor, "o autor da ação")
+        if atleta_id is None:
+            return
+        quadrante = st.session_state.get("quadrante")
+        if newaza:
+            # Ne-waza: atleta, direção (clique na imagem), partida e efetividade da passagem
+            atleta_id_nw = atleta_selecionado(luta, id_newaza, "quem fez o ne-waza")
+            if atleta_id_nw is None:
+                return
+            direcao_newaza = st.session_state.get("direcao_newaza")
+            # Clique no centro do tatame ("Desconhecido") não é uma direção do vocabulário
+            if direcao_newaza not in vocabulario.DIRECOES_NEWAZA:
+                direcao_newaza = None
+        else:
+            # Se o toggle não estiver ativo, define como None
+            atleta_id_nw = direcao_newaza = partida = efetividade_newaza = None
+
+        # Registra a ação no diário local; a gravação na tabela "acoes" é feita em segundo plano
+        sincronizador.diario.registrar("acao", dict(
+            confronto_id=luta["confronto_id"],          # id do confronto selecionado
+            atleta_id=atleta_id,                        # atleta que realizou a ação
+            quadrante=quadrante if isinstance(quadrante, int) else None,  # quadrante obtido a partir da imagem (None se não clicado)
+            grupo_golpe=grupo_golpe,                    # grupo do golpe
+            tempo_ocorrido=tempo_selecionado(),         # tempo do seletor de tempo
+            mao_direita=mao_direita,                    # mão direita
+            mao_esquerda=mao_esquerda,                  # mão esquerda
+            efetividade_golpe=efetividade_golpe,        # efetividade do golpe
+            newaza=newaza,                              # valor booleano se é newaza
+            atleta_id_nw=atleta_id_nw,                  # ID do atleta relacionado à newaza (None se toggle não ativado)
+            direcao=direcao_newaza,                     # direção da ação em newaza (None se toggle não ativado)
+            partida=partida,                            # posição de partida da ação (None se toggle não ativado)
+            efetividade_newaza=efetividade_newaza       # efetividade da passagem (None se toggle não ativado)
+        ))
+        st.toast("Ação registrada!")
+        # As pegadas marcadas aqui também valem como as últimas do atleta na entrada rápida
+        if mao_direita or mao_esquerda:
+            st.session_state.setdefault("ultimas_pegadas", {})[atleta_id] = (mao_direita, mao_esquerda)
+
+
+@st.fragment
+@instrumentacao.cronometrar()
+def formulario_shido(luta):
+    with st.form("forms_shido", clear_on_submit=True):
+        st.write("Adicionar Shido")
+
+        # Seleciona quem recebeu shido
+        atleta_recebeu_shido = st.pills(
+            "Selecione quem recebeu shido",
+            ["Atleta 1", "Atleta 2"]
+        )
+
+        # Seleção do tipo de shido
+        tipo_shido = st.selectbox(
+            "Selecione o shido",
+            vocabulario.TIPOS_SHIDO,
+            index=None
+        )
+
+        # Botão para enviar as informações do shido
+        enviar_form = st.form_submit_button("Enviar")
+
+    if enviar_form:
+        atleta_id = atleta_selecionado(luta, atleta_recebeu_shido, "quem recebeu o shido")
+        if atleta_id is None:
+            return
+        try:
+            # Registra o shido no diário local; a gravação na tabela "shido" é feita em segundo plano
+            sincronizador.diario.registrar("shido", dict(
+                confronto_id=luta["confronto_id"],                  # id do confronto selecionado
+                atleta_id=atleta_id,                                # atleta que recebeu shido
+                tipo=tipo_shido,                                    # tipo de shido selecionado
+                tempo=tempo_selecionado()                           # tempo do seletor de tempo
+            ))
+            st.toast("Shido registrado!")
+
+        except Exception as e:
+            st.error(f"Erro ao adicionar shido: {e}")
+
+
 st.header("Análise Rápida")
 
 tab1, tab2, tab3 = st.tabs(["Treino", "Competição", "Visualização"])
 with tab2:
-    # Carrega os atletas no escopo da aba "Treino"
-    atletas = db_manager.listar_todos_atletas()
-    if not atletas:
-        st.error("Nenhum atleta cadastrado.")
-    else:
-        dict_atletas = {atleta[1]: atleta[0] for atleta in atletas}
-
     if st.button("Adicionar Luta", key="botao_adicionar_luta"):
         adicionar_luta_dialog()
 
     # Primeiro, selecione a competição
-    competicoes = db_manager.listar_competicoes()
-    if not competicoes:
-        st.error("Nenhuma competição cadastrada.")
-    else:
-        dict_competicoes = { f"{comp[1]} - {comp[2]}": comp[0] for comp in competicoes }
-        competicao_selecionada = st.selectbox("Selecione a Competição para análise", options=list(dict_competicoes.keys()), index=None)
-        comp_id = dict_competicoes.get(competicao_selecionada)
-        
+    competicao_selecionada = selecionar_competicao(db_manager, "Competição para análise", key="competicao_analise")
+    if competicao_selecionada:
+        comp_id = competicao_selecionada[0]
+
         # Agora, listamos os confrontos para a competição selecionada
         confrontos = db_manager.listar_lutas_por_competicao(comp_id)
         if not confrontos:
@@ -148,308 +510,55 @@ with tab2:
                 # Recupera e armazena o ID do confronto selecionado na session_state
                 confronto_id = dict_confrontos.get(confronto_selecionado)
                 st.session_state["confronto_id"] = confronto_id
-                
-                # Inicializa a variável para evitar NameError
-                confronto_escolhido = None
-                # Encontra o registro de confronto que corresponda ao ID selecionado
-                # Considere que os registros em confrontos estão no formato:
-                # (id, atleta1, atleta2, categoria, tempo_luta)
-                confronto_escolhido = next((luta for luta in confrontos if luta[0] == confronto_id), None)
-                
-                # Agora verifica se o registro foi encontrado
-                if confronto_escolhido:
-                    # Desempacota os valores do registro
-                    confronto_id, categoria, atleta1, atleta2, vencedor, tempo_luta = confronto_escolhido
-
-                    # Função para extrair somente o primeiro e o último nome
-                    def primeiro_e_ultimo_nome(nome_completo: str) -> str:
-                        partes = nome_completo.split()
-                        if len(partes) >= 2:
-                            return partes[0] + " " + partes[-1]
-                        return nome_completo
-
-                    atleta1_formatado = primeiro_e_ultimo_nome(atleta1)
-                    atleta2_formatado = primeiro_e_ultimo_nome(atleta2)
+                luta = carregar_luta(confronto_id)
+
+                if luta:
+                    atleta1_formatado = primeiro_e_ultimo_nome(luta["nomes"]["Atleta 1"])
+                    atleta2_formatado = primeiro_e_ultimo_nome(luta["nomes"]["Atleta 2"])
                     st.markdown(f'<h3 style="text-align: center;">{atleta1_formatado} vs {atleta2_formatado}</h3>', unsafe_allow_html=True)
 
+                    # Perfis de scouting materializados dos dois atletas
+                    with st.expander("Scouting dos atletas"):
+                        exibir_scouting(luta)
+
                     left_div, right_div = st.columns([6, 2])
 
+                    with right_div:
+                        tatame()
+
+                        if st.button("Finalizar Luta", key="botao_finalizar_luta"):
+                            finalizar_luta_dialog()
+
+                        status_sincronizacao()
+
                     with left_div:
+                        seletor_tempo()
+                        formulario_entrada_rapida(luta)
+                        formulario_evento(luta)
+                        formulario_shido(luta)
 
-                        seletor_tempo = st.pills(
-                        "Tempo", 
-                        ['Minuto 3','Minuto 2','Minuto 1','Minuto 0', "Golden Score"], 
-                        key="selected_tempo_acao"
-                    )
-                        
-                        if seletor_tempo == "Minuto 0":
-                            tempo = "00:00:00"
-                        elif seletor_tempo == "Minuto 1":
-                            tempo = "00:01:00"
-                        elif seletor_tempo == "Minuto 2":
-                            tempo = "00:02:00"
-                        elif seletor_tempo == "Minuto 3":
-                            tempo = "00:03:00"
-                        elif seletor_tempo == "Golden Score":
-                            tempo = "00:04:00"
-
-
-
-
-                        with st.container():
-                            
-
-                            with right_div:
-                                st.subheader(" ")
-                                st.subheader(" ")
-                                # Exibe a imagem e captura as coordenadas clicadas
-                                coordinates = streamlit_image_coordinates("assets/tatame.png", key="local", width=250)
-
-                                quadrante = "Não Definida"  # Inicializa a variável
-
-                                if coordinates is not None and "x" in coordinates and "y" in coordinates:
-                                    try:
-                                        x = float(coordinates["x"])
-                                        y = float(coordinates["y"])
-                                        if 0 < x < 125 and 0 < y < 125:
-                                            quadrante = 1
-                                        elif 125 < x < 250 and 0 < y < 125:
-                                            quadrante = 2
-                                        elif 0 < x < 125 and 125 < y < 250:
-                                            quadrante = 3
-                                        elif 125 < x < 250 and 125 < y < 250:
-                                            quadrante = 4
-                                        else:
-                                            quadrante = "Desconhecido"
-                                    except Exception as e:
-                                        st.error(f"Erro ao processar coordenadas: {e}")
-
-
-                                st.subheader(" ")
-                                coordinates_newaza = streamlit_image_coordinates("assets/tatame_newaza.png", key="local_newaza", width=250)
-
-                                # Calcula a direção com base nas coordenadas da imagem newaza
-                                direcao_newaza = "Não definida"
-                                if coordinates_newaza is not None and "x" in coordinates_newaza and "y" in coordinates_newaza:
-                                    try:
-                                        x = float(coordinates_newaza["x"])
-                                        y = float(coordinates_newaza["y"])
-                                        if 0 < x < 83.33 and 0 < y < 83.33:
-                                            direcao_newaza = "DEF"
-                                        elif 83.33 < x < 166.66 and 0 < y < 83.33:
-                                            direcao_newaza = "F"
-                                        elif 166.66 < x < 250 and 0 < y < 83.33:
-                                            direcao_newaza = "DDF"
-                                        elif 0 < x < 83.33 and 83.33 < y < 166.66:
-                                            direcao_newaza = "LE"
-                                        elif 166.66 < x < 250 and 83.33 < y < 166.66:
-                                            direcao_newaza = "LD"
-                                        elif 0 < x < 83.33 and 166.66 < y < 250:
-                                            direcao_newaza = "DET"
-                                        elif 83.33 < x < 166.66 and 166.66 < y < 250:
-                                            direcao_newaza = "T"
-                                        elif 166.66 < x < 250 and 166.66 < y < 250:
-                                            direcao_newaza = "DDT"
-                                        else:
-                                            direcao_newaza = "Desconhecido"
-                                    except Exception as e:
-                                        st.error(f"Erro ao processar coordenadas newaza: {e}")
-
-
-                                if st.button("Finalizar Luta", key="botao_finalizar_luta"):
-                                    finalizar_luta_dialog()
-
-                            with left_div:
-
-                                with st.form("forms_evento", clear_on_submit=True):
-                                    col_1, col_2, col_3 = st.columns(3)
-                                    
-                                    with col_1:
-                                        st.write("Adicionar Evento")
-
-                                        # Seleciona o atleta que executou a ação
-                                        autor = st.pills(
-                                            "Selecione o autor da ação",
-                                            ["Atleta 1", "Atleta 2"]
-                                        )
-
-                                        #Mostrador tachi waza
-                                        st.write("Quadrante Tachi-Waza")
-                                        st.subheader(quadrante)
-                                   
-                                    with col_2:
-                                        # Seleção da Mão
-                                        mao_direita = st.selectbox(
-                                            "Mão Direita",
-                                            ("Uma Mão (Gola)", "Gola", "Gola Cruzada", "Gola Alta", "Patolada", "Patolada Cruzada", "Arm Drag", "Uma Mão (Manga)", "Manga", "Manga Cruzada", "Cava", "Faixa"),
-                                            index=None
-                                        )
-
-                                        mao_esquerda = st.selectbox(
-                                            "Mão Esquerda",
-                                            ("Uma Mão (Gola)", "Gola", "Gola Cruzada", "Gola Alta", "Patolada", "Patolada Cruzada", "Arm Drag", "Uma Mão (Manga)", "Manga", "Manga Cruzada", "Cava", "Faixa"),
-                                            index=None
-                                        )
-                                    
-                                    with col_3:
-                                        # Grupo do golpe e efetividade do golpe
-                                        grupo_golpe = st.pills(
-                                            "Selecione o grupo do golpe",
-                                            ["Te-Waza", "Ashi-Waza", "Koshi-Waza", "Sutemi-Waza", "Yoko-Sutemi-waza", "Kaeshi Waza"]
-                                        )
-
-                                        efetividade_golpe = st.pills(
-                                            "Selecione a efetividade do golpe",
-                                            ["Yuko", "Waza-Ari", "Ippon", "Golpe Falho", "Golpe Falso", "Irrelevante", "Sofreu contra-golpe"]
-                                        )   
-
-                                    st.markdown("----")
-                                    
-                                    col1_ , col2_, col3_ = st.columns(3)
-
-                                    # Dados para a passagem (caso haja passagem, ou newaza)
-                                    with col1_:
-                                        newaza = False
-                                        st.toggle(" ", key="newaza_toggle")
-                                        if st.session_state.get("newaza_toggle"):
-                                            newaza = True
-
-                                        id_newaza = st.pills(
-                                            "Selecione quem fez o ne-waza",
-                                            ["Atleta 1", "Atleta 2"]
-                                        )
-
-                                        #Mostrador direção newaza
-                                        st.write("Direção Ne-Waza")
-                                        st.subheader(direcao_newaza)
-
-                                    with col2_:
-                                        partida = st.pills(
-                                            "Selecione de onde partiu a passagem",
-                                            ["Cabeça", "Costas", "Lateral", "Meia-Guarda", "Guarda", "Oportunista"]
-                                        )           
-
-                                    with col3_:
-                                        efetividade_newaza = st.pills(
-                                            "Selecione a efetividade da passagem",
-                                            ["Yuko", "Waza-Ari", "Ippon", "Nada", "Sofreu Contra-Ataque"]
-                                        )
-                                    
-                                    
-
-                                    enviar_form = st.form_submit_button("Enviar")
-
-                                    if enviar_form:
-                                        # Seleciona o id do atleta com base no valor do autor
-                                        if autor == "Atleta 1":
-                                            action_atleta_id = dict_atletas.get(atleta1)
-                                        else:
-                                            action_atleta_id = dict_atletas.get(atleta2)
-                                
-                                        # Aqui, assumimos que o tempo_ocorrido foi definido anteriormente conforme o seletor de tempo
-                                        tempo_ocorrido = tempo
-                                
-                                        # Captura o ID do atleta_id_nw com base na seleção do seletor id_newaza
-                                        if st.session_state.get("newaza_toggle"):
-                                            # Se o toggle estiver ativo, capturamos o ID do atleta que fez o ne-waza
-                                            if id_newaza == "Atleta 1":
-                                                atleta_id_nw = dict_atletas.get(atleta1)
-                                            else:
-                                                atleta_id_nw = dict_atletas.get(atleta2)
-                                
-                                            # Captura as informações relacionadas ao ne-waza
-                                            direcao_newaza = direcao_newaza  # Isso ainda mantém o valor escolhido baseado na imagem
-                                            partida = partida                  # Mantém o valor escolhido
-                                            efetividade_newaza = efetividade_newaza  # Mantém o valor escolhido
-                                        else:
-                                            # Se o toggle não estiver ativo, define como None
-                                            atleta_id_nw = None
-                                            direcao_newaza = None
-                                            partida = None
-                                            efetividade_newaza = None
-                                
-                                        # Agora, chama o método que adiciona a ação na tabela "acoes"
-                                        resultado = db_manager.adicionar_acao(
-                                            confronto_id,          # id do confronto selecionado
-                                            action_atleta_id,      # atleta que realizou a ação
-                                            quadrante,             # quadrante obtido a partir da imagem
-                                            grupo_golpe,           # grupo do golpe
-                                            tempo_ocorrido,        # tempo ocorrido
-                                            mao_direita,           # mão direita
-                                            mao_esquerda,          # mão esquerda
-                                            efetividade_golpe,     # efetividade do golpe
-                                            newaza,                # valor booleano se é newaza
-                                            atleta_id_nw,          # ID do atleta relacionado à newaza (None se toggle não ativado)
-                                            direcao_newaza,        # direção da ação em newaza (None se toggle não ativado)
-                                            partida,               # posição de partida da ação (None se toggle não ativado)
-                                            efetividade_newaza     # efetividade da passagem (None se toggle não ativado)
-                                        )
-                                
-                                        if isinstance(resultado, str):
-                                            st.error(resultado)
-                                            db_manager.rollback()
-                                        else:
-                                            st.success("Ação cadastrada com sucesso!")
-                                            time.sleep(1)
-                                            st.rerun()
-
-
-                        
-                        # Adicionando o formulário para Shido
-                        with st.form("forms_shido", clear_on_submit=True):
-                            st.write("Adicionar Shido")
-
-                            # Seleciona quem recebeu shido
-                            atleta_recebeu_shido = st.pills(
-                                "Selecione quem recebeu shido",
-                                ["Atleta 1", "Atleta 2"]
-                            )
-
-                            # Seleção do tipo de shido
-                            tipo_shido = st.selectbox(
-                                "Selecione o shido",
-                                ["Golpe Falso", "Falta de Combatividade", "Desligar Kumi-Kata", "Kumi-Kata Irregular", "Pegar na Perna", "Judô Negativo", "Passou a Cabeça", "Evitar Kumi-Kata"],
-                                index=None
-                            )
-
-                            # Botão para enviar as informações do shido
-                            enviar_form = st.form_submit_button("Enviar")
-
-                            if enviar_form:
-                                try:
-                                    # Determina qual atleta recebeu shido e captura o ID
-                                    atleta_id = ""
-                                    if atleta_recebeu_shido == "Atleta 1":
-                                        atleta_id = dict_atletas.get(atleta1)  # atleta1 já está definido anteriormente
-                                    else:
-                                        atleta_id = dict_atletas.get(atleta2)  # atleta2 já está definido anteriormente
-
-                                    # Chama o método que adiciona a shido na tabela "shido"
-                                    resultado = db_manager.adicionar_shido(
-                                        confronto_id,  # id do confronto selecionado
-                                        atleta_id,     # atleta que recebeu shido
-                                        tipo_shido,    # tipo de shido selecionado
-                                        tempo          # valor do tempo obtido anteriormente
-                                    )
-
-                                    if isinstance(resultado, str):
-                                        st.error(resultado)
-                                        db_manager.rollback()
-                                    else:
-                                        st.success("Shido cadastrado com sucesso!")
-                                        time.sleep(1)
-                                        st.rerun()
-                                        
-                                except Exception as e:
-                                    st.error(f"Erro ao adicionar shido: {e}")
-                                    db_manager.rollback() 
-                            
 
 with tab1:
     st.subheader("Análise Treino")  
 
 with tab3:
-    st.subheader("Visualização")  
+    st.subheader("Visualização")
+    confronto_visualizado = st.session_state.get("confronto_id")
+    if not confronto_visualizado:
+        st.write("Selecione um confronto na aba Competição.")
+    else:
+        dados = analitica.carregar_dados(db_manager, confronto_id=confronto_visualizado)
+        # Os nomes dos dois atletas já foram lidos com a luta em marcação
+        luta = carregar_luta(confronto_visualizado)
+        nomes = {luta["atletas"][posicao]: nome for posicao, nome in luta["nomes"].items()} if luta else {}
+        if dados["acoes"].empty:
+            st.write("Nenhuma ação sincronizada para este confronto.")
+        else:
+            resumo = analitica.resumo_atletas(dados["confrontos"], dados["acoes"], dados["shido"])
+            resumo.index = resumo.index.map(nomes)
+            st.dataframe(resumo)
+            st.write("Grupo de golpe por quadrante")
+            st.dataframe(analitica.grupos_por_quadrante(dados["acoes"]))  
 
 
 
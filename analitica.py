@@ -0,0 +1,140 @@
+"""
+Motor de análise das lutas marcadas.
+
+Os dados de uma seleção (atleta, competição, categoria, período) são carregados de uma vez em DataFrames
+colunares (`carregar_dados`), e todos os perfis são calculados com agrupamentos vetorizados do pandas,
+sem laços em Python por linha. As colunas de vocabulário (pegadas, grupos, efetividades etc.) são carregadas
+como `Categorical` com as categorias de `vocabulario`, na mesma ordem das listas de opções.
+"""
+import numpy as np
+import pandas as pd
+
+from vocabulario import EFETIVIDADES_PONTUADAS, VOCABULARIO_COLUNAS
+
+
+def carregar_dados(db_manager, **filtros):
+    """
+    Carrega confrontos, ações e shidos da seleção (ver `DBManager.carregar_dados_analise`) em DataFrames.
+    Retorna um dicionário {"confrontos", "acoes", "shido"} com DataFrames (vazios em caso de erro).
+    """
+    resultado = db_manager.carregar_dados_analise(**filtros)
+    if resultado is None:
+        return {"confrontos": pd.DataFrame(), "acoes": pd.DataFrame(), "shido": pd.DataFrame()}
+    dados = {nome: pd.DataFrame.from_records(linhas, columns=colunas) for nome, (colunas, linhas) in resultado.items()}
+    for nome, coluna in (("acoes", "tempo_ocorrido"), ("shido", "tempo"), ("confrontos", "tempo_luta")):
+        dados[nome][coluna] = pd.to_timedelta(dados[nome][coluna])
+    for nome in ("acoes", "shido"):
+        categorizar(dados[nome])
+    return dados
+
+
+def categorizar(df):
+    """Converte (no próprio DataFrame) as colunas de vocabulário presentes em `df` para Categorical."""
+    for coluna, categorias in VOCABULARIO_COLUNAS.items():
+        if coluna in df:
+            df[coluna] = pd.Categorical(df[coluna], categories=categorias)
+    return df
+
+
+def pegadas_por_efetividade(acoes, atleta_id=None):
+    """
+    Combinações de pegada (mão direita, mão esquerda) contra a efetividade do golpe.
+    Retorna uma tabela com uma linha por combinação, uma coluna por efetividade, o total e a taxa de pontuação.
+    """
+    acoes = _filtrar_atleta(acoes, "atleta_id", atleta_id)
+    tabela = (
+        acoes.groupby(["mao_direita", "mao_esquerda", "efetividade_golpe"], observed=True)
+        .size()
+        .unstack("efetividade_golpe", fill_value=0)
+    )
+    tabela.columns = list(tabela.columns)
+    tabela["total"] = tabela.sum(axis=1)
+    pontuadas = tabela.columns.intersection(EFETIVIDADES_PONTUADAS)
+    tabela["taxa_pontuacao"] = tabela[pontuadas].sum(axis=1) / tabela["total"]
+    return tabela.sort_values("total", ascending=False)
+
+
+def grupos_por_quadrante(acoes, atleta_id=None):
+    """Contagem de ações por grupo de golpe (linhas) e quadrante do tatame (colunas)."""
+    acoes = _filtrar_atleta(acoes, "atleta_id", atleta_id)
+    return pd.crosstab(acoes["grupo_golpe"], acoes["quadrante"])
+
+
+def sucesso_newaza(acoes, por="direcao", atleta_id=None):
+    """
+    Taxa de sucesso das passagens de ne-waza agrupadas por `direcao` ou `partida`.
+    Considera sucesso as passagens que pontuaram (Yuko, Waza-Ari, Ippon).
+    Retorna uma tabela com tentativas, sucessos e taxa_sucesso.
+    """
+    newaza = acoes[acoes["newaza"].fillna(False).astype(bool)]
+    newaza = _filtrar_atleta(newaza, "atleta_id_nw", atleta_id)
+    sucesso = newaza["efetividade_newaza"].isin(EFETIVIDADES_PONTUADAS)
+    tabela = sucesso.groupby(newaza[por], observed=True).agg(tentativas="size", sucessos="sum")
+    tabela["taxa_sucesso"] = tabela["sucessos"] / tabela["tentativas"]
+    return tabela.sort_values("tentativas", ascending=False)
+
+
+def shidos_por_tempo(shido, confrontos, tamanho_faixa=60, atleta_id=None):
+    """
+    Média de shidos por luta em cada faixa de tempo de `tamanho_faixa` segundos.
+    Retorna uma tabela com uma linha por atleta e uma coluna por faixa (início da faixa em segundos).
+    """
+    shido = _filtrar_atleta(shido, "atleta_id", atleta_id)
+    faixa = (shido["tempo"].dt.total_seconds() // tamanho_faixa * tamanho_faixa).astype("Int64")
+    contagem = shido.groupby([shido["atleta_id"], faixa.rename("faixa")]).size().unstack("faixa", fill_value=0)
+
+    # Lutas por atleta, contando as duas posições do confronto
+    lutas = pd.concat([confrontos["atleta1_id"], confrontos["atleta2_id"]]).value_counts()
+    return contagem.div(lutas.reindex(contagem.index).to_numpy(), axis=0)
+
+
+def resumo_atletas(confrontos, acoes, shido):
+    """
+    Indicadores por atleta da seleção: lutas, vitórias, taxa de vitória, ações, taxa de pontuação e shidos por luta.
+    """
+    participacoes = pd.concat([confrontos["atleta1_id"], confrontos["atleta2_id"]])
+    resumo = pd.DataFrame({"lutas": participacoes.value_counts()})
+    resumo["vitorias"] = confrontos["vencedor_id"].value_counts().reindex(resumo.index, fill_value=0)
+    resumo["taxa_vitoria"] = resumo["vitorias"] / resumo["lutas"]
+
+    pontuou = acoes["efetividade_golpe"].isin(EFETIVIDADES_PONTUADAS)
+    por_atleta = pontuou.groupby(acoes["atleta_id"]).agg(acoes="size", pontuadas="sum")
+    resumo = resumo.join(por_atleta, how="left").fillna({"acoes": 0, "pontuadas": 0})
+    resumo["taxa_pontuacao"] = (resumo["pontuadas"] / resumo["acoes"].replace(0, np.nan)).fillna(0.0)
+    resumo["shidos_por_luta"] = shido["atleta_id"].value_counts().reindex(resumo.index, fill_value=0) / resumo["lutas"]
+    return resumo.sort_values("lutas", ascending=False)
+
+
+def perfil_atleta(dados, atleta_id):
+    """Reúne todas as tabelas de perfil de um atleta a partir dos DataFrames de `carregar_dados`."""
+    acoes, shido, confrontos = dados["acoes"], dados["shido"], dados["confrontos"]
+    return {
+        "pegadas": pegadas_por_efetividade(acoes, atleta_id),
+        "quadrantes": grupos_por_quadrante(acoes, atleta_id),
+        "newaza_direcao": sucesso_newaza(acoes, "direcao", atleta_id),
+        "newaza_partida": sucesso_newaza(acoes, "partida", atleta_id),
+        "shidos_tempo": shidos_por_tempo(shido, confrontos, atleta_id=atleta_id),
+    }
+
+
+def tabelas_perfil_materializado(perfil):
+    """
+    Converte um PerfilAtleta (perfil materializado lido por `DBManager.obter_perfil_atleta`) em tabelas
+    ordenadas da maior para a menor frequência: pegadas, grupos_golpe, quadrantes, newaza_direcao,
+    newaza_partida, shidos_tipo e shidos_minuto.
+    """
+    tabelas = {}
+    for nome in ("pegadas", "grupos_golpe", "newaza_direcao", "newaza_partida"):
+        tabela = pd.DataFrame.from_dict(getattr(perfil, nome), orient="index")
+        if not tabela.empty:
+            acertos = "pontuadas" if "pontuadas" in tabela else "sucessos"
+            tabela["taxa"] = tabela[acertos] / tabela["total"]
+            tabela = tabela.sort_values("total", ascending=False)
+        tabelas[nome] = tabela
+    for nome in ("quadrantes", "shidos_tipo", "shidos_minuto"):
+        tabelas[nome] = pd.Series(getattr(perfil, nome), name="total", dtype="int64").sort_values(ascending=False)
+    return tabelas
+
+
+def _filtrar_atleta(df, coluna, atleta_id):
+    return df if atleta_id is None else df[df[coluna] == atleta_id]
@@ -1,14 +1,15 @@
+import uuid
 import streamlit as st
-from db_manager import DBManager, get_db_manager
+import diagnostico
+import imagens
+import instrumentacao
+from db_manager import get_db_manager
+from diario_eventos import obter_sincronizador
+from migracoes import garantir_esquema_uma_vez
 
 # Configuração da página
 st.set_page_config(page_title="Análise Judô", layout="wide")
 
-# Inicialização do banco de dados
-db_manager = get_db_manager()
-db_manager.criar_tabelas()
-
-
 # Definição das páginas
 home_page = st.Page("home.py", title= "Home")
 atletas_page = st.Page("atletas.py", title="Atletas")
@@ -18,4 +19,29 @@ analise_detalhada_page = st.Page("analise_detalhada.py", title="Análise Detalha
 vizu_analise_page = st.Page("vizu_analise.py", title="Vizualização Análise")
 
 pg = st.navigation([home_page, atletas_page, competicao_page, analise_rapida_page, analise_detalhada_page, vizu_analise_page])
-pg.run()
\ No newline at end of file
+
+# Cada execução do script é medida (inicialização e página); painel de diagnóstico: ?diagnostico=1 na URL
+sessao = st.session_state.setdefault("id_sessao", uuid.uuid4().hex[:8])
+try:
+    with instrumentacao.rerun(sessao):
+        with instrumentacao.fase("inicializacao"):
+            # Inicialização do banco de dados (migrações verificadas uma única vez por processo)
+            garantir_esquema_uma_vez()
+            # Inicia o sincronizador do diário local de eventos (também reenvia o que ficou pendente de execuções anteriores)
+            obter_sincronizador()
+            # Carrega as imagens do tatame em memória antes da primeira marcação
+            imagens.preaquecer()
+
+        # Contadores do cache de listas de atletas e competições
+        estatisticas_cache = get_db_manager().estatisticas_cache()
+        st.sidebar.caption(
+            f"Cache: {estatisticas_cache['acertos']} acertos / {estatisticas_cache['falhas']} falhas "
+            f"({estatisticas_cache['taxa_acerto']:.0%})"
+        )
+
+        with instrumentacao.fase(pg.title):
+            pg.run()
+finally:
+    # Também quando a página interrompe o script (st.stop, st.rerun nos diálogos e verificações)
+    if st.query_params.get("diagnostico") == "1":
+        diagnostico.exibir_painel(sessao)
@@ -5,8 +5,14 @@ from datetime import date
 import os
 from db_manager import DBManager, get_db_manager  # Certifique-se de que esse import esteja correto
 import atexit
+import consultas_paralelas
+import deduplicacao
+import importacao
+from exclusoes import obter_executor_exclusoes
+from utils import cursor_pagina, selecionar_atleta, tabela_paginada
 
 db_manager = get_db_manager()
+executor_exclusoes = obter_executor_exclusoes()
 
 @st.dialog("Adicionar Atleta")
 def adicionar_atleta_dialog(**kwargs):
@@ -20,6 +26,11 @@ def adicionar_atleta_dialog(**kwargs):
     else:
         clube = st.selectbox("Selecione a equipe", ('Minas', 'Outros', 'Internacional'))
 
+    # Avisa sobre atletas já cadastrados com nome parecido (acentos e "da", "de"... ignorados)
+    parecidos = db_manager.buscar_atletas(nome, limite=5) if nome.strip() else []
+    if parecidos:
+        st.warning("Atletas com nome parecido: " + ", ".join(f"{atleta[1]} ({atleta[4]})" for atleta in parecidos))
+
     # Validação e submissão do formulário
     if st.button("Cadastrar", key=f"adicionar_atleta_dialog"):
         if not nome or not categoria or not ano_nascimento:
@@ -28,7 +39,6 @@ def adicionar_atleta_dialog(**kwargs):
             resultado = db_manager.adicionar_atleta(nome, categoria, ano_nascimento, clube)
             if isinstance(resultado, str):  # Se for uma string, é uma mensagem de erro
                 st.error(resultado)  # Exibe a mensagem de erro no Streamlit
-                db_manager.rollback()
             else:
                 st.success("Atleta cadastrado com sucesso!")
                 time.sleep(1)  # Pausa para mostrar a mensagem antes de atualizar a página
@@ -41,32 +51,24 @@ def editar_atleta_dialog(**kwargs):
         st.error("Clube não especificado.")
         return
 
-    # Lista os atletas do clube informado
-    lista_atletas = db_manager.listar_atletas_por_clube(clube)
-    if not lista_atletas:
-        st.error("Nenhum atleta encontrado para este clube.")
-        return
+    # Busca os atletas do clube informado no servidor
+    atleta_escolhido = selecionar_atleta(db_manager, key=f"editar_atleta_{clube}", clube=clube)
 
-    # Cria um dicionário com nome do atleta como chave e os outros dados como valor
-    dict_atletas = {atleta[1]: [atleta[0], atleta[2], atleta[3], atleta[4]] for atleta in lista_atletas}
-    atleta_escolhido = st.selectbox("Selecione o atleta", options=list(dict_atletas.keys()), index=0)
-    
     if atleta_escolhido:
-        atleta_id = dict_atletas[atleta_escolhido][0]
-        novo_nome = st.text_input("Nome", value=atleta_escolhido)
+        atleta_id, nome_atual, categoria_atual, data_nasc_atual, clube_atual = atleta_escolhido
+        novo_nome = st.text_input("Nome", value=nome_atual)
         categorias_list = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
         try:
-            idx_categoria = categorias_list.index(dict_atletas[atleta_escolhido][1])
+            idx_categoria = categorias_list.index(categoria_atual)
         except ValueError:
             idx_categoria = 0
         nova_categoria = st.selectbox("Selecione a categoria", options=categorias_list, index=idx_categoria)
         # Extrai o ano de nascimento a partir do campo data (data_nasc)
-        data_nasc_atual = dict_atletas[atleta_escolhido][2]
         ano_atual = data_nasc_atual.year if isinstance(data_nasc_atual, date) else 2000
         novo_ano = st.number_input("Ano de nascimento", value=ano_atual)
         clubes_list = ['Minas', 'Outros', 'Internacional']
         try:
-            idx_clube = clubes_list.index(dict_atletas[atleta_escolhido][3])
+            idx_clube = clubes_list.index(clube_atual)
         except ValueError:
             idx_clube = 0
         novo_clube = st.selectbox("Selecione o clube", options=clubes_list, index=idx_clube)
@@ -78,7 +80,6 @@ def editar_atleta_dialog(**kwargs):
                 resultado = db_manager.editar_atleta(atleta_id, novo_nome, nova_categoria, novo_ano, novo_clube)
                 if isinstance(resultado, str):
                     st.error(resultado)
-                    db_manager.rollback()
                 else:
                     st.success("Atleta editado com sucesso!")
                     time.sleep(1)
@@ -91,53 +92,144 @@ def excluir_atleta_dialog(**kwargs):
         st.error("Clube não especificado.")
         return
 
-    # Obtém a lista de atletas do clube informado
-    lista_atletas = db_manager.listar_atletas_por_clube(clube)
-    
-    if not lista_atletas:
-        st.error("Nenhum atleta encontrado para este clube.")
-        return
+    # Seleciona o atleta a ser excluído (busca no servidor, entre os atletas do clube)
+    atleta = selecionar_atleta(db_manager, key=f"excluir_atleta_{clube}", clube=clube)
 
-    # Cria um dicionário com o nome do atleta como chave e o id como valor
-    dict_atletas = {atleta[1]: atleta[0] for atleta in lista_atletas}
-    
-    # Seleciona o atleta a ser excluído
-    atleta = st.selectbox("Selecione o atleta", options=list(dict_atletas.keys()), index=0)
-    
     if atleta:
-        atleta_id = dict_atletas[atleta]
+        atleta_id, nome_atleta = atleta[0], atleta[1]
+        if atleta_id in executor_exclusoes.atletas_em_exclusao():
+            st.info("A exclusão deste atleta já está em andamento.")
+            return
+
+        # Prévia do que será removido (contagens pelos índices, sem bloquear as tabelas)
+        previsto = db_manager.contar_dependentes_atletas([atleta_id])
+        if previsto is not None:
+            st.write(
+                f"Serão removidos {previsto.confrontos} confronto(s), {previsto.acoes} ação(ões) "
+                f"e {previsto.shidos} shido(s) ligados a este atleta."
+            )
         st.warning(
             "Isso excluirá permanentemente todos os dados associados a esse atleta. Você tem certeza?", 
             icon="⚠️"
         )
         if st.button("Excluir", key="excluir_atleta_dialog"):
-            if db_manager.deletar_atleta(atleta_id):
-                st.success("Atleta deletado com sucesso!")
-                time.sleep(1)
-                st.rerun()    
-            else:
-                st.error("Erro ao excluir o atleta. Tente novamente.")
-                db_manager.rollback()
-                time.sleep(1)
-                st.rerun()
+            # A exclusão roda em lotes, em segundo plano; o progresso aparece no topo da página
+            executor_exclusoes.excluir([atleta_id], nome_atleta, previsto)
+            st.success("Exclusão iniciada. Acompanhe o progresso no topo da página.")
+            time.sleep(1)
+            st.rerun()
+
+@st.dialog("Importar Planilha", width="large")
+def importar_planilha_dialog():
+    tipos = {"Atletas": "atletas", "Competições": "competicoes", "Lutas (chaves)": "confrontos"}
+    tipo = st.radio("O que importar", options=list(tipos.keys()), horizontal=True)
+    st.caption({
+        "Atletas": "Colunas: nome, categoria, ano_nascimento (ou data_nasc), clube.",
+        "Competições": "Colunas: nome_competicao, data_competicao, classe.",
+        "Lutas (chaves)": "Colunas: competicao, data_competicao (opcional), atleta1, atleta2, categoria.",
+    }[tipo])
+    arquivo = st.file_uploader("Planilha", type=["csv", "xlsx"])
+
+    if arquivo and st.button("Importar", key="importar_planilha_dialog"):
+        with st.spinner("Importando..."):
+            relatorio = importacao.importar(db_manager, tipos[tipo], arquivo, arquivo.name)
+        st.success(
+            f"{relatorio.inseridas} inseridos, {relatorio.ja_cadastradas} já cadastrados "
+            f"de {relatorio.lidas} linhas lidas."
+        )
+        if relatorio.erros:
+            st.warning(f"{len(relatorio.erros)} linha(s) com erro:")
+            st.dataframe(pd.DataFrame(relatorio.erros, columns=["Linha", "Erro"]), hide_index=True)
+
+
+@st.dialog("Atletas Duplicados", width="large")
+def duplicados_dialog():
+    limiar = st.slider("Semelhança mínima dos nomes", min_value=0.3, max_value=1.0, value=0.6, step=0.05)
+    grupos = deduplicacao.agrupar(db_manager.candidatos_duplicados(limiar))
+    em_exclusao = executor_exclusoes.atletas_em_exclusao()
+    grupos = [grupo for grupo in grupos if not em_exclusao & {grupo.mantido[0], *grupo.mapa()}]
+    if not grupos:
+        st.info("Nenhum possível duplicado encontrado.")
+        return
+
+    st.caption("Em cada grupo, os dados dos duplicados marcados passam para o atleta mantido (o com mais lutas).")
+    colunas = ["id", "Nome", "Clube", "Nascimento", "Lutas"]
+    mapa = {}
+    for indice, grupo in enumerate(grupos):
+        mantido = grupo.mantido
+        with st.container(border=True):
+            st.write(f"**{mantido[1]}** ({mantido[2]}, {mantido[4]} lutas) · semelhança {grupo.semelhanca:.0%}")
+            st.dataframe(pd.DataFrame(grupo.duplicados, columns=colunas), hide_index=True)
+            if st.checkbox("Mesclar neste atleta", key=f"mesclar_grupo_{indice}"):
+                mapa.update(grupo.mapa())
+
+    if st.button("Mesclar selecionados", key="mesclar_duplicados_dialog", disabled=not mapa):
+        # Todos os grupos marcados são mesclados em uma única transação, na fila de exclusões
+        executor_exclusoes.mesclar(mapa, f"{len(mapa)} atleta(s) duplicado(s)")
+        st.success("Mesclagem iniciada. Acompanhe o progresso no topo da página.")
+        time.sleep(1)
+        st.rerun()
+
+
+@st.fragment(run_every=1)
+def progresso_exclusoes():
+    tarefas = executor_exclusoes.tarefas()
+    acompanhadas = st.session_state.setdefault("exclusoes_acompanhadas", set())
+    for tarefa in tarefas:
+        if tarefa.estado == "erro":
+            if time.time() - tarefa.fim < 300:
+                st.error(f"Falha ao processar {tarefa.descricao}: {tarefa.erro}")
+        elif tarefa.ativa or tarefa.id in acompanhadas:
+            detalhes = ", ".join(f"{linhas} {tabela}" for tabela, linhas in tarefa.processadas.items())
+            acao = "Excluindo" if tarefa.tipo == "exclusao" else "Mesclando"
+            st.progress(tarefa.fracao_concluida() or 0.0,
+                        text=f"{acao} {tarefa.descricao} ({tarefa.estado}){': ' + detalhes if detalhes else ''}")
+    # Ao concluir uma tarefa acompanhada por esta sessão, recarrega a página para atualizar as listas
+    ativas = {tarefa.id for tarefa in tarefas if tarefa.ativa}
+    if acompanhadas - ativas:
+        acompanhadas.intersection_update(ativas)
+        st.rerun()
+    acompanhadas.update(ativas)
+
+
+progresso_exclusoes()
+
+botao_importar_planilha, botao_duplicados = st.columns([1, 4])
+with botao_importar_planilha:
+    if st.button("Importar Planilha", key="botao_importar_planilha"):
+        importar_planilha_dialog()
+with botao_duplicados:
+    if st.button("Procurar Duplicados", key="botao_duplicados"):
+        duplicados_dialog()
 
 # Obter a lista de clubes
 clubes = ["Minas", "Outros", "Internacional"]
+categorias = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+ordenacoes = {"Nome": "nome", "Ordem de cadastro": "cadastro"}
 
+# Filtros de cada clube primeiro; as páginas dos três clubes são carregadas em paralelo e exibidas em seguida
+expanders, filtros = {}, {}
 for clube in clubes:
-    with st.expander(clube):
-        # Listar atletas do clube
-        atletas = db_manager.listar_atletas_por_clube(clube)
-        colunas = ["Nome", "Categoria", "Ano de Nascimento", "Clube"]
-        if not atletas:
-            st.write("Nenhum atleta cadastrado")
-            df = pd.DataFrame(columns=colunas)
-        else:
-            df = pd.DataFrame(atletas, columns=["id"] + colunas)
-            df = df.drop(columns=["id"])
-        
-        st.dataframe(df, hide_index=True)
-        
+    expanders[clube] = st.expander(clube)
+    with expanders[clube]:
+        col_categoria, col_ordem = st.columns(2)
+        categoria = col_categoria.selectbox("Categoria", options=categorias, index=None, key=f"categoria_{clube}")
+        ordem = ordenacoes[col_ordem.selectbox("Ordenar por", options=list(ordenacoes.keys()), key=f"ordem_{clube}")]
+        filtros[clube] = (categoria, ordem, cursor_pagina(f"pagina_atletas_{clube}", (categoria, ordem)))
+
+paginas = consultas_paralelas.reunir(**{
+    clube: (db_manager.listar_atletas_pagina, clube, categoria, cursor, ordem)
+    for clube, (categoria, ordem, cursor) in filtros.items()
+})
+
+for clube in clubes:
+    with expanders[clube]:
+        # Atletas do clube, uma página por vez (paginação por chave no banco)
+        tabela_paginada(
+            f"pagina_atletas_{clube}", paginas[clube],
+            colunas=["id", "Nome", "Categoria", "Nascimento", "Clube"], column_config={"id": None},
+        )
+
         # Criação dos botões para adicionar, excluir e editar atletas
         botao_adicionar_atleta, botao_excluir_atleta, botao_editar_atleta = st.columns([1, 1, 3])
         
@@ -0,0 +1,419 @@
+"""
+Benchmark do DBManager em um Postgres local descartável.
+
+Aplica as migrações, popula o banco com dados sintéticos na escala pedida (`dados_sinteticos.popular`;
+1 = volume de referência, 100 = cem vezes) e cronometra, repetidas vezes, cada método do DBManager e os
+padrões de consulta das páginas de competições e de análise rápida. O resultado é um JSON com p50, p95 e
+p99 em milissegundos por cenário; com --comparar, os p95 são comparados com os de uma execução anterior e
+o script termina com erro se algum cenário piorou além da tolerância.
+
+Por padrão o cache de listas fica desligado (TTL zero), para medir o banco; use --com-cache para medir
+as páginas como em produção.
+
+ATENÇÃO: o banco informado é modificado; use apenas um banco de testes.
+    python benchmark.py --dsn postgresql://postgres@localhost/scoutjudo_bench --escala 10 --saida bench_10x.json
+    python benchmark.py --dsn postgresql://postgres@localhost/scoutjudo_bench --sem-popular --comparar bench_10x.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Callable, NamedTuple, Optional
+
+import dados_sinteticos
+import migracoes
+import vocabulario
+from consultas_paralelas import ExecutorConsultas
+from db_manager import COLUNAS_ACAO, COLUNAS_SHIDO, CacheTTL, DBManager, FalhaGravacao, PoolConexoes
+
+PERCENTIS = (50, 95, 99)
+
+# Diferença mínima de p95 (ms) para considerar uma regressão; abaixo disso a variação é ruído
+LIMIAR_REGRESSAO_MS = 1.0
+
+# Profundidade máxima (em páginas) das páginas sorteadas pelos cenários de paginação
+PAGINAS_PROFUNDIDADE = 20
+
+
+class Cenario(NamedTuple):
+    """Um cenário cronometrado: `preparar(db_manager, amostra, aleatorio)` gera os argumentos (fora da
+    medição) e `executar(db_manager, *argumentos)` é a chamada medida."""
+    nome: str
+    executar: Callable
+    preparar: Optional[Callable] = None
+
+
+class Amostra(NamedTuple):
+    """IDs e valores existentes no banco, sorteados a cada repetição dos cenários."""
+    confrontos: list  # (confronto_id, campeonato_id, atleta1_id, atleta2_id)
+    atletas: list     # (atleta_id, nome, categoria, data_nasc, clube)
+    campeonatos: list
+    clubes: list
+    total_competicoes: int
+
+
+def carregar_amostra(db_manager, tamanho=1000):
+    with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, campeonato_id, atleta1_id, atleta2_id FROM confrontos ORDER BY random() LIMIT %s;
+        """, (tamanho,))
+        confrontos = cursor.fetchall()
+        cursor.execute("""
+            SELECT id, nome, categoria, data_nasc, clube FROM atletas ORDER BY random() LIMIT %s;
+        """, (tamanho,))
+        atletas = cursor.fetchall()
+        cursor.execute("SELECT DISTINCT clube FROM atletas WHERE clube IS NOT NULL;")
+        clubes = [clube for clube, in cursor.fetchall()]
+        cursor.execute("SELECT count(*) FROM campeonato;")
+        total_competicoes = cursor.fetchone()[0]
+    if not confrontos or not atletas:
+        raise RuntimeError("O banco não tem confrontos e atletas; rode sem --sem-popular.")
+    campeonatos = sorted({confronto[1] for confronto in confrontos})
+    return Amostra(confrontos, atletas, campeonatos, clubes, total_competicoes)
+
+
+def _acao(confronto, aleatorio):
+    _, _, atleta1, atleta2 = confronto
+    autor = aleatorio.choice((atleta1, atleta2))
+    return dict(
+        confronto_id=confronto[0], atleta_id=autor, quadrante=aleatorio.randint(1, 4),
+        grupo_golpe=aleatorio.choice(vocabulario.GRUPOS_GOLPE),
+        tempo_ocorrido=dados_sinteticos._tempo(aleatorio.randrange(dados_sinteticos.DURACAO_MAXIMA_MS)),
+        mao_direita=aleatorio.choice(vocabulario.PEGADAS), mao_esquerda=aleatorio.choice(vocabulario.PEGADAS),
+        efetividade_golpe=aleatorio.choice(vocabulario.EFETIVIDADES_GOLPE), newaza=False, atleta_id_nw=None,
+        direcao=None, partida=None, efetividade_newaza=None, evento_uid=str(uuid.uuid4()),
+    )
+
+
+def _shido(confronto, aleatorio):
+    return dict(
+        confronto_id=confronto[0], atleta_id=aleatorio.choice(confronto[2:]),
+        tipo=aleatorio.choice(vocabulario.TIPOS_SHIDO),
+        tempo=dados_sinteticos._tempo(aleatorio.randrange(dados_sinteticos.DURACAO_MAXIMA_MS)),
+        evento_uid=str(uuid.uuid4()),
+    )
+
+
+def _novo_confronto(db_manager, amostra, aleatorio):
+    _, campeonato_id, atleta1, atleta2 = aleatorio.choice(amostra.confrontos)
+    return (db_manager.adicionar_confronto(campeonato_id, atleta1, atleta2, None, None),)
+
+
+def _nova_competicao(db_manager, amostra, aleatorio):
+    return (db_manager.adicionar_competicao(f"Benchmark {uuid.uuid4()}", date.today(), "Treino"),)
+
+
+def _novo_atleta(db_manager, amostra, aleatorio):
+    return (db_manager.adicionar_atleta(f"Benchmark {uuid.uuid4()}", "-73", 2000, aleatorio.choice(amostra.clubes)),)
+
+
+def _consumir_exportacao(db_manager, conjunto, campeonato_id):
+    return sum(len(linhas) for _, linhas in db_manager.iterar_exportacao(conjunto, campeonato_id=campeonato_id))
+
+
+def _cursor_profundo(listar, aleatorio, total):
+    # Segue os cursores até uma página sorteada (fora da medição): o custo medido deve ser o mesmo da primeira
+    cursor = None
+    for _ in range(aleatorio.randrange(max(1, min(PAGINAS_PROFUNDIDADE, total)))):
+        proximo = listar(cursor).proximo
+        if proximo is None:
+            break
+        cursor = proximo
+    return cursor
+
+
+def _pagina_competicoes(db_manager, cursor_competicoes, cursor_lutas):
+    # competicao.py: página de competições e página de lutas (sem filtros)
+    db_manager.listar_competicoes_pagina(cursor=cursor_competicoes)
+    return db_manager.listar_lutas_pagina(cursor=cursor_lutas)
+
+
+def _lutas_filtradas(db_manager, campeonato_id):
+    # competicao.py: sugestões do seletor de competição e lutas da competição escolhida
+    db_manager.buscar_competicoes("")
+    return db_manager.listar_lutas_pagina(campeonato_id=campeonato_id)
+
+
+def _cadastro_luta(db_manager, texto, categoria):
+    # analise_rapida.py: seletores de competição e atletas (busca digitada, filtrada pela categoria) do cadastro
+    db_manager.buscar_competicoes("")
+    return db_manager.buscar_atletas(texto, categoria=categoria)
+
+
+def _carregar_luta(db_manager, confronto_id):
+    # analise_rapida.carregar_luta: confronto e perfis materializados dos dois atletas
+    _, atleta1_id, _, atleta2_id, _ = db_manager.obter_confronto(confronto_id)
+    return db_manager.obter_perfil_atleta(atleta1_id), db_manager.obter_perfil_atleta(atleta2_id)
+
+
+def _visualizacao(db_manager, campeonato_id, confronto_id):
+    # analise_rapida.py, aba Visualização: seletores, dados da luta e nomes dos atletas
+    db_manager.buscar_competicoes("")
+    db_manager.listar_lutas_por_competicao(campeonato_id)
+    dados = db_manager.carregar_dados_analise(confronto_id=confronto_id)
+    db_manager.listar_todos_atletas()
+    return dados
+
+
+def _relatorio(db_manager, reunir, campeonato_id):
+    # vizu_analise.carregar_relatorio: as cinco agregações, em sequência ou em paralelo (consultas_paralelas)
+    chamadas = [db_manager.contar_golpes, db_manager.contar_quadrantes, db_manager.contar_shidos,
+                db_manager.contar_acoes_por_janela, db_manager.desempenho_atletas]
+    return reunir(**{metodo.__name__: functools.partial(metodo, campeonato_id=campeonato_id) for metodo in chamadas})
+
+
+@functools.lru_cache(maxsize=None)
+def _executor_consultas(db_manager):
+    return ExecutorConsultas(max(1, db_manager.pool.maxconn // 2))
+
+
+def _reunir_em_sequencia(**chamadas):
+    return {nome: chamada() for nome, chamada in chamadas.items()}
+
+
+def cenarios():
+    """Cenários de todos os métodos públicos do DBManager e dos padrões de consulta das páginas."""
+    confronto = lambda db, a, r: (r.choice(a.confrontos)[0],)
+    campeonato = lambda db, a, r: (r.choice(a.campeonatos),)
+    atleta = lambda db, a, r: (r.choice(a.atletas)[0],)
+    return [
+        # Listas de referência
+        Cenario("listar_competicoes", lambda db: db.listar_competicoes()),
+        Cenario("listar_todos_atletas", lambda db: db.listar_todos_atletas()),
+        Cenario("buscar_atletas", lambda db, texto: db.buscar_atletas(texto),
+                lambda db, a, r: (r.choice(a.atletas)[1][:6],)),
+        Cenario("buscar_atletas.clube", lambda db, texto, clube: db.buscar_atletas(texto, clube=clube),
+                lambda db, a, r: (lambda atleta: (atleta[1][:3], atleta[4]))(r.choice(a.atletas))),
+        Cenario("buscar_competicoes", lambda db, texto: db.buscar_competicoes(texto),
+                lambda db, a, r: (r.choice(["", "Compet", "Sintetica 1"]),)),
+        Cenario("candidatos_duplicados", lambda db: db.candidatos_duplicados()),
+        Cenario("listar_atletas_por_clube", lambda db, clube: db.listar_atletas_por_clube(clube),
+                lambda db, a, r: (r.choice(a.clubes),)),
+        Cenario("listar_lutas_por_competicao", lambda db, c: db.listar_lutas_por_competicao(c), campeonato),
+        Cenario("listar_atletas_pagina", lambda db, clube: db.listar_atletas_pagina(clube),
+                lambda db, a, r: (r.choice(a.clubes),)),
+        Cenario("listar_competicoes_pagina", lambda db: db.listar_competicoes_pagina()),
+        Cenario("listar_lutas_pagina", lambda db: db.listar_lutas_pagina()),
+        Cenario("listar_lutas_pagina.categoria", lambda db, categoria: db.listar_lutas_pagina(categoria=categoria),
+                lambda db, a, r: (r.choice(a.atletas)[2],)),
+        Cenario("listar_lutas_pagina.vencedor", lambda db, c: db.listar_lutas_pagina(vencedor_id=c[2]),
+                lambda db, a, r: (r.choice(a.confrontos),)),
+        Cenario("obter_confronto", lambda db, c: db.obter_confronto(c), confronto),
+        # Análise
+        Cenario("carregar_dados_analise.confronto", lambda db, c: db.carregar_dados_analise(confronto_id=c),
+                confronto),
+        Cenario("carregar_dados_analise.atleta", lambda db, a: db.carregar_dados_analise(atleta_id=a), atleta),
+        Cenario("carregar_dados_analise.competicao", lambda db, c: db.carregar_dados_analise(campeonato_id=c),
+                campeonato),
+        Cenario("contar_golpes", lambda db, a: db.contar_golpes(atleta_id=a), atleta),
+        Cenario("contar_quadrantes", lambda db, c: db.contar_quadrantes(campeonato_id=c), campeonato),
+        Cenario("contar_shidos", lambda db, a: db.contar_shidos(atleta_id=a), atleta),
+        Cenario("contar_acoes_por_janela", lambda db, a: db.contar_acoes_por_janela(atleta_id=a), atleta),
+        Cenario("desempenho_atletas", lambda db, c: db.desempenho_atletas(campeonato_id=c), campeonato),
+        Cenario("desempenho_atletas.geral", lambda db: db.desempenho_atletas()),
+        Cenario("obter_perfil_atleta", lambda db, a: db.obter_perfil_atleta(a), atleta),
+        Cenario("contar_dependentes_atletas", lambda db, a: db.contar_dependentes_atletas([a]), atleta),
+        Cenario("atualizar_perfis", lambda db, a: db.atualizar_perfis([a]), atleta),
+        # Exportação
+        Cenario("tipos_exportacao", lambda db: db.tipos_exportacao("acoes")),
+        Cenario("iterar_exportacao.acoes", lambda db, c: _consumir_exportacao(db, "acoes", c), campeonato),
+        Cenario("iterar_exportacao.confrontos", lambda db, c: _consumir_exportacao(db, "confrontos", c),
+                campeonato),
+        # Escrita
+        Cenario("adicionar_atleta",
+                lambda db, nome, clube: db.adicionar_atleta(nome, "-73", 2000, clube),
+                lambda db, a, r: (f"Benchmark {uuid.uuid4()}", r.choice(a.clubes))),
+        Cenario("editar_atleta",
+                lambda db, atleta_id, nome, categoria, data_nasc, clube:
+                    db.editar_atleta(atleta_id, nome, categoria, data_nasc.year, clube),
+                lambda db, a, r: r.choice(a.atletas)),
+        Cenario("adicionar_competicao",
+                lambda db: db.adicionar_competicao(f"Benchmark {uuid.uuid4()}", date.today(), "Treino")),
+        Cenario("adicionar_confronto",
+                lambda db, c, a1, a2: db.adicionar_confronto(c, a1, a2, None, None),
+                lambda db, a, r: r.choice(a.confrontos)[1:]),
+        Cenario("finalizar_confronto",
+                lambda db, c, vencedor: db.finalizar_confronto(c, vencedor, "00:04:00"),
+                lambda db, a, r: (lambda luta: (luta[0], r.choice(luta[2:])))(r.choice(a.confrontos))),
+        Cenario("adicionar_acao",
+                lambda db, acao: db.adicionar_acao(*(acao[coluna] for coluna in COLUNAS_ACAO)),
+                lambda db, a, r: (_acao(r.choice(a.confrontos), r),)),
+        Cenario("adicionar_shido",
+                lambda db, shido: db.adicionar_shido(*(shido[coluna] for coluna in COLUNAS_SHIDO)),
+                lambda db, a, r: (_shido(r.choice(a.confrontos), r),)),
+        Cenario("gravar_eventos_em_lote",
+                lambda db, acoes, shidos: db.gravar_eventos_em_lote(acoes, shidos),
+                lambda db, a, r: (lambda luta: ([_acao(luta, r) for _ in range(20)], [_shido(luta, r)]))(
+                    r.choice(a.confrontos))),
+        Cenario("importar_atletas",
+                lambda db, linhas: db.importar_atletas(linhas),
+                lambda db, a, r: ([(f"Benchmark {uuid.uuid4()}", "-73", date(2000, 1, 1), r.choice(a.clubes))
+                               for _ in range(100)],)),
+        Cenario("importar_competicoes",
+                lambda db, linhas: db.importar_competicoes(linhas),
+                lambda db, a, r: ([(f"Benchmark {uuid.uuid4()}", date.today(), "Treino") for _ in range(10)],)),
+        Cenario("importar_confrontos",
+                lambda db, linhas: db.importar_confrontos(linhas),
+                lambda db, a, r: ([(r.choice(a.campeonatos), *r.sample([atleta[0] for atleta in a.atletas], 2), "-73")
+                               for _ in range(50)],)),
+        Cenario("deletar_confronto", lambda db, c: db.deletar_confronto(c), _novo_confronto),
+        Cenario("deletar_competicao", lambda db, c: db.deletar_competicao(c), _nova_competicao),
+        Cenario("deletar_atleta", lambda db, a: db.deletar_atleta(a), _novo_atleta),
+        Cenario("mesclar_atletas",
+                lambda db, duplicado, mantido: db.mesclar_atletas({duplicado: mantido}),
+                lambda db, a, r: (_novo_atleta(db, a, r)[0], r.choice(a.atletas)[0])),
+        # Padrões de consulta das páginas
+        Cenario("pagina.competicoes", _pagina_competicoes,
+                lambda db, a, r: (
+                    _cursor_profundo(lambda cursor: db.listar_competicoes_pagina(cursor=cursor), r,
+                                     a.total_competicoes),
+                    _cursor_profundo(lambda cursor: db.listar_lutas_pagina(cursor=cursor), r, len(a.confrontos)),
+                )),
+        Cenario("pagina.competicoes.lutas_da_competicao", _lutas_filtradas, campeonato),
+        Cenario("pagina.analise_rapida.cadastro", _cadastro_luta,
+                lambda db, a, r: (lambda atleta: (atleta[1][:4], atleta[2]))(r.choice(a.atletas))),
+        Cenario("pagina.analise_rapida.carregar_luta", _carregar_luta, confronto),
+        Cenario("pagina.analise_rapida.sincronizacao",
+                lambda db, acoes, shidos: db.gravar_eventos_em_lote(acoes, shidos),
+                lambda db, a, r: (lambda luta: ([_acao(luta, r) for _ in range(3)], []))(r.choice(a.confrontos))),
+        Cenario("pagina.analise_rapida.visualizacao", _visualizacao,
+                lambda db, a, r: r.choice(a.confrontos)[1::-1]),
+        Cenario("pagina.vizu_analise.relatorio", lambda db, c: _relatorio(db, _reunir_em_sequencia, c), campeonato),
+        Cenario("pagina.vizu_analise.relatorio.paralelo",
+                lambda db, c: _relatorio(db, _executor_consultas(db).reunir, c), campeonato),
+    ]
+
+
+def percentil(ordenadas, p):
+    """Percentil `p` (0-100) de uma lista já ordenada, pelo método do posto mais próximo."""
+    posto = max(1, -(-p * len(ordenadas) // 100))
+    return ordenadas[posto - 1]
+
+
+def medir(db_manager, cenario, amostra, aleatorio, repeticoes, aquecimento):
+    """Executa o cenário `aquecimento` + `repeticoes` vezes e resume os tempos das repetições medidas."""
+    tempos = []
+    erros = 0
+    for repeticao in range(aquecimento + repeticoes):
+        argumentos = cenario.preparar(db_manager, amostra, aleatorio) if cenario.preparar else ()
+        inicio = time.perf_counter()
+        try:
+            resultado = cenario.executar(db_manager, *argumentos)
+        except Exception as e:
+            print(f"Erro em {cenario.nome}:", e)
+            resultado = str(e)
+        decorrido = (time.perf_counter() - inicio) * 1000
+        if repeticao < aquecimento:
+            continue
+        # Os métodos do DBManager devolvem a mensagem de erro como string (ou False nas exclusões)
+        erros += isinstance(resultado, (str, FalhaGravacao)) or resultado is False
+        tempos.append(decorrido)
+    tempos.sort()
+    resumo = {"amostras": len(tempos), "erros": erros}
+    resumo.update({f"p{p}_ms": round(percentil(tempos, p), 3) for p in PERCENTIS})
+    resumo["media_ms"] = round(sum(tempos) / len(tempos), 3)
+    resumo["max_ms"] = round(tempos[-1], 3)
+    return resumo
+
+
+def comparar(atual, anterior, tolerancia):
+    """
+    Compara os p95 de dois resultados do benchmark.
+    Retorna a lista de (cenario, p95_anterior, p95_atual) que pioraram mais que `tolerancia` (fração).
+    """
+    regressoes = []
+    for nome, resumo in atual["cenarios"].items():
+        base = anterior["cenarios"].get(nome)
+        if base is None:
+            continue
+        if (resumo["p95_ms"] > base["p95_ms"] * (1 + tolerancia)
+                and resumo["p95_ms"] - base["p95_ms"] >= LIMIAR_REGRESSAO_MS):
+            regressoes.append((nome, base["p95_ms"], resumo["p95_ms"]))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede os tempos do DBManager com dados sintéticos.")
+    parser.add_argument("--dsn", default=os.environ.get("SCOUTJUDO_DSN_TESTE"),
+                        help="Banco Postgres descartável (padrão: variável SCOUTJUDO_DSN_TESTE)")
+    parser.add_argument("--escala", type=float, default=1, help="Volume de dados (1 a 100 vezes o de referência)")
+    parser.add_argument("--sem-popular", action="store_true", help="Usa os dados já existentes no banco")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--aquecimento", type=int, default=3, help="Execuções descartadas antes da medição")
+    parser.add_argument("--cenarios", nargs="*", help="Executa apenas os cenários cujo nome contém estes textos")
+    parser.add_argument("--com-cache", action="store_true", help="Mede com o cache de listas ligado")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON de resultado (padrão: saída padrão)")
+    parser.add_argument("--comparar", help="Resultado JSON anterior para detectar regressões de p95")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Piora de p95 aceita na comparação, como fração (padrão: 0.25)")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("Informe --dsn ou defina SCOUTJUDO_DSN_TESTE.")
+
+    cache = CacheTTL() if args.com_cache else CacheTTL(ttl=0)
+    db_manager = DBManager(PoolConexoes(maxconn=2, dsn=args.dsn), cache=cache)
+    aleatorio = random.Random(args.semente)
+    selecionados = [
+        cenario for cenario in cenarios()
+        if not args.cenarios or any(texto in cenario.nome for texto in args.cenarios)
+    ]
+    try:
+        migracoes.aplicar_migracoes(db_manager)
+        if not args.sem_popular:
+            with db_manager.pool.conexao() as conn:
+                inicio = time.perf_counter()
+                inseridos = dados_sinteticos.popular(conn, escala=args.escala, semente=args.semente)
+                print(f"Dados inseridos em {time.perf_counter() - inicio:.0f} s:", inseridos, file=sys.stderr)
+        with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT relname, reltuples::bigint FROM pg_class
+                WHERE relname IN ('atletas', 'campeonato', 'confrontos', 'acoes', 'shido', 'perfil_atleta');
+            """)
+            volumes = dict(cursor.fetchall())
+            cursor.execute("SHOW server_version;")
+            versao_postgres = cursor.fetchone()[0]
+        amostra = carregar_amostra(db_manager)
+
+        resultados = {}
+        for cenario in selecionados:
+            resultados[cenario.nome] = medir(db_manager, cenario, amostra, aleatorio, args.repeticoes,
+                                             args.aquecimento)
+            print(f"{cenario.nome:45} p50 {resultados[cenario.nome]['p50_ms']:9.2f} ms   "
+                  f"p95 {resultados[cenario.nome]['p95_ms']:9.2f} ms", file=sys.stderr)
+    finally:
+        db_manager.close()
+
+    resultado = {
+        "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "escala": args.escala,
+        "repeticoes": args.repeticoes,
+        "com_cache": args.com_cache,
+        "volumes_estimados": volumes,
+        "postgres": versao_postgres,
+        "python": platform.python_version(),
+        "cenarios": resultados,
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        for nome, antes, depois in regressoes:
+            print(f"REGRESSÃO  {nome}: p95 {antes:.2f} ms -> {depois:.2f} ms", file=sys.stderr)
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import streamlit as st
-import pandas as pd
 import time
+import consultas_paralelas
 from datetime import date
-from db_manager import get_db_manager
+from db_manager import CompeticaoListada, LutaListada, get_db_manager
+from utils import cursor_pagina, selecionar_atleta, selecionar_competicao, tabela_paginada
 
 db_manager = get_db_manager()
 
@@ -23,75 +24,35 @@ def adicionar_competicao_dialog():
                 st.rerun()
             else:
                 st.error(f"A competição '{nome_competicao}' já está cadastrada ou ocorreu um erro.")
-                db_manager.rollback()
 
 # ----- Diálogo para Excluir Competição -----
 @st.dialog("Excluir Competição")
 def excluir_competicao_dialog():
-    lista_competicoes = db_manager.listar_competicoes()
-    dict_competicoes = {f"{comp[1]} - {comp[2]}": comp[0] for comp in lista_competicoes}
-    competicao_selecionada = st.selectbox("Selecione a Competição", options=list(dict_competicoes.keys()), index=0)
-    
+    competicao_selecionada = selecionar_competicao(db_manager, key="excluir_competicao")
+
     if competicao_selecionada:
-        competicao_id = dict_competicoes[competicao_selecionada]
+        competicao_id = competicao_selecionada[0]
         st.warning("Isso excluirá permanentemente a competição selecionada. Você tem certeza?", icon="⚠️")
         if st.button("Excluir", key="excluir_competicao_dialog"):
-            try:
-                conn = db_manager.conn
-                cursor = conn.cursor()
-                query = "DELETE FROM campeonato WHERE id = %s"
-                cursor.execute(query, (competicao_id,))
-                conn.commit()
+            if db_manager.deletar_competicao(competicao_id):
                 st.success("Competição excluída com sucesso!")
                 time.sleep(1)
                 st.rerun()
-            except Exception as e:
+            else:
                 st.error("Erro ao excluir a competição. Tente novamente.")
-                db_manager.rollback()
                 st.rerun()
 
 # ----- Diálogo para Excluir Luta -----
 @st.dialog("Excluir Luta")
-def excluir_luta_dialog(default_competicao=None):
-    # Seleciona a competição
-    if default_competicao:
-        comp_id = default_competicao
-    else:
-        competicoes = db_manager.listar_competicoes()
-        if not competicoes:
-            st.error("Nenhuma competição encontrada. Cadastre uma competição primeiro.")
-            return
-        dict_competicoes = {f"{comp[1]} - {comp[2]}": comp[0] for comp in competicoes}
-        competicao_selecionada = st.selectbox("Selecione a Competição", options=list(dict_competicoes.keys()), index=0)
-        comp_id = dict_competicoes[competicao_selecionada]
-
-    # Listar lutas com o ID (para exclusão) e os dados para exibição
-    try:
-        db_manager.check_connection()
-        sql = """
-            SELECT c.id, c.categoria,
-                   a1.nome AS "Atleta 1",
-                   a2.nome AS "Atleta 2",
-                   (SELECT nome FROM atletas WHERE id = c.vencedor_id) AS "Vencedor",
-                   c.tempo_luta AS "Tempo de Luta"
-            FROM confrontos c
-            JOIN atletas a1 ON c.atleta1_id = a1.id
-            JOIN atletas a2 ON c.atleta2_id = a2.id
-            WHERE c.campeonato_id = %s;
-        """
-        db_manager.cursor.execute(sql, (comp_id,))
-        lutas = db_manager.cursor.fetchall()
-    except Exception as e:
-        st.error("Erro ao listar lutas.")
-        return
-
+def excluir_luta_dialog(lutas):
+    # As lutas oferecidas são as da página exibida na tabela de lutas (use os filtros para encontrar a luta)
     if not lutas:
-        st.error("Nenhuma luta cadastrada para essa competição.")
+        st.error("Nenhuma luta na página atual.")
         return
 
     # Cria um dicionário para mapear uma string de exibição ao ID da luta
     dict_lutas = {
-        f"{luta[1]} | {luta[2]} vs {luta[3]} | Vencedor: {luta[4] if luta[4] else 'Sem vencedor'} | Tempo: {luta[5] if luta[5] else 'Sem tempo'}": luta[0]
+        f"{luta.competicao} | {luta.categoria} | {luta.atleta1} vs {luta.atleta2} | Vencedor: {luta.vencedor if luta.vencedor else 'Sem vencedor'} | Tempo: {luta.tempo_luta if luta.tempo_luta else 'Sem tempo'}": luta.id
         for luta in lutas
     }
 
@@ -106,49 +67,21 @@ def excluir_luta_dialog(default_competicao=None):
             st.rerun()
         else:
             st.error("Erro ao excluir a luta. Tente novamente.")
-            db_manager.rollback()
             time.sleep(1)
             st.rerun()
 
-# ----- Layout Principal da Página de Competição usando st.expander -----
-competicoes = db_manager.listar_competicoes()
-if not competicoes:
-    st.error("Nenhuma competição encontrada.")
-else:
-    for comp in competicoes:
-        comp_nome = f"{comp[1]} - {comp[2]}"
-        comp_id = comp[0]
-        with st.expander(comp_nome):
-            try:
-                db_manager.check_connection()
-                sql = """
-                    SELECT c.categoria,
-                           a1.nome AS "Atleta 1",
-                           a2.nome AS "Atleta 2",
-                           (SELECT nome FROM atletas WHERE id = c.vencedor_id) AS "Vencedor",
-                           c.tempo_luta AS "Tempo de Luta"
-                    FROM confrontos c
-                    JOIN atletas a1 ON c.atleta1_id = a1.id
-                    JOIN atletas a2 ON c.atleta2_id = a2.id
-                    WHERE c.campeonato_id = %s;
-                """
-                db_manager.cursor.execute(sql, (comp_id,))
-                lutas = db_manager.cursor.fetchall()
-            except Exception as e:
-                st.error("Erro ao listar confrontos.")
-                lutas = []
-
-            if not lutas:
-                st.write("Nenhum confronto cadastrado para esta competição.")
-            else:
-                # Cria o DataFrame com as colunas na ordem desejada
-                colunas = ["categoria", "Atleta 1", "Atleta 2", "Vencedor", "Tempo de Luta"]
-                df = pd.DataFrame(lutas, columns=colunas)
-                st.dataframe(df, hide_index=True)
-                
-                # Botão para excluir uma luta da competição corrente
-                if st.button("Excluir Luta", key=f"excluir_luta_{comp_id}"):
-                    excluir_luta_dialog(default_competicao=comp_id)
+# ----- Layout Principal da Página de Competição -----
+# Competições e lutas são listadas em páginas de tamanho fixo, paginadas por chave (data e id) no banco:
+# cada página custa o mesmo, qualquer que seja o número de competições e lutas cadastradas.
+categorias = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+
+st.subheader("Competições")
+periodo_competicoes = st.date_input("Período", value=(), key="periodo_competicoes")
+inicio_competicoes = periodo_competicoes[0] if len(periodo_competicoes) > 0 else None
+fim_competicoes = periodo_competicoes[1] if len(periodo_competicoes) > 1 else None
+# As duas tabelas são preenchidas no fim da página, depois de lidos todos os filtros, com as páginas carregadas
+# em paralelo
+area_competicoes = st.container()
 
 # ----- Colunas para Adicionar ou Excluir Competição -----
 col_adicionar, col_excluir = st.columns(2)
@@ -158,3 +91,57 @@ with col_adicionar:
 with col_excluir:
     if st.button("Excluir Competição", key="excluir_competicao"):
         excluir_competicao_dialog()
+
+st.subheader("Lutas")
+col_competicao, col_categoria, col_vencedor, col_periodo = st.columns(4)
+with col_competicao:
+    competicao = selecionar_competicao(db_manager, key="filtro_lutas_competicao")
+with col_categoria:
+    categoria = st.selectbox("Categoria", options=categorias, index=None, key="filtro_lutas_categoria")
+with col_vencedor:
+    vencedor = selecionar_atleta(db_manager, "Vencedor", key="filtro_lutas_vencedor", categoria=categoria)
+with col_periodo:
+    periodo_lutas = st.date_input("Período", value=(), key="periodo_lutas")
+
+ordenacoes = {"Data da competição": "data", "Ordem de cadastro": "cadastro"}
+col_ordem, col_direcao, col_sem_vencedor = st.columns(3)
+with col_ordem:
+    ordem = ordenacoes[st.selectbox("Ordenar por", options=list(ordenacoes.keys()), key="ordem_lutas")]
+with col_direcao:
+    descendente = st.toggle("Mais recentes primeiro", value=True, key="direcao_lutas")
+with col_sem_vencedor:
+    sem_vencedor = st.toggle("Somente lutas sem vencedor", key="sem_vencedor_lutas")
+
+filtros_lutas = dict(
+    campeonato_id=competicao[0] if competicao else None, categoria=categoria,
+    vencedor_id=vencedor[0] if vencedor else None, sem_vencedor=sem_vencedor,
+    data_inicio=periodo_lutas[0] if len(periodo_lutas) > 0 else None,
+    data_fim=periodo_lutas[1] if len(periodo_lutas) > 1 else None,
+    ordem=ordem, descendente=descendente,
+)
+area_lutas = st.container()
+
+cursor_competicoes = cursor_pagina("pagina_competicoes", (inicio_competicoes, fim_competicoes))
+cursor_lutas = cursor_pagina("pagina_lutas", tuple(filtros_lutas.items()))
+paginas = consultas_paralelas.reunir(
+    competicoes=lambda: db_manager.listar_competicoes_pagina(
+        inicio_competicoes, fim_competicoes, cursor=cursor_competicoes
+    ),
+    lutas=lambda: db_manager.listar_lutas_pagina(**filtros_lutas, cursor=cursor_lutas),
+)
+with area_competicoes:
+    tabela_paginada(
+        "pagina_competicoes", paginas["competicoes"], colunas=list(CompeticaoListada._fields),
+        column_config={"id": None, "nome_competicao": "Competição", "data_competicao": "Data", "classe": "Classe",
+                       "lutas": "Lutas"},
+    )
+with area_lutas:
+    tabela_paginada(
+        "pagina_lutas", paginas["lutas"], colunas=list(LutaListada._fields),
+        column_config={"id": None, "competicao": "Competição", "data_competicao": "Data", "atleta1": "Atleta 1",
+                       "atleta2": "Atleta 2", "vencedor": "Vencedor", "tempo_luta": "Tempo de Luta"},
+    )
+
+# Botão para excluir uma luta da página exibida
+if st.button("Excluir Luta", key="excluir_luta"):
+    excluir_luta_dialog(paginas["lutas"].linhas)
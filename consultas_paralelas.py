@@ -0,0 +1,69 @@
+"""
+Leituras independentes do banco disparadas em paralelo.
+
+Os métodos do DBManager são síncronos, mas cada chamada retira a própria conexão do pool (seguro entre threads).
+Uma página que precisa de várias leituras independentes (agregados do relatório, dados da seleção e nomes dos
+atletas, perfis dos dois atletas de uma luta) as dispara juntas com `reunir(...)`: cada chamada roda em uma
+thread do executor do processo, e a espera passa a ser a da leitura mais lenta, em vez da soma de todas.
+A interface continua síncrona para as páginas: `reunir` só retorna quando todas as leituras terminam.
+
+Um pool de threads sobre o psycopg2 (e não asyncio com um driver assíncrono) reaproveita o DBManager, o pool de
+conexões, o cache e a instrumentação sem duplicar as consultas. As chamadas herdam o contexto de quem as
+disparou, então os comandos continuam associados ao rerun em `instrumentacao`. Elas rodam fora da thread do
+script, portanto não podem usar o Streamlit (st.session_state, widgets): esses valores são lidos antes.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from db_manager import get_db_manager
+
+
+class ExecutorConsultas:
+    """Executa chamadas do DBManager em paralelo, em um número limitado de threads."""
+
+    def __init__(self, max_threads):
+        self.max_threads = max_threads
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="consultas")
+        self._local = threading.local()
+
+    def _executar(self, funcao, args):
+        self._local.trabalhador = True
+        return funcao(*args)
+
+    def submeter(self, funcao, *args):
+        """Agenda `funcao(*args)` no contexto atual e retorna o Future."""
+        contexto = contextvars.copy_context()
+        return self._executor.submit(contexto.run, self._executar, funcao, args)
+
+    def reunir(self, **chamadas):
+        """
+        Executa em paralelo as chamadas {nome: funcao ou (funcao, *args)} e retorna {nome: resultado}.
+        Se alguma chamada levantar uma exceção, ela é relançada depois que todas terminarem. Dentro de uma
+        chamada do próprio executor, as chamadas rodam em sequência (esperar por outras threads do executor
+        poderia travá-lo).
+        """
+        chamadas = {nome: chamada if isinstance(chamada, tuple) else (chamada,) for nome, chamada in chamadas.items()}
+        if len(chamadas) < 2 or getattr(self._local, "trabalhador", False):
+            return {nome: funcao(*args) for nome, (funcao, *args) in chamadas.items()}
+        futuros = {nome: self.submeter(funcao, *args) for nome, (funcao, *args) in chamadas.items()}
+        wait(futuros.values())
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+
+@st.cache_resource
+def obter_executor_consultas():
+    """
+    Retorna o executor de leituras do processo, compartilhado pelas sessões.
+    O número de threads é a chave opcional CONSULTAS_PARALELAS em st.secrets["DB"] (padrão: metade do pool de
+    conexões), deixando conexões livres para as gravações e as demais sessões.
+    """
+    maximo = st.secrets["DB"].get("CONSULTAS_PARALELAS", get_db_manager().pool.maxconn // 2)
+    return ExecutorConsultas(max(1, int(maximo)))
+
+
+def reunir(**chamadas):
+    """Executa as leituras independentes em paralelo no executor do processo (ver `ExecutorConsultas.reunir`)."""
+    return obter_executor_consultas().reunir(**chamadas)
@@ -0,0 +1,167 @@
+"""
+Gerador de dados sintéticos para bancos de teste descartáveis.
+
+Popula clubes, atletas, competições, confrontos, ações e shidos com volumes realistas,
+para verificar planos de consulta e medir o DBManager com tabelas grandes (ver `benchmark.py`).
+As lutas são entre atletas da mesma categoria, a quantidade de ações varia de luta para luta e os
+tempos de ações e shidos têm precisão de milissegundos, como os marcados com o relógio de luta.
+"""
+import random
+from datetime import date, timedelta
+
+from psycopg2.extras import execute_values
+
+from vocabulario import (
+    DIRECOES_NEWAZA, EFETIVIDADES_GOLPE, EFETIVIDADES_NEWAZA, GRUPOS_GOLPE, PARTIDAS_NEWAZA, PEGADAS, TIPOS_SHIDO,
+)
+
+CLUBES = ["Minas", "Outros", "Internacional"]
+CATEGORIAS = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+CLASSES = ['Cadete', 'Junior', 'Sênior', 'Treino']
+
+# Atletas por clube nos clubes sintéticos acrescentados aos CLUBES
+ATLETAS_POR_CLUBE = 25
+
+# Duração máxima de uma luta marcada (tempo regulamentar e golden score), em milissegundos
+DURACAO_MAXIMA_MS = 300_000
+
+TAMANHO_LOTE = 10_000
+
+
+def popular(conn, n_atletas=600, n_competicoes=60, lutas_por_competicao=50, acoes_por_luta=100,
+            shidos_por_luta=3, semente=42, escala=1):
+    """
+    Insere dados sintéticos na conexão informada, recalcula os perfis materializados e executa ANALYZE.
+    Com os valores padrão (escala 1) são gerados 3.000 confrontos, cerca de 300.000 ações e 9.000 shidos.
+    `escala` multiplica atletas, clubes e competições (e, portanto, confrontos, ações e shidos): 100 gera
+    cem vezes o volume de referência.
+    Levanta RuntimeError se o banco já tiver dados sintéticos: os nomes repetidos violariam as restrições
+    UNIQUE de atletas e competições.
+    Retorna um dicionário com a quantidade de linhas inseridas por tabela.
+    """
+    aleatorio = random.Random(semente)
+    n_atletas = max(2, round(n_atletas * escala))
+    n_competicoes = max(1, round(n_competicoes * escala))
+    clubes = CLUBES + [f"Clube Sintético {i}" for i in range(n_atletas // ATLETAS_POR_CLUBE)]
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM atletas WHERE nome LIKE 'Atleta Sintético %')
+                OR EXISTS (SELECT 1 FROM campeonato WHERE nome_competicao LIKE 'Competição Sintética %');
+        """)
+        if cursor.fetchone()[0]:
+            raise RuntimeError("O banco já tem dados sintéticos; use --sem-popular ou um banco vazio.")
+
+        atletas = [
+            (f"Atleta Sintético {i}", aleatorio.choice(CATEGORIAS),
+             date(aleatorio.randint(1985, 2010), 1, 1), aleatorio.choice(clubes))
+            for i in range(n_atletas)
+        ]
+        atleta_ids = [linha[0] for linha in execute_values(
+            cursor, "INSERT INTO atletas (nome, categoria, data_nasc, clube) VALUES %s RETURNING id;",
+            atletas, page_size=1000, fetch=True)]
+
+        # Lutas apenas entre atletas da mesma categoria (categorias com um único atleta ficam de fora)
+        por_categoria = {}
+        for atleta_id, (_, categoria, _, _) in zip(atleta_ids, atletas):
+            por_categoria.setdefault(categoria, []).append(atleta_id)
+        categorias = [categoria for categoria, ids in por_categoria.items() if len(ids) > 1]
+
+        inicio = date(2020, 1, 1)
+        competicoes = [
+            (f"Competição Sintética {i}", inicio + timedelta(days=7 * i), aleatorio.choice(CLASSES))
+            for i in range(n_competicoes)
+        ]
+        competicao_ids = [linha[0] for linha in execute_values(
+            cursor, "INSERT INTO campeonato (nome_competicao, data_competicao, classe) VALUES %s RETURNING id;",
+            competicoes, page_size=1000, fetch=True)]
+
+        confrontos = []
+        for campeonato_id in competicao_ids:
+            for _ in range(lutas_por_competicao):
+                categoria = aleatorio.choice(categorias)
+                atleta1, atleta2 = aleatorio.sample(por_categoria[categoria], 2)
+                confrontos.append((campeonato_id, atleta1, atleta2, aleatorio.choice((atleta1, atleta2)),
+                                   categoria, _tempo(aleatorio.randint(60_000, DURACAO_MAXIMA_MS))))
+        linhas = execute_values(
+            cursor,
+            """
+            INSERT INTO confrontos (campeonato_id, atleta1_id, atleta2_id, vencedor_id, categoria, tempo_luta)
+            VALUES %s RETURNING id, atleta1_id, atleta2_id;
+            """,
+            confrontos, page_size=1000, fetch=True)
+
+        total_acoes = 0
+        total_shidos = 0
+        lote_acoes = []
+        lote_shidos = []
+        for confronto_id, atleta1, atleta2 in linhas:
+            for _ in range(aleatorio.randint(acoes_por_luta // 2, acoes_por_luta * 3 // 2)):
+                autor = aleatorio.choice((atleta1, atleta2))
+                newaza = aleatorio.random() < 0.3
+                lote_acoes.append((
+                    confronto_id, autor, aleatorio.randint(1, 4), aleatorio.choice(GRUPOS_GOLPE),
+                    _tempo(aleatorio.randrange(DURACAO_MAXIMA_MS)), aleatorio.choice(PEGADAS),
+                    aleatorio.choice(PEGADAS), aleatorio.choice(EFETIVIDADES_GOLPE), newaza, autor,
+                    aleatorio.choice(DIRECOES_NEWAZA) if newaza else None,
+                    aleatorio.choice(PARTIDAS_NEWAZA) if newaza else None,
+                    aleatorio.choice(EFETIVIDADES_NEWAZA) if newaza else None,
+                ))
+            for _ in range(shidos_por_luta):
+                lote_shidos.append((confronto_id, aleatorio.choice((atleta1, atleta2)),
+                                    aleatorio.choice(TIPOS_SHIDO), _tempo(aleatorio.randrange(DURACAO_MAXIMA_MS))))
+            if len(lote_acoes) >= TAMANHO_LOTE:
+                total_acoes += _inserir_acoes(cursor, lote_acoes)
+                lote_acoes = []
+            if len(lote_shidos) >= TAMANHO_LOTE:
+                total_shidos += _inserir_shidos(cursor, lote_shidos)
+                lote_shidos = []
+        total_acoes += _inserir_acoes(cursor, lote_acoes)
+        total_shidos += _inserir_shidos(cursor, lote_shidos)
+
+        # Perfis materializados dos atletas gerados, em lotes para limitar o tamanho de cada comando
+        for posicao in range(0, len(atleta_ids), 1000):
+            cursor.execute("SELECT atualizar_perfis_atletas(%s::int[]);", (atleta_ids[posicao:posicao + 1000],))
+
+        # Atualiza as estatísticas para que o planejador enxergue os volumes gerados
+        for tabela in ("atletas", "campeonato", "confrontos", "acoes", "shido", "perfil_atleta"):
+            cursor.execute(f"ANALYZE {tabela};")
+        conn.commit()
+
+    return {
+        "atletas": len(atleta_ids),
+        "clubes": len(clubes),
+        "campeonato": len(competicao_ids),
+        "confrontos": len(linhas),
+        "acoes": total_acoes,
+        "shido": total_shidos,
+    }
+
+
+def _tempo(milissegundos):
+    """Tempo de luta no formato 'HH:MM:SS.mmm' aceito pelas colunas INTERVAL."""
+    segundos, milissegundos = divmod(milissegundos, 1000)
+    minutos, segundos = divmod(segundos, 60)
+    return f"00:{minutos:02d}:{segundos:02d}.{milissegundos:03d}"
+
+
+def _inserir_acoes(cursor, lote):
+    if not lote:
+        return 0
+    execute_values(
+        cursor,
+        """
+        INSERT INTO acoes (confronto_id, atleta_id, quadrante, grupo_golpe, tempo_ocorrido, mao_direita,
+                           mao_esquerda, efetividade_golpe, newaza, atleta_id_nw, direcao, partida,
+                           efetividade_newaza)
+        VALUES %s;
+        """,
+        lote, page_size=1000)
+    return len(lote)
+
+
+def _inserir_shidos(cursor, lote):
+    if not lote:
+        return 0
+    execute_values(
+        cursor, "INSERT INTO shido (confronto_id, atleta_id, tipo, tempo) VALUES %s;", lote, page_size=1000)
+    return len(lote)
@@ -1,139 +1,648 @@
+import base64
+import csv
+import io
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
 import psycopg2
+import psycopg2.errors
+import psycopg2.pool
 import streamlit as st
-from datetime import date
+from psycopg2.extras import execute_values
 
-class DBManager:
-    def __init__(self):
-        try:
-            self.conn = psycopg2.connect(
-                host=st.secrets["DB"]["DB_HOST"],
-                port=st.secrets["DB"]["DB_PORT"],
-                database=st.secrets["DB"]["DB_NAME"],
-                user=st.secrets["DB"]["DB_USER"],
-                password=st.secrets["DB"]["DB_PASSWORD"],
-                sslmode="require"
-            )
-            self.cursor = self.conn.cursor()
-            print("Conexão bem-sucedida!")
-        except psycopg2.OperationalError as e:
-            print(f"Erro de conexão: {e}")
-            raise
+import instrumentacao
+from vocabulario import EFETIVIDADES_PONTUADAS
 
-    def check_connection(self):
-        if self.conn.closed:
-            raise Exception("A conexão com o banco de dados foi fechada.")
+# Colunas gravadas por evento nas inserções em lote (além de evento_uid)
+COLUNAS_ACAO = (
+    "confronto_id", "atleta_id", "quadrante", "grupo_golpe", "tempo_ocorrido", "mao_direita", "mao_esquerda",
+    "efetividade_golpe", "newaza", "atleta_id_nw", "direcao", "partida", "efetividade_newaza",
+)
+COLUNAS_SHIDO = ("confronto_id", "atleta_id", "tipo", "tempo")
 
-    def criar_tabelas(self):
-        comandos = [
-            """
-            CREATE TABLE IF NOT EXISTS atletas (
-                id SERIAL PRIMARY KEY,
-                nome TEXT NOT NULL,
-                categoria TEXT,
-                data_nasc DATE,
-                clube TEXT
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS campeonato (
-                id SERIAL PRIMARY KEY,
-                nome_competicao TEXT NOT NULL,
-                data_competicao DATE NOT NULL,
-                classe TEXT
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS confrontos (
-                id SERIAL PRIMARY KEY,
-                campeonato_id INT NOT NULL REFERENCES campeonato(id) ON DELETE CASCADE,
-                atleta1_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
-                atleta2_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
-                vencedor_id INT REFERENCES atletas(id) ON DELETE SET NULL,
-                categoria TEXT,
-                tempo_luta INTERVAL
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS acoes (
-                id SERIAL PRIMARY KEY,
-                confronto_id INT NOT NULL REFERENCES confrontos(id) ON DELETE CASCADE,
-                atleta_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
-                quadrante INT,
-                grupo_golpe TEXT,
-                tempo_ocorrido INTERVAL,
-                mao_direita TEXT,
-                mao_esquerda TEXT,
-                efetividade_golpe TEXT,
-                newaza BOOLEAN,
-                atleta_id_nw INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
-                direcao TEXT,
-                partida TEXT,
-                efetividade_newaza TEXT
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS shido (
-            id SERIAL PRIMARY KEY,
-            confronto_id INT NOT NULL REFERENCES confrontos(id) ON DELETE CASCADE,
-            atleta_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
-            tipo TEXT,
-            tempo INTERVAL
-            );
-            """
-        ]
+# Seleção de confrontos compartilhada pelas consultas de análise e de relatório.
+# Filtros nulos não restringem; as datas se referem à data da competição.
+SQL_SELECAO = """
+    WITH selecao AS (
+        SELECT c.id, c.campeonato_id, camp.data_competicao, c.categoria,
+               c.atleta1_id, c.atleta2_id, c.vencedor_id, c.tempo_luta
+        FROM confrontos c
+        JOIN campeonato camp ON camp.id = c.campeonato_id
+        WHERE (%(atleta_id)s::int IS NULL OR %(atleta_id)s IN (c.atleta1_id, c.atleta2_id))
+          AND (%(campeonato_id)s::int IS NULL OR c.campeonato_id = %(campeonato_id)s)
+          AND (%(confronto_id)s::int IS NULL OR c.id = %(confronto_id)s)
+          AND (%(categoria)s::text IS NULL OR c.categoria = %(categoria)s)
+          AND (%(data_inicio)s::date IS NULL OR camp.data_competicao >= %(data_inicio)s)
+          AND (%(data_fim)s::date IS NULL OR camp.data_competicao <= %(data_fim)s)
+    )
+"""
+
+
+# Exclusão e mesclagem de atletas em lotes: cada lote é uma transação curta, e um lote que esbarra em uma
+# linha bloqueada por uma gravação ao vivo desiste após TEMPO_ESPERA_BLOQUEIO e é repetido depois, até
+# TENTATIVAS_BLOQUEIO vezes. As subconsultas usam UNION (e não UNION ALL): uma ação do atleta em uma das lutas
+# removidas aparece nas duas, e as repetições contariam no limite do lote, encerrando a exclusão antes do fim.
+TAMANHO_LOTE_EXCLUSAO = 5000
+TEMPO_ESPERA_BLOQUEIO = "2s"
+TENTATIVAS_BLOQUEIO = 5
+
+SQL_EXCLUSAO_LOTE = {
+    "acoes": """
+        DELETE FROM acoes WHERE id IN (
+            SELECT id FROM acoes WHERE confronto_id = ANY(%(confrontos)s)
+            UNION SELECT id FROM acoes WHERE atleta_id = ANY(%(atletas)s)
+            UNION SELECT id FROM acoes WHERE atleta_id_nw = ANY(%(atletas)s)
+            LIMIT %(lote)s
+        );
+    """,
+    "shido": """
+        DELETE FROM shido WHERE id IN (
+            SELECT id FROM shido WHERE confronto_id = ANY(%(confrontos)s)
+            UNION SELECT id FROM shido WHERE atleta_id = ANY(%(atletas)s)
+            LIMIT %(lote)s
+        );
+    """,
+    "confrontos": """
+        DELETE FROM confrontos WHERE id IN (
+            SELECT id FROM confrontos WHERE id = ANY(%(confrontos)s) LIMIT %(lote)s
+        );
+    """,
+}
+
+# Mesclagem: (tabela, coluna) que referenciam atletas, reescritas dos duplicados para o atleta mantido
+COLUNAS_REFERENCIA_ATLETA = (
+    ("acoes", "atleta_id"), ("acoes", "atleta_id_nw"), ("shido", "atleta_id"),
+    ("confrontos", "atleta1_id"), ("confrontos", "atleta2_id"), ("confrontos", "vencedor_id"),
+)
+
+# Lutas em que a mesclagem poria o mesmo atleta dos dois lados (os dois atletas mesclados no mesmo mantido,
+# ou um duplicado mesclado no próprio adversário). Cada lado é buscado pelo seu índice de atleta.
+SQL_LUTAS_CONTRA_SI = """
+    WITH mapa AS (
+        SELECT * FROM unnest(%(duplicados)s::int[], %(mantidos)s::int[]) AS m (duplicado, mantido)
+    ), lutas AS (
+        SELECT c.id, c.atleta1_id, c.atleta2_id FROM confrontos c JOIN mapa ON mapa.duplicado = c.atleta1_id
+        UNION SELECT c.id, c.atleta1_id, c.atleta2_id FROM confrontos c JOIN mapa ON mapa.duplicado = c.atleta2_id
+    )
+    SELECT count(*) FROM lutas l
+    LEFT JOIN mapa m1 ON m1.duplicado = l.atleta1_id
+    LEFT JOIN mapa m2 ON m2.duplicado = l.atleta2_id
+    WHERE COALESCE(m1.mantido, l.atleta1_id) = COALESCE(m2.mantido, l.atleta2_id);
+"""
+
+# Busca dos seletores (typeahead): primeiro os nomes que começam pelo texto (índice B-tree do prefixo), depois os
+# mais parecidos (vizinhos mais próximos no índice de trigramas), no máximo `limite` de cada, sem repetições.
+# Com o texto vazio, todos casam com o prefixo e a busca devolve os primeiros na ordem de {ordem}.
+LIMITE_BUSCA = 20
+
+SQL_BUSCA_NOME = """
+    SELECT {colunas} FROM (
+        SELECT DISTINCT ON (id) * FROM (
+            (SELECT {colunas}, nome_normalizado, 0 AS grupo, 0::real AS distancia FROM {tabela}
+             WHERE nome_normalizado LIKE normalizar_nome(%(texto)s) || '%%' AND {filtros}
+             ORDER BY {ordem} LIMIT %(limite)s)
+            UNION ALL
+            (SELECT {colunas}, nome_normalizado, 1, normalizar_nome(%(texto)s) <<-> nome_normalizado FROM {tabela}
+             WHERE %(texto)s <> '' AND normalizar_nome(%(texto)s) <%% nome_normalizado AND {filtros}
+             ORDER BY normalizar_nome(%(texto)s) <<-> nome_normalizado LIMIT %(limite)s)
+        ) candidatos
+        ORDER BY id, grupo
+    ) resultados
+    ORDER BY grupo, distancia, {ordem}
+    LIMIT %(limite)s;
+"""
+
+
+# Listagens paginadas por chave (keyset): cada página começa depois da chave da última linha da anterior, que vai
+# no cursor. {chave} são as colunas da ordenação (selecionadas ao final de cada linha), {posicao} a comparação
+# com o cursor e {ordem} o ORDER BY; a ordenação sempre termina no id, então a chave é única.
+TAMANHO_PAGINA = 50
+
+ORDENACOES_LUTAS = {
+    "data": ("camp.data_competicao", "c.campeonato_id", "c.id"),
+    "cadastro": ("c.id",),
+}
+ORDENACOES_ATLETAS = {
+    "nome": ("nome", "id"),
+    "cadastro": ("id",),
+}
+ORDENACOES_COMPETICOES = {
+    "data": ("data_competicao", "id"),
+}
+
+SQL_PAGINA_LUTAS = """
+    SELECT c.id, camp.nome_competicao, camp.data_competicao, c.categoria,
+           a1.nome, a2.nome, v.nome, c.tempo_luta, {chave}
+    FROM confrontos c
+    JOIN campeonato camp ON camp.id = c.campeonato_id
+    JOIN atletas a1 ON a1.id = c.atleta1_id
+    JOIN atletas a2 ON a2.id = c.atleta2_id
+    LEFT JOIN atletas v ON v.id = c.vencedor_id
+    WHERE (%(campeonato_id)s::int IS NULL OR c.campeonato_id = %(campeonato_id)s)
+      AND (%(categoria)s::text IS NULL OR c.categoria = %(categoria)s)
+      AND (%(vencedor_id)s::int IS NULL OR c.vencedor_id = %(vencedor_id)s)
+      AND (NOT %(sem_vencedor)s OR c.vencedor_id IS NULL)
+      AND (%(data_inicio)s::date IS NULL OR camp.data_competicao >= %(data_inicio)s)
+      AND (%(data_fim)s::date IS NULL OR camp.data_competicao <= %(data_fim)s)
+      AND {posicao}
+    ORDER BY {ordem}
+    LIMIT %(limite)s;
+"""
+
+SQL_PAGINA_ATLETAS = """
+    SELECT id, nome, categoria, data_nasc, clube, {chave}
+    FROM atletas
+    WHERE (%(clube)s::text IS NULL OR clube = %(clube)s)
+      AND (%(categoria)s::text IS NULL OR categoria = %(categoria)s)
+      AND {posicao}
+    ORDER BY {ordem}
+    LIMIT %(limite)s;
+"""
+
+SQL_PAGINA_COMPETICOES = """
+    SELECT camp.id, camp.nome_competicao, camp.data_competicao, camp.classe,
+           (SELECT count(*) FROM confrontos c WHERE c.campeonato_id = camp.id) AS lutas, {chave}
+    FROM campeonato camp
+    WHERE (%(data_inicio)s::date IS NULL OR data_competicao >= %(data_inicio)s)
+      AND (%(data_fim)s::date IS NULL OR data_competicao <= %(data_fim)s)
+      AND {posicao}
+    ORDER BY {ordem}
+    LIMIT %(limite)s;
+"""
+
+
+# Conjuntos de dados para exportação: cada consulta parte da seleção de confrontos (SQL_SELECAO)
+# e junta os nomes de atletas e competições
+CONSULTAS_EXPORTACAO = {
+    "confrontos": """
+        SELECT s.id AS confronto_id, camp.nome_competicao, camp.data_competicao, camp.classe, s.categoria,
+               a1.nome AS atleta1, a1.clube AS clube1, a2.nome AS atleta2, a2.clube AS clube2,
+               v.nome AS vencedor, s.tempo_luta
+        FROM selecao s
+        JOIN campeonato camp ON camp.id = s.campeonato_id
+        JOIN atletas a1 ON a1.id = s.atleta1_id
+        JOIN atletas a2 ON a2.id = s.atleta2_id
+        LEFT JOIN atletas v ON v.id = s.vencedor_id
+        ORDER BY camp.data_competicao, s.id
+    """,
+    "acoes": """
+        SELECT a.id AS acao_id, a.confronto_id, camp.nome_competicao, camp.data_competicao, s.categoria,
+               at.nome AS atleta, at.clube, a.quadrante, a.grupo_golpe, a.tempo_ocorrido, a.tempo_ms,
+               a.mao_direita, a.mao_esquerda, a.efetividade_golpe, a.newaza, nw.nome AS atleta_newaza,
+               a.direcao, a.partida, a.efetividade_newaza
+        FROM selecao s
+        JOIN acoes a ON a.confronto_id = s.id
+        JOIN campeonato camp ON camp.id = s.campeonato_id
+        JOIN atletas at ON at.id = a.atleta_id
+        LEFT JOIN atletas nw ON nw.id = a.atleta_id_nw
+        WHERE (%(atleta_id)s::int IS NULL OR a.atleta_id = %(atleta_id)s)
+        ORDER BY a.confronto_id, a.id
+    """,
+    "shido": """
+        SELECT sh.id AS shido_id, sh.confronto_id, camp.nome_competicao, camp.data_competicao, s.categoria,
+               at.nome AS atleta, at.clube, sh.tipo, sh.tempo, sh.tempo_ms
+        FROM selecao s
+        JOIN shido sh ON sh.confronto_id = s.id
+        JOIN campeonato camp ON camp.id = s.campeonato_id
+        JOIN atletas at ON at.id = sh.atleta_id
+        WHERE (%(atleta_id)s::int IS NULL OR sh.atleta_id = %(atleta_id)s)
+        ORDER BY sh.confronto_id, sh.id
+    """,
+}
+
+
+class ContagemGolpe(NamedTuple):
+    """Ações por grupo de golpe e efetividade; `subtotal` marca as linhas de total do grupo (efetividade None)
+    e o total geral (grupo e efetividade None)."""
+    grupo_golpe: Optional[str]
+    efetividade_golpe: Optional[str]
+    total: int
+    subtotal: bool
+
+
+class ContagemQuadrante(NamedTuple):
+    """Ações e ações pontuadas por quadrante do tatame e grupo de golpe."""
+    quadrante: Optional[int]
+    grupo_golpe: Optional[str]
+    total: int
+    pontuadas: int
+
+
+class ContagemShido(NamedTuple):
+    """Shidos por tipo e tempo; `subtotal` marca as linhas de total por tipo (tempo None)."""
+    tipo: Optional[str]
+    tempo: Optional[timedelta]
+    total: int
+    subtotal: bool
+
+
+class DesempenhoAtleta(NamedTuple):
+    """Lutas, vitórias (confrontos.vencedor_id) e taxa de vitória de um atleta na seleção."""
+    atleta_id: int
+    nome: str
+    lutas: int
+    vitorias: int
+    taxa_vitoria: float
+
+
+class ContagemJanela(NamedTuple):
+    """Ações e ações pontuadas em uma janela de tempo de luta que começa em `inicio_s` segundos."""
+    inicio_s: int
+    total: int
+    pontuadas: int
+
+
+class PerfilAtleta(NamedTuple):
+    """
+    Perfil de scouting materializado de um atleta (tabela perfil_atleta).
+    As distribuições são dicionários {chave: {"total", "pontuadas"}} para pegadas e grupos de golpe,
+    {chave: {"total", "sucessos"}} para ne-waza e {chave: total} para quadrantes e shidos.
+    """
+    atleta_id: int
+    lutas: int
+    vitorias: int
+    acoes: int
+    pegadas: dict
+    quadrantes: dict
+    grupos_golpe: dict
+    newaza_direcao: dict
+    newaza_partida: dict
+    shidos_tipo: dict
+    shidos_minuto: dict
+    atualizado_em: object
+
+
+class FalhaGravacao(NamedTuple):
+    """
+    Falha de uma gravação de eventos. `rejeitado` indica dados recusados pelo banco (IntegrityError, DataError),
+    que nunca serão aceitos; nos demais casos (conexão perdida, banco indisponível) a gravação deve ser repetida.
+    """
+    mensagem: str
+    rejeitado: bool
+
+
+class DependentesAtletas(NamedTuple):
+    """
+    Linhas removidas com a exclusão de atletas: os atletas, os confrontos em que lutaram e as ações e shidos
+    desses confrontos (ou registrados para os atletas em outros confrontos).
+    """
+    atletas: int
+    confrontos: int
+    acoes: int
+    shidos: int
+
+
+class CandidatoDuplicado(NamedTuple):
+    """Par de atletas com nomes semelhantes; `lutas` vem do perfil materializado."""
+    atleta1_id: int
+    nome1: str
+    clube1: Optional[str]
+    data_nasc1: Optional[date]
+    lutas1: int
+    atleta2_id: int
+    nome2: str
+    clube2: Optional[str]
+    data_nasc2: Optional[date]
+    lutas2: int
+    semelhanca: float
+
+
+class Pagina(NamedTuple):
+    """Uma página de uma listagem paginada por chave; `proximo` é o cursor da página seguinte (None na última)."""
+    linhas: list
+    proximo: Optional[str]
+
+
+class LutaListada(NamedTuple):
+    id: int
+    competicao: str
+    data_competicao: date
+    categoria: Optional[str]
+    atleta1: str
+    atleta2: str
+    vencedor: Optional[str]
+    tempo_luta: Optional[timedelta]
+
+
+class CompeticaoListada(NamedTuple):
+    id: int
+    nome_competicao: str
+    data_competicao: date
+    classe: str
+    lutas: int
+
+def _atualizar_perfis(cursor, atleta_ids):
+    """Recalcula, na transação do cursor, o perfil materializado dos atletas informados (None é ignorado)."""
+    atleta_ids = sorted({atleta_id for atleta_id in atleta_ids if atleta_id is not None})
+    if atleta_ids:
+        cursor.execute("SELECT atualizar_perfis_atletas(%s::int[]);", (atleta_ids,))
+
+
+def _texto_busca(texto):
+    """Texto digitado no seletor, sem os curingas do LIKE (usado como prefixo em SQL_BUSCA_NOME)."""
+    return (texto or "").translate(str.maketrans("%_\\", "   ")).strip()
+
+
+def _codificar_cursor(ordenacao, valores):
+    """Cursor opaco (base64 de JSON) com a ordenação e os valores da chave da última linha de uma página."""
+    valores = [valor.isoformat() if isinstance(valor, date) else valor for valor in valores]
+    return base64.urlsafe_b64encode(json.dumps([ordenacao, valores]).encode()).decode()
+
+
+def _decodificar_cursor(cursor, ordenacao):
+    """Valores da chave guardados no cursor, ou None se ele for inválido ou de outra ordenação."""
+    if not cursor:
+        return None
+    try:
+        ordenacao_cursor, valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    return valores if ordenacao_cursor == ordenacao else None
+
+def _parametros_selecao(atleta_id=None, campeonato_id=None, confronto_id=None, categoria=None,
+                        data_inicio=None, data_fim=None):
+    return {
+        "atleta_id": atleta_id, "campeonato_id": campeonato_id, "confronto_id": confronto_id,
+        "categoria": categoria, "data_inicio": data_inicio, "data_fim": data_fim,
+    }
+
+
+class PoolConexoes:
+    """
+    Pool de conexões limitado e seguro entre threads, compartilhado por todas as sessões do processo.
+
+    As conexões são retiradas do pool a cada operação (`with pool.conexao() as conn:`) e devolvidas ao final,
+    sempre sem transação pendente. Conexões fechadas ou ociosas há mais de `idade_verificacao` segundos passam
+    por um `SELECT 1` antes de serem entregues e são reabertas se estiverem quebradas.
+    Quando todas as `maxconn` conexões estão em uso, a retirada aguarda até `timeout` segundos por uma vaga.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=30, idade_verificacao=60, **parametros):
+        self._pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, **parametros)
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._ultimo_uso = {}
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.idade_verificacao = idade_verificacao
+        self._metricas = {
+            "checkouts": 0,
+            "reconexoes": 0,
+            "timeouts": 0,
+            "em_uso": 0,
+            "espera_total": 0.0,
+            "espera_max": 0.0,
+        }
+
+    def _devolver(self, conn, fechar=False):
+        if fechar:
+            self._ultimo_uso.pop(id(conn), None)
+        else:
+            self._ultimo_uso[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=fechar)
+
+    def _validar(self, conn):
+        """Garante que a conexão retirada do pool está viva, reabrindo-a se necessário."""
+        ultimo_uso = self._ultimo_uso.get(id(conn))
+        if not conn.closed and (ultimo_uso is None or time.monotonic() - ultimo_uso < self.idade_verificacao):
+            return conn
+        if not conn.closed:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1;")
+                conn.rollback()
+                return conn
+            except psycopg2.Error as e:
+                print("Conexão inválida descartada do pool:", e)
+        self._devolver(conn, fechar=True)
+        with self._lock:
+            self._metricas["reconexoes"] += 1
+        return self._pool.getconn()
+
+    @contextmanager
+    def conexao(self):
+        """Retira uma conexão do pool durante o bloco `with` e a devolve ao final, desfazendo transações pendentes."""
+        inicio = time.perf_counter()
+        if not self._vagas.acquire(timeout=self.timeout):
+            with self._lock:
+                self._metricas["timeouts"] += 1
+            raise psycopg2.pool.PoolError("Tempo esgotado aguardando uma conexão livre no pool.")
+        espera = time.perf_counter() - inicio
         try:
-            for comando in comandos:
-                self.cursor.execute(comando)
-            self.conn.commit()
-            print("Tabelas criadas com sucesso!")
-        except Exception as e:
-            if not self.conn.closed:
-                self.conn.rollback()
-            print("Erro ao criar tabelas:", e)
+            conn = self._validar(self._pool.getconn())
+        except Exception:
+            self._vagas.release()
             raise
-        
-    def rollback(self):
-        self.conn.rollback()
+        instrumentacao.registro.registrar("conexao", "checkout", time.perf_counter() - inicio)
+        with self._lock:
+            self._metricas["checkouts"] += 1
+            self._metricas["em_uso"] += 1
+            self._metricas["espera_total"] += espera
+            self._metricas["espera_max"] = max(self._metricas["espera_max"], espera)
+        try:
+            yield conn
+        finally:
+            try:
+                if not conn.closed:
+                    conn.rollback()
+            except psycopg2.Error:
+                pass
+            self._devolver(conn, fechar=bool(conn.closed))
+            with self._lock:
+                self._metricas["em_uso"] -= 1
+            self._vagas.release()
+
+    def metricas(self):
+        """
+        Retorna um dicionário com as métricas do pool:
+        checkouts, reconexoes, timeouts, em_uso, tamanho_maximo, espera_total, espera_max e espera_media (segundos).
+        """
+        with self._lock:
+            metricas = dict(self._metricas)
+        metricas["tamanho_maximo"] = self.maxconn
+        metricas["espera_media"] = metricas["espera_total"] / metricas["checkouts"] if metricas["checkouts"] else 0.0
+        return metricas
+
+    def fechar(self):
+        """Fecha todas as conexões do pool."""
+        self._pool.closeall()
+
+
+class CacheTTL:
+    """
+    Cache em memória para listas de referência (atletas, competições), seguro entre threads.
+
+    Cada entrada expira após `ttl` segundos e, acima de `max_entradas`, as menos usadas são descartadas.
+    As chaves são tuplas cujo primeiro elemento é o grupo ("atletas", "competicoes"); as escritas chamam
+    `invalidar(grupo)`, e uma carga iniciada antes da invalidação não é gravada no cache.
+    """
+
+    def __init__(self, ttl=300, max_entradas=64):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._dados = OrderedDict()
+        self._geracoes = defaultdict(int)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, carregar):
+        """Retorna o valor em cache para a chave ou chama `carregar()` e guarda o resultado."""
+        grupo = chave[0]
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and item[0] > time.monotonic():
+                self._dados.move_to_end(chave)
+                self.acertos += 1
+                return item[1]
+            self.falhas += 1
+            geracao = self._geracoes[grupo]
+
+        valor = carregar()
+
+        with self._lock:
+            if self._geracoes[grupo] == geracao:
+                self._dados[chave] = (time.monotonic() + self.ttl, valor)
+                self._dados.move_to_end(chave)
+                while len(self._dados) > self.max_entradas:
+                    self._dados.popitem(last=False)
+        return valor
+
+    def invalidar(self, *grupos):
+        """Remove as entradas dos grupos informados (ou de todos, se nenhum for informado)."""
+        with self._lock:
+            if not grupos:
+                grupos = {chave[0] for chave in self._dados} | set(self._geracoes)
+            for grupo in grupos:
+                self._geracoes[grupo] += 1
+            for chave in [chave for chave in self._dados if chave[0] in grupos]:
+                del self._dados[chave]
+
+    def estatisticas(self):
+        """Retorna um dicionário com acertos, falhas, entradas e taxa_acerto."""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "entradas": len(self._dados),
+                "taxa_acerto": self.acertos / total if total else 0.0,
+            }
+
+
+def criar_pool():
+    """
+    Cria o pool de conexões a partir de `st.secrets["DB"]`.
+    Os limites podem ser ajustados com as chaves opcionais POOL_MIN, POOL_MAX, POOL_TIMEOUT e POOL_IDADE_VERIFICACAO.
+    Os cursores registram a duração de cada comando (ver `instrumentacao`).
+    """
+    config = st.secrets["DB"]
+    try:
+        pool = PoolConexoes(
+            minconn=int(config.get("POOL_MIN", 1)),
+            maxconn=int(config.get("POOL_MAX", 10)),
+            timeout=float(config.get("POOL_TIMEOUT", 30)),
+            idade_verificacao=float(config.get("POOL_IDADE_VERIFICACAO", 60)),
+            host=config["DB_HOST"],
+            port=config["DB_PORT"],
+            database=config["DB_NAME"],
+            user=config["DB_USER"],
+            password=config["DB_PASSWORD"],
+            sslmode="require",
+            cursor_factory=instrumentacao.CursorInstrumentado,
+        )
+        print("Conexão bem-sucedida!")
+        return pool
+    except psycopg2.OperationalError as e:
+        print(f"Erro de conexão: {e}")
+        raise
+
+
+class DBManager:
+    def __init__(self, pool=None, cache=None):
+        self.pool = pool or criar_pool()
+        self.cache = cache or CacheTTL()
+
+    def _consultar(self, sql, parametros=None):
+        """Executa uma consulta de leitura em uma conexão do pool e retorna todas as linhas."""
+        with self.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return cursor.fetchall()
+
+    def _consultar_pagina(self, sql, chave, descendente, parametros, cursor, limite, tipo=None):
+        """
+        Executa uma listagem paginada por chave (SQL_PAGINA_*): `chave` são as colunas da ordenação, e a página
+        começa depois dos valores guardados em `cursor` (None para a primeira). Retorna uma Pagina, com as
+        linhas convertidas por `tipo` (NamedTuple), se informado.
+        """
+        ordenacao = [list(chave), descendente]
+        valores = _decodificar_cursor(cursor, ordenacao)
+        posicao = "TRUE"
+        if valores is not None and len(valores) == len(chave):
+            marcadores = ", ".join(f"%(cursor_{i})s" for i in range(len(chave)))
+            posicao = f"({', '.join(chave)}) {'<' if descendente else '>'} ({marcadores})"
+            parametros = {**parametros, **{f"cursor_{i}": valor for i, valor in enumerate(valores)}}
+        direcao = "DESC" if descendente else "ASC"
+        ordem = ", ".join(f"{coluna} {direcao}" for coluna in chave)
+        sql = sql.format(chave=", ".join(chave), posicao=posicao, ordem=ordem)
+
+        # Uma linha a mais indica que existe a próxima página
+        linhas = self._consultar(sql, {**parametros, "limite": limite + 1})
+        proximo = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo = _codificar_cursor(ordenacao, linhas[-1][-len(chave):])
+        linhas = [linha[:-len(chave)] for linha in linhas]
+        return Pagina([tipo(*linha) for linha in linhas] if tipo else linhas, proximo)
+
+    def metricas_pool(self):
+        """Retorna as métricas do pool de conexões (ver `PoolConexoes.metricas`)."""
+        return self.pool.metricas()
+
+    def estatisticas_cache(self):
+        """Retorna os acertos e falhas do cache de listas (ver `CacheTTL.estatisticas`)."""
+        return self.cache.estatisticas()
 
     def adicionar_atleta(self, nome, categoria, ano_nascimento, clube):
         """
         Adiciona um novo atleta na tabela atletas.
         O ano de nascimento é convertido para uma data com o dia 01/01.
-        Antes de inserir, verifica se já existe um atleta com o mesmo nome, data de nascimento e clube.
+        Atletas com o mesmo nome, data de nascimento e clube são recusados pela restrição
+        uq_atletas_nome_nasc_clube, em um único comando INSERT ... ON CONFLICT.
         """
         try:
             # Converte o ano para uma data (assumindo 1 de janeiro como data de nascimento)
             data_nasc = date(int(ano_nascimento), 1, 1)
-            
-            # Verificar se já existe atleta com o mesmo nome, data de nascimento e clube
-            check_sql = """
-                SELECT id FROM atletas
-                WHERE nome = %s AND data_nasc = %s AND clube = %s;
-            """
-            self.cursor.execute(check_sql, (nome, data_nasc, clube))
-            existente = self.cursor.fetchone()
-            
-            if existente:
-                mensagem = "Atleta já cadastrado com este nome, data de nascimento e clube."
-                print(mensagem)
-                return mensagem
-            
-            # Se não existir, inserir o novo atleta
+
             sql = """
                 INSERT INTO atletas (nome, categoria, data_nasc, clube)
                 VALUES (%s, %s, %s, %s)
+                ON CONFLICT ON CONSTRAINT uq_atletas_nome_nasc_clube DO NOTHING
                 RETURNING id;
             """
-            self.cursor.execute(sql, (nome, categoria, data_nasc, clube))
-            id_atleta = self.cursor.fetchone()[0]
-            self.conn.commit()
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, (nome, categoria, data_nasc, clube))
+                registro = cursor.fetchone()
+
+                if not registro:
+                    mensagem = "Atleta já cadastrado com este nome, data de nascimento e clube."
+                    print(mensagem)
+                    return mensagem
+
+                id_atleta = registro[0]
+                conn.commit()
+            self.cache.invalidar("atletas")
             print(f"Atleta inserido com ID: {id_atleta}")
             return id_atleta
         except Exception as e:
-            self.conn.rollback()
             print("Erro ao adicionar atleta:", e)
             return str(e)
-        
+
     def editar_atleta(self, atleta_id, nome, categoria, ano_nascimento, clube):
         """
         Edita os dados de um atleta existente na tabela atletas.
@@ -141,114 +650,328 @@ class DBManager:
         Verifica se o atleta existe antes da atualização.
         """
         try:
-            self.check_connection()
             # Converte o ano para uma data
             data_nasc = date(int(ano_nascimento), 1, 1)
-            
-            # Verificar se o atleta com o id informado existe
-            check_sql = "SELECT id FROM atletas WHERE id = %s;"
-            self.cursor.execute(check_sql, (atleta_id,))
-            registro = self.cursor.fetchone()
-            
-            if not registro:
-                mensagem = f"Atleta com ID {atleta_id} não encontrado."
-                print(mensagem)
-                return mensagem
-
-            # Atualiza os dados do atleta
-            update_sql = """
-                UPDATE atletas
-                SET nome = %s, categoria = %s, data_nasc = %s, clube = %s
-                WHERE id = %s
-                RETURNING id;
-            """
-            self.cursor.execute(update_sql, (nome, categoria, data_nasc, clube, atleta_id))
-            id_atualizado = self.cursor.fetchone()[0]
-            self.conn.commit()
+
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                # Atualiza os dados do atleta; nenhuma linha retornada indica que o ID não existe
+                update_sql = """
+                    UPDATE atletas
+                    SET nome = %s, categoria = %s, data_nasc = %s, clube = %s
+                    WHERE id = %s
+                    RETURNING id;
+                """
+                cursor.execute(update_sql, (nome, categoria, data_nasc, clube, atleta_id))
+                registro = cursor.fetchone()
+
+                if not registro:
+                    mensagem = f"Atleta com ID {atleta_id} não encontrado."
+                    print(mensagem)
+                    return mensagem
+
+                id_atualizado = registro[0]
+                conn.commit()
+            self.cache.invalidar("atletas")
             print(f"Atleta com ID {id_atualizado} atualizado com sucesso!")
             return id_atualizado
         except Exception as e:
-            try:
-                self.conn.rollback()
-            except Exception as rollback_error:
-                print("Erro no rollback:", rollback_error)
             print("Erro ao editar atleta:", e)
             return str(e)
-            
+
+    def contar_dependentes_atletas(self, atleta_ids):
+        """
+        Prévia da exclusão de atletas: conta, pelos índices das chaves estrangeiras, as linhas que seriam removidas.
+        Retorna um DependentesAtletas ou None em caso de erro.
+        """
+        sql = """
+            WITH lutas AS (
+                SELECT id FROM confrontos WHERE atleta1_id = ANY(%(atletas)s)
+                UNION SELECT id FROM confrontos WHERE atleta2_id = ANY(%(atletas)s)
+            )
+            SELECT
+                (SELECT count(*) FROM atletas WHERE id = ANY(%(atletas)s)),
+                (SELECT count(*) FROM lutas),
+                (SELECT count(*) FROM (
+                    SELECT a.id FROM acoes a JOIN lutas l ON l.id = a.confronto_id
+                    UNION SELECT id FROM acoes WHERE atleta_id = ANY(%(atletas)s)
+                    UNION SELECT id FROM acoes WHERE atleta_id_nw = ANY(%(atletas)s)
+                ) x),
+                (SELECT count(*) FROM (
+                    SELECT sh.id FROM shido sh JOIN lutas l ON l.id = sh.confronto_id
+                    UNION SELECT id FROM shido WHERE atleta_id = ANY(%(atletas)s)
+                ) x);
+        """
+        try:
+            return DependentesAtletas(*self._consultar(sql, {"atletas": list(atleta_ids)})[0])
+        except Exception as e:
+            print("Erro ao contar dependentes dos atletas:", e)
+            return None
+
+    def _executar_em_lotes(self, sql, parametros):
+        """
+        Executa `sql` (um DELETE ou UPDATE limitado a %(lote)s linhas) em transações sucessivas até que um lote
+        afete menos linhas que o limite. Gera a quantidade de linhas afetadas por lote.
+        Levanta RuntimeError se um lote continuar bloqueado após TENTATIVAS_BLOQUEIO tentativas.
+        """
+        tentativas = 0
+        while True:
+            try:
+                with self.pool.conexao() as conn, conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = %s;", (TEMPO_ESPERA_BLOQUEIO,))
+                    cursor.execute(sql, parametros)
+                    afetadas = cursor.rowcount
+                    conn.commit()
+            except psycopg2.errors.LockNotAvailable as e:
+                # Linha em uso por uma gravação ao vivo: cede a vez e repete o lote
+                tentativas += 1
+                if tentativas >= TENTATIVAS_BLOQUEIO:
+                    raise RuntimeError(
+                        f"Linhas bloqueadas por outras gravações após {tentativas} tentativas; "
+                        "os lotes já excluídos permanecem. Tente novamente mais tarde."
+                    ) from e
+                time.sleep(tentativas)
+                continue
+            tentativas = 0
+            yield afetadas
+            if afetadas < parametros["lote"]:
+                break
+
+    def deletar_atletas_em_lotes(self, atleta_ids, tamanho_lote=TAMANHO_LOTE_EXCLUSAO):
+        """
+        Exclui atletas com todos os seus confrontos, ações e shidos em lotes de até `tamanho_lote` linhas,
+        cada um em sua própria transação, em vez de um único DELETE com cascata. Os perfis dos adversários
+        são recalculados ao final.
+
+        Gera tuplas (tabela, linhas_removidas) após cada lote, para acompanhar o progresso.
+        Como em `iterar_exportacao`, erros do banco são propagados: os lotes já gravados permanecem excluídos.
+        """
+        atleta_ids = sorted(set(atleta_ids))
+        with self.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, atleta1_id, atleta2_id FROM confrontos WHERE atleta1_id = ANY(%(atletas)s)
+                UNION SELECT id, atleta1_id, atleta2_id FROM confrontos WHERE atleta2_id = ANY(%(atletas)s);
+            """, {"atletas": atleta_ids})
+            lutas = cursor.fetchall()
+        adversarios = {atleta for _, atleta1, atleta2 in lutas for atleta in (atleta1, atleta2)} - set(atleta_ids)
+        parametros = {"atletas": atleta_ids, "confrontos": [luta[0] for luta in lutas], "lote": tamanho_lote}
+        for tabela in ("acoes", "shido", "confrontos"):
+            for removidas in self._executar_em_lotes(SQL_EXCLUSAO_LOTE[tabela], parametros):
+                yield tabela, removidas
+
+        # Sem dependentes restantes, a exclusão dos atletas (e de seus perfis, em cascata) é rápida
+        with self.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute("DELETE FROM atletas WHERE id = ANY(%s);", (atleta_ids,))
+            removidas = cursor.rowcount
+            adversarios = sorted(adversarios)
+            for posicao in range(0, len(adversarios), 500):
+                _atualizar_perfis(cursor, adversarios[posicao:posicao + 500])
+            conn.commit()
+        self.cache.invalidar("atletas")
+        yield "atletas", removidas
+
+    def mesclar_atletas(self, duplicados):
+        """
+        Mescla atletas duplicados em uma única transação: `duplicados` é um dicionário {duplicado_id: atleta_id}.
+        Cada coluna que referencia atletas em confrontos, acoes e shido é reescrita com um único UPDATE
+        (junção com o mapa duplicado -> mantido), os duplicados são excluídos e os perfis dos atletas mantidos
+        são recalculados. Os UPDATEs não alteram chaves referenciadas, então não bloqueiam a marcação ao vivo.
+
+        A mesclagem é recusada se algum confronto ficasse com o mesmo atleta dos dois lados (os duplicados
+        lutaram entre si ou contra o atleta mantido): esses atletas não são a mesma pessoa.
+
+        Retorna um dicionário {tabela: linhas_atualizadas} (com "atletas": duplicados excluídos) ou uma string
+        com a mensagem de erro.
+        """
+        mapa = {duplicado: mantido for duplicado, mantido in duplicados.items() if duplicado != mantido}
+        if set(mapa) & set(mapa.values()):
+            return "Um atleta não pode ser mantido e mesclado na mesma operação."
+        parametros = {"duplicados": list(mapa), "mantidos": list(mapa.values())}
+        try:
+            atualizadas = {}
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(SQL_LUTAS_CONTRA_SI, parametros)
+                lutas_contra_si = cursor.fetchone()[0]
+                if lutas_contra_si:
+                    return (f"A mesclagem poria o mesmo atleta dos dois lados de {lutas_contra_si} luta(s): "
+                            "atletas que se enfrentaram não podem ser mesclados.")
+                for tabela, coluna in COLUNAS_REFERENCIA_ATLETA:
+                    cursor.execute(f"""
+                        UPDATE {tabela} t SET {coluna} = m.mantido
+                        FROM unnest(%(duplicados)s::int[], %(mantidos)s::int[]) AS m (duplicado, mantido)
+                        WHERE t.{coluna} = m.duplicado;
+                    """, parametros)
+                    atualizadas[tabela] = atualizadas.get(tabela, 0) + cursor.rowcount
+                cursor.execute("DELETE FROM atletas WHERE id = ANY(%(duplicados)s);", parametros)
+                atualizadas["atletas"] = cursor.rowcount
+                _atualizar_perfis(cursor, mapa.values())
+                conn.commit()
+            self.cache.invalidar("atletas")
+            return atualizadas
+        except Exception as e:
+            print("Erro ao mesclar atletas:", e)
+            return str(e)
+
+    def candidatos_duplicados(self, limiar=0.6, limite=200):
+        """
+        Pares de atletas com nomes semelhantes (similaridade de trigramas do nome normalizado >= `limiar`) e
+        ano de nascimento compatível, do mais para o menos semelhante. Cada atleta consulta o índice GiST de
+        trigramas uma vez, em vez de ser comparado com todos os outros.
+        Retorna uma lista de CandidatoDuplicado ou [] em caso de erro.
+        """
+        sql = """
+            SELECT a.id, a.nome, a.clube, a.data_nasc, COALESCE(pa.lutas, 0),
+                   b.id, b.nome, b.clube, b.data_nasc, COALESCE(pb.lutas, 0),
+                   similarity(a.nome_normalizado, b.nome_normalizado) AS semelhanca
+            FROM atletas a
+            JOIN LATERAL (
+                SELECT id, nome, clube, data_nasc, nome_normalizado FROM atletas
+                WHERE nome_normalizado %% a.nome_normalizado AND id > a.id
+            ) b ON (a.data_nasc IS NULL OR b.data_nasc IS NULL
+                    OR extract(year FROM a.data_nasc) = extract(year FROM b.data_nasc))
+            LEFT JOIN perfil_atleta pa ON pa.atleta_id = a.id
+            LEFT JOIN perfil_atleta pb ON pb.atleta_id = b.id
+            ORDER BY semelhanca DESC, a.id, b.id
+            LIMIT %s;
+        """
+        try:
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true);", (str(limiar),))
+                cursor.execute(sql, (limite,))
+                return [CandidatoDuplicado(*linha) for linha in cursor.fetchall()]
+        except Exception as e:
+            print("Erro ao procurar atletas duplicados:", e)
+            return []
+
+    def deletar_atleta(self, atleta_id):
+        """
+        Exclui um atleta e todos os seus dados, em lotes (ver `deletar_atletas_em_lotes`), na thread atual.
+        As páginas usam o executor em segundo plano de `exclusoes`; este método serve a scripts e testes.
+        Retorna True se a exclusão for bem-sucedida, False em caso de erro.
+        """
+        try:
+            for _ in self.deletar_atletas_em_lotes([atleta_id]):
+                pass
+            print(f"Atleta com ID {atleta_id} removido com sucesso!")
+            return True
+        except Exception as e:
+            print("Erro ao deletar atleta:", e)
+            return False
+
     def listar_atletas_por_clube(self, clube):
         """
         Lista os atletas de um determinado clube.
         Retorna uma lista de tuplas com os campos (id, nome, categoria, data_nasc, clube).
         """
         try:
-            self.check_connection()
             sql = "SELECT id, nome, categoria, data_nasc, clube FROM atletas WHERE clube = %s;"
-            self.cursor.execute(sql, (clube,))
-            return self.cursor.fetchall()
+            return self.cache.obter(("atletas", "clube", clube), lambda: self._consultar(sql, (clube,)))
         except Exception as e:
             print("Erro ao listar atletas:", e)
             return []
-    
+
+    def listar_atletas_pagina(self, clube=None, categoria=None, cursor=None, ordem="nome", descendente=False,
+                              limite=TAMANHO_PAGINA):
+        """
+        Uma página de atletas, opcionalmente filtrados por clube e categoria, ordenados por nome ou por cadastro
+        (ORDENACOES_ATLETAS). `cursor` é o `proximo` da página anterior (None para a primeira).
+        Retorna uma Pagina com tuplas (id, nome, categoria, data_nasc, clube).
+        """
+        parametros = {"clube": clube, "categoria": categoria}
+        try:
+            return self._consultar_pagina(
+                SQL_PAGINA_ATLETAS, ORDENACOES_ATLETAS[ordem], descendente, parametros, cursor, limite
+            )
+        except Exception as e:
+            print("Erro ao listar atletas:", e)
+            return Pagina([], None)
+
     def adicionar_competicao(self, nome_competicao, data_competicao, classe):
         """
         Adiciona uma nova competição na tabela campeonato.
-        
+
         Parâmetros:
         - nome_competicao: Nome da competição (string, obrigatório)
         - data_competicao: Data da competição (date, obrigatório)
         - classe: Classe ou categoria da competição (string, opcional)
-        
+
         Retorna:
         - O id da competição inserida se a inserção for bem-sucedida,
         ou uma mensagem de erro se a competição já existir.
         """
         try:
-            # Verifica se já existe uma competição com o mesmo nome e data
-            check_sql = """
-                SELECT id FROM campeonato
-                WHERE nome_competicao = %s AND data_competicao = %s;
-            """
-            self.cursor.execute(check_sql, (nome_competicao, data_competicao))
-            existente = self.cursor.fetchone()
-            if existente:
-                mensagem = f"Competição '{nome_competicao}' na data {data_competicao} já cadastrada."
-                print(mensagem)
-                return None  # ou retorne a mensagem, conforme sua necessidade
-            
-            # Insere a nova competição
+            # Competições com o mesmo nome e data são recusadas pela restrição uq_campeonato_nome_data
             sql = """
                 INSERT INTO campeonato (nome_competicao, data_competicao, classe)
                 VALUES (%s, %s, %s)
+                ON CONFLICT ON CONSTRAINT uq_campeonato_nome_data DO NOTHING
                 RETURNING id;
             """
-            self.cursor.execute(sql, (nome_competicao, data_competicao, classe))
-            id_competicao = self.cursor.fetchone()[0]
-            self.conn.commit()
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, (nome_competicao, data_competicao, classe))
+                registro = cursor.fetchone()
+                if not registro:
+                    mensagem = f"Competição '{nome_competicao}' na data {data_competicao} já cadastrada."
+                    print(mensagem)
+                    return None  # ou retorne a mensagem, conforme sua necessidade
+
+                id_competicao = registro[0]
+                conn.commit()
+            self.cache.invalidar("competicoes")
             print(f"Competição inserida com ID: {id_competicao}")
             return id_competicao
         except Exception as e:
-            self.conn.rollback()
             print("Erro ao adicionar competição:", e)
             return str(e)
-        
+
     def listar_competicoes(self):
         """
         Lista todas as competições cadastradas na tabela campeonato.
         Retorna uma lista de tuplas no formato (id, nome_competicao, data_competicao, classe).
         """
         try:
-            self.check_connection()
             sql = "SELECT id, nome_competicao, data_competicao, classe FROM campeonato;"
-            self.cursor.execute(sql)
-            competicoes = self.cursor.fetchall()
-            return competicoes
+            return self.cache.obter(("competicoes", "todas"), lambda: self._consultar(sql))
         except Exception as e:
             print("Erro ao listar competições:", e)
             return []
-        
+
+    def buscar_competicoes(self, texto, limite=LIMITE_BUSCA):
+        """
+        Busca de competições para os seletores, como `buscar_atletas`; com o texto vazio, retorna as mais recentes.
+        Retorna até `limite` tuplas (id, nome_competicao, data_competicao, classe), como `listar_competicoes`.
+        """
+        sql = SQL_BUSCA_NOME.format(
+            colunas="id, nome_competicao, data_competicao, classe", tabela="campeonato",
+            ordem="data_competicao DESC, id DESC", filtros="TRUE",
+        )
+        try:
+            return self._consultar(sql, {"texto": _texto_busca(texto), "limite": limite})
+        except Exception as e:
+            print("Erro ao buscar competições:", e)
+            return []
+
+    def deletar_competicao(self, campeonato_id):
+        """
+        Exclui uma competição da tabela campeonato (os confrontos são removidos em cascata).
+        Retorna True se a deleção for bem-sucedida, False em caso de erro.
+        """
+        try:
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM campeonato WHERE id = %s;", (campeonato_id,))
+                conn.commit()
+            self.cache.invalidar("competicoes")
+            print(f"Competição com ID {campeonato_id} removida com sucesso!")
+            return True
+        except Exception as e:
+            print("Erro ao deletar competição:", e)
+            return False
+
     def listar_lutas_por_competicao(self, campeonato_id):
+        """
+        Lista as lutas de uma competição.
+        Retorna uma lista de tuplas no formato (id, categoria, atleta1, atleta2, vencedor, tempo_luta).
+        """
         try:
-            self.check_connection()
             sql = """
                 SELECT c.id, c.categoria,
                     a1.nome AS atleta1,
@@ -261,60 +984,162 @@ class DBManager:
                 LEFT JOIN atletas v ON c.vencedor_id = v.id
                 WHERE c.campeonato_id = %s;
             """
-            self.cursor.execute(sql, (campeonato_id,))
-            return self.cursor.fetchall()
+            return self._consultar(sql, (campeonato_id,))
         except Exception as e:
             print("Erro ao listar lutas:", e)
             return []
 
+    def listar_competicoes_pagina(self, data_inicio=None, data_fim=None, cursor=None, descendente=True,
+                                  limite=TAMANHO_PAGINA):
+        """
+        Uma página de competições ordenadas por data (as mais recentes primeiro, por padrão), com o número de
+        lutas de cada uma. `cursor` é o `proximo` da página anterior (None para a primeira).
+        Retorna uma Pagina de CompeticaoListada.
+        """
+        parametros = {"data_inicio": data_inicio, "data_fim": data_fim}
+        try:
+            return self._consultar_pagina(
+                SQL_PAGINA_COMPETICOES, ORDENACOES_COMPETICOES["data"], descendente, parametros, cursor, limite,
+                CompeticaoListada,
+            )
+        except Exception as e:
+            print("Erro ao listar competições:", e)
+            return Pagina([], None)
 
-        
-    def listar_todos_atletas(self):
-            """
-            Lista todos os atletas cadastrados na tabela atletas.
-            Retorna uma lista de tuplas no formato (id, nome, categoria, data_nasc, clube).
+    def listar_lutas_pagina(self, campeonato_id=None, categoria=None, vencedor_id=None, sem_vencedor=False,
+                            data_inicio=None, data_fim=None, cursor=None, ordem="data", descendente=True,
+                            limite=TAMANHO_PAGINA):
+        """
+        Uma página de lutas, filtradas por competição, categoria, vencedor (ou só as sem vencedor) e período da
+        competição, ordenadas por data da competição ou por cadastro (ORDENACOES_LUTAS).
+        `cursor` é o `proximo` da página anterior (None para a primeira).
+        Retorna uma Pagina de LutaListada.
+        """
+        parametros = {
+            "campeonato_id": campeonato_id, "categoria": categoria, "vencedor_id": vencedor_id,
+            "sem_vencedor": sem_vencedor, "data_inicio": data_inicio, "data_fim": data_fim,
+        }
+        try:
+            return self._consultar_pagina(
+                SQL_PAGINA_LUTAS, ORDENACOES_LUTAS[ordem], descendente, parametros, cursor, limite, LutaListada
+            )
+        except Exception as e:
+            print("Erro ao listar lutas:", e)
+            return Pagina([], None)
+
+    def obter_confronto(self, confronto_id):
+        """
+        Busca os detalhes de um confronto em uma única consulta.
+        Retorna uma tupla (categoria, atleta1_id, atleta1_nome, atleta2_id, atleta2_nome) ou None se não existir.
+        """
+        try:
+            sql = """
+                SELECT c.categoria, c.atleta1_id, a1.nome, c.atleta2_id, a2.nome
+                FROM confrontos c
+                JOIN atletas a1 ON c.atleta1_id = a1.id
+                JOIN atletas a2 ON c.atleta2_id = a2.id
+                WHERE c.id = %s;
             """
-            try:
-                self.check_connection()
-                sql = "SELECT id, nome, categoria, data_nasc, clube FROM atletas;"
-                self.cursor.execute(sql)
-                return self.cursor.fetchall()
-            except Exception as e:
-                print("Erro ao listar atletas:", e)
-                return []
-            
+            linhas = self._consultar(sql, (confronto_id,))
+            return linhas[0] if linhas else None
+        except Exception as e:
+            print("Erro ao obter confronto:", e)
+            return None
+
+    def listar_todos_atletas(self):
+        """
+        Lista todos os atletas cadastrados na tabela atletas.
+        Retorna uma lista de tuplas no formato (id, nome, categoria, data_nasc, clube).
+        """
+        try:
+            sql = "SELECT id, nome, categoria, data_nasc, clube FROM atletas;"
+            return self.cache.obter(("atletas", "todos"), lambda: self._consultar(sql))
+        except Exception as e:
+            print("Erro ao listar atletas:", e)
+            return []
+
+    def nomes_atletas(self, atleta_ids):
+        """
+        Nomes dos atletas informados, para rotular tabelas sem carregar o cadastro inteiro.
+        Retorna um dicionário {id: nome} ou {} em caso de erro.
+        """
+        try:
+            sql = "SELECT id, nome FROM atletas WHERE id = ANY(%s);"
+            return dict(self._consultar(sql, ([int(atleta_id) for atleta_id in atleta_ids],)))
+        except Exception as e:
+            print("Erro ao listar nomes dos atletas:", e)
+            return {}
+
+    def buscar_atletas(self, texto, categoria=None, clube=None, limite=LIMITE_BUSCA):
+        """
+        Busca de atletas para os seletores: nomes que começam pelo texto e, em seguida, os mais parecidos
+        (sem acentos, maiúsculas ou partículas como "da"), opcionalmente filtrados por categoria e clube.
+        Com o texto vazio, retorna os primeiros atletas em ordem alfabética.
+        Retorna até `limite` tuplas (id, nome, categoria, data_nasc, clube), como `listar_todos_atletas`.
+        """
+        sql = SQL_BUSCA_NOME.format(
+            colunas="id, nome, categoria, data_nasc, clube", tabela="atletas", ordem="nome_normalizado",
+            filtros="(%(categoria)s::text IS NULL OR categoria = %(categoria)s) "
+                    "AND (%(clube)s::text IS NULL OR clube = %(clube)s)",
+        )
+        parametros = {"texto": _texto_busca(texto), "categoria": categoria, "clube": clube, "limite": limite}
+        try:
+            return self._consultar(sql, parametros)
+        except Exception as e:
+            print("Erro ao buscar atletas:", e)
+            return []
+
     def adicionar_confronto(self, campeonato_id, atleta1_id, atleta2_id, categoria, tempo_luta):
+        """
+        Adiciona um novo confronto (luta) na tabela confrontos.
+
+        Parâmetros:
+        - campeonato_id: ID da competição (int, obrigatório)
+        - atleta1_id: ID do primeiro atleta (int, obrigatório)
+        - atleta2_id: ID do segundo atleta (int, obrigatório)
+        - categoria: Categoria da luta (string, opcional)
+        - tempo_luta: Tempo da luta no formato de intervalo (string no formato 'HH:MM:SS', obrigatório)
+
+        Retorna:
+        - O id do confronto inserido se a inserção for bem-sucedida,
+            ou uma mensagem de erro.
+        """
+        try:
+            # Nota: Se necessário, você pode converter tempo_luta para o formato INTERVAL que seu banco aceita.
+            sql = """
+                INSERT INTO confrontos (campeonato_id, atleta1_id, atleta2_id, categoria, tempo_luta)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id;
             """
-            Adiciona um novo confronto (luta) na tabela confrontos.
-
-            Parâmetros:
-            - campeonato_id: ID da competição (int, obrigatório)
-            - atleta1_id: ID do primeiro atleta (int, obrigatório)
-            - atleta2_id: ID do segundo atleta (int, obrigatório)
-            - categoria: Categoria da luta (string, opcional)
-            - tempo_luta: Tempo da luta no formato de intervalo (string no formato 'HH:MM:SS', obrigatório)
-
-            Retorna:
-            - O id do confronto inserido se a inserção for bem-sucedida,
-                ou uma mensagem de erro.
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, (campeonato_id, atleta1_id, atleta2_id, categoria, tempo_luta))
+                confronto_id = cursor.fetchone()[0]
+                conn.commit()
+            print(f"Confronto inserido com ID: {confronto_id}")
+            return confronto_id
+        except Exception as e:
+            print("Erro ao adicionar confronto:", e)
+            return str(e)
+
+    def finalizar_confronto(self, confronto_id, vencedor_id, tempo_luta):
+        """
+        Registra o vencedor e o tempo total (formato 'HH:MM:SS') de um confronto.
+        Retorna True se a atualização for bem-sucedida ou uma string com a mensagem de erro.
+        """
+        try:
+            sql = """
+                UPDATE confrontos SET vencedor_id = %s, tempo_luta = %s WHERE id = %s
+                RETURNING atleta1_id, atleta2_id;
             """
-            try:
-                # Nota: Se necessário, você pode converter tempo_luta para o formato INTERVAL que seu banco aceita.
-                sql = """
-                    INSERT INTO confrontos (campeonato_id, atleta1_id, atleta2_id, categoria, tempo_luta)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id;
-                """
-                self.cursor.execute(sql, (campeonato_id, atleta1_id, atleta2_id, categoria, tempo_luta))
-                confronto_id = self.cursor.fetchone()[0]
-                self.conn.commit()
-                print(f"Confronto inserido com ID: {confronto_id}")
-                return confronto_id
-            except Exception as e:
-                self.conn.rollback()
-                print("Erro ao adicionar confronto:", e)
-                return str(e)
-            
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, (vencedor_id, tempo_luta, confronto_id))
+                for atletas in cursor.fetchall():
+                    _atualizar_perfis(cursor, atletas)
+                conn.commit()
+            return True
+        except Exception as e:
+            print("Erro ao finalizar confronto:", e)
+            return str(e)
 
     def adicionar_acao(self, confronto_id: int, atleta_id: int, quadrante: int, grupo_golpe: str,
                    tempo_ocorrido: str, mao_direita: str, mao_esquerda: str, efetividade_golpe: str,
@@ -342,69 +1167,370 @@ class DBManager:
         - Uma string com a mensagem de erro, caso ocorra alguma exceção.
         """
         try:
-            cur = self.conn.cursor()
             insert_query = """
                 INSERT INTO acoes (
-                    confronto_id, 
-                    atleta_id, 
-                    quadrante, 
-                    grupo_golpe, 
-                    tempo_ocorrido, 
-                    mao_direita, 
-                    mao_esquerda, 
+                    confronto_id,
+                    atleta_id,
+                    quadrante,
+                    grupo_golpe,
+                    tempo_ocorrido,
+                    mao_direita,
+                    mao_esquerda,
                     efetividade_golpe,
-                    newaza, 
+                    newaza,
                     atleta_id_nw,
-                    direcao, 
-                    partida, 
+                    direcao,
+                    partida,
                     efetividade_newaza
                 ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 RETURNING id
             """
-            cur.execute(insert_query, (
-                confronto_id,
-                atleta_id,
-                quadrante,
-                grupo_golpe,
-                tempo_ocorrido,
-                mao_direita,
-                mao_esquerda,
-                efetividade_golpe,
-                newaza,
-                atleta_id_nw,  # Adiciona o ID do atleta relacionado à newaza
-                direcao,
-                partida,
-                efetividade_newaza
-            ))
-            acao_id = cur.fetchone()[0]
-            self.conn.commit()
-            cur.close()
+            with self.pool.conexao() as conn, conn.cursor() as cur:
+                cur.execute(insert_query, (
+                    confronto_id,
+                    atleta_id,
+                    quadrante,
+                    grupo_golpe,
+                    tempo_ocorrido,
+                    mao_direita,
+                    mao_esquerda,
+                    efetividade_golpe,
+                    newaza,
+                    atleta_id_nw,  # Adiciona o ID do atleta relacionado à newaza
+                    direcao,
+                    partida,
+                    efetividade_newaza
+                ))
+                acao_id = cur.fetchone()[0]
+                _atualizar_perfis(cur, (atleta_id, atleta_id_nw))
+                conn.commit()
             return acao_id
         except Exception as e:
-            self.conn.rollback()
             return str(e)
 
+    def gravar_eventos_em_lote(self, acoes=(), shidos=()):
+        """
+        Insere várias ações e shidos em uma única transação, com INSERTs de várias linhas (execute_values).
 
-    def rollback(self):
-        """Realiza rollback na transação caso necessário."""
-        self.conn.rollback()
+        Parâmetros:
+        - acoes: lista de dicionários com as chaves de COLUNAS_ACAO e 'evento_uid'.
+        - shidos: lista de dicionários com as chaves de COLUNAS_SHIDO e 'evento_uid'.
 
-    def close(self):
-        """Fecha a conexão com o banco de dados."""
-        self.conn.close()
+        Eventos cujo evento_uid já está gravado são ignorados, então reenviar um lote é seguro.
+        Os perfis materializados dos atletas com eventos inseridos são recalculados na mesma transação.
 
-    def rollback(self):
-        """Realiza rollback na transação caso necessário."""
-        self.conn.rollback()
+        Retorna:
+        - Uma tupla (acoes_inseridas, shidos_inseridos), se a gravação for bem-sucedida.
+        - Uma FalhaGravacao, caso ocorra alguma exceção (rejeitado=True para dados inválidos).
+        """
+        try:
+            inseridos = []
+            atletas = set()
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                for tabela, colunas, eventos, retorno in (
+                    ("acoes", COLUNAS_ACAO, acoes, "atleta_id, atleta_id_nw"),
+                    ("shido", COLUNAS_SHIDO, shidos, "atleta_id"),
+                ):
+                    if not eventos:
+                        inseridos.append(0)
+                        continue
+                    colunas = colunas + ("evento_uid",)
+                    sql = f"""
+                        INSERT INTO {tabela} ({", ".join(colunas)}) VALUES %s
+                        ON CONFLICT (evento_uid) DO NOTHING
+                        RETURNING {retorno};
+                    """
+                    valores = [tuple(evento[coluna] for coluna in colunas) for evento in eventos]
+                    linhas = execute_values(cursor, sql, valores, page_size=500, fetch=True)
+                    inseridos.append(len(linhas))
+                    atletas.update(atleta_id for linha in linhas for atleta_id in linha)
+                _atualizar_perfis(cursor, atletas)
+                conn.commit()
+            return tuple(inseridos)
+        except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+            print("Eventos recusados pelo banco:", e)
+            return FalhaGravacao(str(e), rejeitado=True)
+        except Exception as e:
+            print("Erro ao gravar eventos em lote:", e)
+            return FalhaGravacao(str(e), rejeitado=False)
+
+    def carregar_dados_analise(self, atleta_id=None, campeonato_id=None, confronto_id=None, categoria=None,
+                               data_inicio=None, data_fim=None):
+        """
+        Carrega os confrontos de uma seleção e todas as suas ações e shidos, com uma consulta em massa por tabela
+        na mesma conexão (nenhuma consulta por luta ou por atleta).
+        Filtros não informados (None) não restringem a seleção; `atleta_id` seleciona as lutas em que o atleta
+        participou e as datas se referem à data da competição.
+
+        Retorna um dicionário {"confrontos": (colunas, linhas), "acoes": (colunas, linhas), "shido": (colunas, linhas)}
+        ou None em caso de erro.
+        """
+        consultas = {
+            "confrontos": SQL_SELECAO + "SELECT * FROM selecao;",
+            "acoes": SQL_SELECAO + """
+                SELECT a.id, a.confronto_id, a.atleta_id, a.quadrante, a.grupo_golpe, a.tempo_ocorrido,
+                       a.mao_direita, a.mao_esquerda, a.efetividade_golpe, a.newaza, a.atleta_id_nw,
+                       a.direcao, a.partida, a.efetividade_newaza
+                FROM acoes a JOIN selecao s ON s.id = a.confronto_id;
+            """,
+            "shido": SQL_SELECAO + """
+                SELECT sh.id, sh.confronto_id, sh.atleta_id, sh.tipo, sh.tempo
+                FROM shido sh JOIN selecao s ON s.id = sh.confronto_id;
+            """,
+        }
+        parametros = _parametros_selecao(atleta_id, campeonato_id, confronto_id, categoria, data_inicio, data_fim)
+        try:
+            resultado = {}
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                for nome, sql in consultas.items():
+                    cursor.execute(sql, parametros)
+                    resultado[nome] = ([coluna.name for coluna in cursor.description], cursor.fetchall())
+            return resultado
+        except Exception as e:
+            print("Erro ao carregar dados para análise:", e)
+            return None
+
+    def contar_golpes(self, **filtros):
+        """
+        Conta as ações por grupo de golpe x efetividade, com subtotais por grupo e total geral (GROUPING SETS).
+        Aceita os mesmos filtros de `carregar_dados_analise`. Retorna uma lista de ContagemGolpe.
+        """
+        sql = SQL_SELECAO + """
+            SELECT a.grupo_golpe, a.efetividade_golpe, count(*),
+                   GROUPING(a.efetividade_golpe) = 1
+            FROM acoes a JOIN selecao s ON s.id = a.confronto_id
+            WHERE (%(atleta_id)s::int IS NULL OR a.atleta_id = %(atleta_id)s)
+            GROUP BY GROUPING SETS ((a.grupo_golpe, a.efetividade_golpe), (a.grupo_golpe), ())
+            ORDER BY a.grupo_golpe NULLS LAST, a.efetividade_golpe NULLS LAST;
+        """
+        try:
+            return [ContagemGolpe(*linha) for linha in self._consultar(sql, _parametros_selecao(**filtros))]
+        except Exception as e:
+            print("Erro ao contar golpes:", e)
+            return []
+
+    def contar_quadrantes(self, **filtros):
+        """
+        Conta as ações e as ações pontuadas (FILTER) por quadrante e grupo de golpe, para o mapa de calor do tatame.
+        Aceita os mesmos filtros de `carregar_dados_analise`. Retorna uma lista de ContagemQuadrante.
+        """
+        sql = SQL_SELECAO + """
+            SELECT a.quadrante, a.grupo_golpe, count(*),
+                   count(*) FILTER (WHERE a.efetividade_golpe = ANY(%(pontuadas)s::efetividade_golpe[]))
+            FROM acoes a JOIN selecao s ON s.id = a.confronto_id
+            WHERE (%(atleta_id)s::int IS NULL OR a.atleta_id = %(atleta_id)s)
+            GROUP BY a.quadrante, a.grupo_golpe
+            ORDER BY a.quadrante, a.grupo_golpe;
+        """
+        parametros = dict(_parametros_selecao(**filtros), pontuadas=list(EFETIVIDADES_PONTUADAS))
+        try:
+            return [ContagemQuadrante(*linha) for linha in self._consultar(sql, parametros)]
+        except Exception as e:
+            print("Erro ao contar quadrantes:", e)
+            return []
+
+    def contar_shidos(self, **filtros):
+        """
+        Conta os shidos por tipo x tempo, com subtotais por tipo (GROUPING SETS).
+        Aceita os mesmos filtros de `carregar_dados_analise`. Retorna uma lista de ContagemShido.
+        """
+        sql = SQL_SELECAO + """
+            SELECT sh.tipo, sh.tempo, count(*), GROUPING(sh.tempo) = 1
+            FROM shido sh JOIN selecao s ON s.id = sh.confronto_id
+            WHERE (%(atleta_id)s::int IS NULL OR sh.atleta_id = %(atleta_id)s)
+            GROUP BY GROUPING SETS ((sh.tipo, sh.tempo), (sh.tipo))
+            ORDER BY sh.tipo, sh.tempo NULLS LAST;
+        """
+        try:
+            return [ContagemShido(*linha) for linha in self._consultar(sql, _parametros_selecao(**filtros))]
+        except Exception as e:
+            print("Erro ao contar shidos:", e)
+            return []
+
+    def contar_acoes_por_janela(self, janela_s=30, inicio_s=None, fim_s=None, **filtros):
+        """
+        Conta as ações por janela de `janela_s` segundos de tempo de luta (coluna inteira tempo_ms),
+        opcionalmente restritas ao intervalo [inicio_s, fim_s). Aceita os filtros de `carregar_dados_analise`.
+        Retorna uma lista de ContagemJanela em ordem de tempo.
+        """
+        sql = SQL_SELECAO + """
+            SELECT (a.tempo_ms / %(janela_ms)s) * %(janela_s)s, count(*),
+                   count(*) FILTER (WHERE a.efetividade_golpe = ANY(%(pontuadas)s::efetividade_golpe[]))
+            FROM acoes a JOIN selecao s ON s.id = a.confronto_id
+            WHERE a.tempo_ms IS NOT NULL
+              AND (%(atleta_id)s::int IS NULL OR a.atleta_id = %(atleta_id)s)
+              AND (%(inicio_ms)s::int IS NULL OR a.tempo_ms >= %(inicio_ms)s)
+              AND (%(fim_ms)s::int IS NULL OR a.tempo_ms < %(fim_ms)s)
+            GROUP BY 1
+            ORDER BY 1;
+        """
+        parametros = dict(
+            _parametros_selecao(**filtros),
+            janela_s=janela_s, janela_ms=janela_s * 1000, pontuadas=list(EFETIVIDADES_PONTUADAS),
+            inicio_ms=None if inicio_s is None else int(inicio_s * 1000),
+            fim_ms=None if fim_s is None else int(fim_s * 1000),
+        )
+        try:
+            return [ContagemJanela(*linha) for linha in self._consultar(sql, parametros)]
+        except Exception as e:
+            print("Erro ao contar ações por janela de tempo:", e)
+            return []
+
+    def desempenho_atletas(self, limite=50, **filtros):
+        """
+        Lutas, vitórias e taxa de vitória por atleta na seleção, calculadas a partir de confrontos.vencedor_id.
+        Apenas lutas finalizadas (com vencedor) entram na conta. Retorna até `limite` DesempenhoAtleta,
+        dos atletas com mais lutas para os com menos.
+        """
+        sql = SQL_SELECAO + """
+            , participacoes AS (
+                SELECT atleta1_id AS atleta_id, vencedor_id FROM selecao WHERE vencedor_id IS NOT NULL
+                UNION ALL
+                SELECT atleta2_id, vencedor_id FROM selecao WHERE vencedor_id IS NOT NULL
+            )
+            SELECT p.atleta_id, at.nome, count(*) AS lutas,
+                   count(*) FILTER (WHERE p.vencedor_id = p.atleta_id) AS vitorias,
+                   round(count(*) FILTER (WHERE p.vencedor_id = p.atleta_id)::numeric / count(*), 4)::float
+            FROM participacoes p JOIN atletas at ON at.id = p.atleta_id
+            WHERE (%(atleta_id)s::int IS NULL OR p.atleta_id = %(atleta_id)s)
+            GROUP BY p.atleta_id, at.nome
+            ORDER BY lutas DESC, at.nome
+            LIMIT %(limite)s;
+        """
+        parametros = dict(_parametros_selecao(**filtros), limite=limite)
+        try:
+            return [DesempenhoAtleta(*linha) for linha in self._consultar(sql, parametros)]
+        except Exception as e:
+            print("Erro ao calcular desempenho dos atletas:", e)
+            return []
+
+    def obter_perfil_atleta(self, atleta_id):
+        """
+        Retorna o perfil de scouting materializado do atleta (PerfilAtleta), lido pela chave primária,
+        ou None se o atleta ainda não tiver perfil ou em caso de erro.
+        """
+        sql = f"SELECT {', '.join(PerfilAtleta._fields)} FROM perfil_atleta WHERE atleta_id = %s;"
+        try:
+            linhas = self._consultar(sql, (atleta_id,))
+            return PerfilAtleta(*linhas[0]) if linhas else None
+        except Exception as e:
+            print("Erro ao obter perfil do atleta:", e)
+            return None
+
+    def atualizar_perfis(self, atleta_ids):
+        """
+        Recalcula o perfil materializado dos atletas informados.
+        Normalmente não é necessário: as gravações de ações, shidos e resultados já atualizam os perfis.
+        Retorna True se a atualização for bem-sucedida ou uma string com a mensagem de erro.
+        """
+        try:
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                _atualizar_perfis(cursor, atleta_ids)
+                conn.commit()
+            return True
+        except Exception as e:
+            print("Erro ao atualizar perfis:", e)
+            return str(e)
+
+    def iterar_exportacao(self, conjunto, tamanho_bloco=10_000, **filtros):
+        """
+        Percorre um conjunto de CONSULTAS_EXPORTACAO ('confrontos', 'acoes' ou 'shido') com um cursor nomeado
+        (do lado do servidor), gerando blocos (colunas, linhas) de até `tamanho_bloco` linhas. Apenas um bloco
+        fica em memória por vez. Aceita os filtros de `carregar_dados_analise`.
+        Diferente dos demais métodos, erros do banco são propagados, pois o consumidor já pode ter gravado parte
+        do resultado.
+        """
+        sql = SQL_SELECAO + CONSULTAS_EXPORTACAO[conjunto]
+        with self.pool.conexao() as conn, conn.cursor(name=f"exportacao_{conjunto}") as cursor:
+            cursor.itersize = tamanho_bloco
+            cursor.execute(sql, _parametros_selecao(**filtros))
+            while True:
+                linhas = cursor.fetchmany(tamanho_bloco)
+                if not linhas:
+                    break
+                yield [coluna.name for coluna in cursor.description], linhas
+
+    def tipos_exportacao(self, conjunto):
+        """Retorna [(coluna, oid do tipo no Postgres)] do conjunto de exportação, sem ler nenhuma linha."""
+        sql = SQL_SELECAO + "SELECT * FROM (" + CONSULTAS_EXPORTACAO[conjunto] + ") exportacao LIMIT 0;"
+        with self.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute(sql, _parametros_selecao())
+            return [(coluna.name, coluna.type_code) for coluna in cursor.description]
+
+    def _importar(self, colunas, linhas, sql_insercao, *grupos_cache):
+        """
+        Copia `linhas` para a tabela temporária `importacao` (COPY) e executa `sql_insercao` na mesma transação.
+        Retorna a quantidade de linhas inseridas ou uma string com a mensagem de erro.
+        """
+        try:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(linhas)
+            buffer.seek(0)
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE importacao ({colunas}) ON COMMIT DROP;")
+                cursor.copy_expert("COPY importacao FROM STDIN WITH (FORMAT csv);", buffer)
+                cursor.execute(sql_insercao)
+                inseridos = cursor.rowcount
+                conn.commit()
+            if grupos_cache:
+                self.cache.invalidar(*grupos_cache)
+            return inseridos
+        except Exception as e:
+            print("Erro na importação:", e)
+            return str(e)
+
+    def importar_atletas(self, linhas):
+        """
+        Insere atletas em massa. `linhas` são tuplas (nome, categoria, data_nasc, clube) já validadas.
+        Atletas já cadastrados (uq_atletas_nome_nasc_clube) são ignorados.
+        Retorna a quantidade de atletas inseridos ou uma string com a mensagem de erro.
+        """
+        sql = """
+            INSERT INTO atletas (nome, categoria, data_nasc, clube)
+            SELECT nome, categoria, data_nasc, clube FROM importacao
+            ON CONFLICT ON CONSTRAINT uq_atletas_nome_nasc_clube DO NOTHING;
+        """
+        return self._importar("nome TEXT, categoria TEXT, data_nasc DATE, clube TEXT", linhas, sql, "atletas")
+
+    def importar_competicoes(self, linhas):
+        """
+        Insere competições em massa. `linhas` são tuplas (nome_competicao, data_competicao, classe) já validadas.
+        Competições já cadastradas (uq_campeonato_nome_data) são ignoradas.
+        Retorna a quantidade de competições inseridas ou uma string com a mensagem de erro.
+        """
+        sql = """
+            INSERT INTO campeonato (nome_competicao, data_competicao, classe)
+            SELECT nome_competicao, data_competicao, classe FROM importacao
+            ON CONFLICT ON CONSTRAINT uq_campeonato_nome_data DO NOTHING;
+        """
+        return self._importar("nome_competicao TEXT, data_competicao DATE, classe TEXT", linhas, sql, "competicoes")
+
+    def importar_confrontos(self, linhas):
+        """
+        Insere confrontos (chaves de sorteio) em massa. `linhas` são tuplas
+        (campeonato_id, atleta1_id, atleta2_id, categoria) já resolvidas para IDs.
+        Confrontos iguais já cadastrados na competição são ignorados.
+        Retorna a quantidade de confrontos inseridos ou uma string com a mensagem de erro.
+        """
+        sql = """
+            INSERT INTO confrontos (campeonato_id, atleta1_id, atleta2_id, categoria)
+            SELECT DISTINCT i.campeonato_id, i.atleta1_id, i.atleta2_id, i.categoria FROM importacao i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM confrontos c
+                WHERE c.campeonato_id = i.campeonato_id AND c.atleta1_id = i.atleta1_id
+                  AND c.atleta2_id = i.atleta2_id AND c.categoria IS NOT DISTINCT FROM i.categoria
+            );
+        """
+        return self._importar("campeonato_id INT, atleta1_id INT, atleta2_id INT, categoria TEXT", linhas, sql)
 
     def close(self):
-        """Fecha a conexão com o banco de dados."""
-        self.conn.close()
-            
+        """Fecha todas as conexões do pool."""
+        self.pool.fechar()
+
     def deletar_confronto(self, confronto_id):
         """
         Exclui um confronto (luta) da tabela confrontos com base no ID informado.
-        
+
         Parâmetros:
         - confronto_id: ID do confronto a ser excluído.
 
@@ -412,34 +1538,48 @@ class DBManager:
         - True se a deleção for bem-sucedida, False em caso de erro.
         """
         try:
-            self.check_connection()
-            sql = "DELETE FROM confrontos WHERE id = %s;"
-            self.cursor.execute(sql, (confronto_id,))
-            self.conn.commit()
+            sql = "DELETE FROM confrontos WHERE id = %s RETURNING atleta1_id, atleta2_id;"
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, (confronto_id,))
+                for atletas in cursor.fetchall():
+                    _atualizar_perfis(cursor, atletas)
+                conn.commit()
             print(f"Confronto com ID {confronto_id} removido com sucesso!")
             return True
         except Exception as e:
-            self.conn.rollback()
             print("Erro ao deletar confronto:", e)
             return False
-        
+
     def adicionar_shido(self, confronto_id, atleta_id, tipo, tempo):
         try:
             sql_insert = "INSERT INTO shido (confronto_id, atleta_id, tipo, tempo) VALUES (%s, %s, %s, %s)"
-            self.cursor.execute(sql_insert, (confronto_id, atleta_id, tipo, tempo))
-            self.conn.commit()
+            with self.pool.conexao() as conn, conn.cursor() as cursor:
+                cursor.execute(sql_insert, (confronto_id, atleta_id, tipo, tempo))
+                _atualizar_perfis(cursor, (atleta_id,))
+                conn.commit()
             return True
         except Exception as e:
             return str(e)
 
-
-
-        
     def fechar_conexao(self):
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                self.conn.close()   
+        self.close()
+
 
+@st.cache_resource
 def get_db_manager():
-    return DBManager()
+    """
+    Retorna o DBManager compartilhado pelo processo.
+    Todas as páginas e sessões usam a mesma instância e, portanto, o mesmo pool de conexões e o mesmo cache.
+    O cache pode ser ajustado com as chaves opcionais CACHE_TTL e CACHE_MAX_ENTRADAS em st.secrets["DB"], e a
+    instrumentação com INSTRUMENTACAO_BUFFER (medições mantidas em memória) e INSTRUMENTACAO_ARQUIVO (log JSON Lines).
+    """
+    config = st.secrets["DB"]
+    instrumentacao.registro.configurar(
+        tamanho=int(config.get("INSTRUMENTACAO_BUFFER", instrumentacao.TAMANHO_BUFFER)),
+        arquivo=config.get("INSTRUMENTACAO_ARQUIVO"),
+    )
+    cache = CacheTTL(
+        ttl=float(config.get("CACHE_TTL", 300)),
+        max_entradas=int(config.get("CACHE_MAX_ENTRADAS", 64)),
+    )
+    return DBManager(cache=cache)
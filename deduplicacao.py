@@ -0,0 +1,49 @@
+"""
+Agrupamento dos candidatos a atletas duplicados ("João Silva" e "Joao da Silva").
+
+`DBManager.candidatos_duplicados` devolve pares de atletas com nomes parecidos; aqui os pares são reunidos em
+grupos (componentes conexos: se A~B e B~C, os três são o mesmo judoca) e, em cada grupo, é escolhido o atleta
+mantido na mesclagem: o com mais lutas registradas e, no empate, o cadastrado primeiro (menor id).
+"""
+from typing import List, NamedTuple, Tuple
+
+
+class GrupoDuplicados(NamedTuple):
+    """Atletas que parecem ser a mesma pessoa: `atletas` são tuplas (id, nome, clube, data_nasc, lutas)."""
+    mantido: Tuple
+    duplicados: List[Tuple]
+    semelhanca: float  # maior similaridade entre dois nomes do grupo
+
+    def mapa(self):
+        """{duplicado_id: atleta_id mantido}, no formato de `DBManager.mesclar_atletas`."""
+        return {duplicado[0]: self.mantido[0] for duplicado in self.duplicados}
+
+
+def agrupar(candidatos):
+    """Reúne os CandidatoDuplicado em grupos, do grupo mais semelhante para o menos semelhante."""
+    pais = {}
+
+    def raiz(atleta_id):
+        while pais.setdefault(atleta_id, atleta_id) != atleta_id:
+            pais[atleta_id] = pais[pais[atleta_id]]
+            atleta_id = pais[atleta_id]
+        return atleta_id
+
+    atletas = {}
+    for par in candidatos:
+        atletas[par.atleta1_id] = (par.atleta1_id, par.nome1, par.clube1, par.data_nasc1, par.lutas1)
+        atletas[par.atleta2_id] = (par.atleta2_id, par.nome2, par.clube2, par.data_nasc2, par.lutas2)
+        pais[raiz(par.atleta2_id)] = raiz(par.atleta1_id)
+
+    membros, semelhancas = {}, {}
+    for atleta_id, atleta in atletas.items():
+        membros.setdefault(raiz(atleta_id), []).append(atleta)
+    for par in candidatos:
+        grupo = raiz(par.atleta1_id)
+        semelhancas[grupo] = max(semelhancas.get(grupo, 0.0), par.semelhanca)
+
+    grupos = []
+    for grupo, lista in membros.items():
+        lista.sort(key=lambda atleta: (-atleta[4], atleta[0]))
+        grupos.append(GrupoDuplicados(lista[0], lista[1:], semelhancas[grupo]))
+    return sorted(grupos, key=lambda grupo: -grupo.semelhanca)
@@ -0,0 +1,113 @@
+"""
+Painel de diagnóstico de latência, oculto por padrão: aparece no fim de qualquer página com `?diagnostico=1` na URL.
+
+Mostra, a partir do buffer de `instrumentacao`, a decomposição dos reruns recentes da sessão (SQL, espera por
+conexão, fases e o restante), as fases e comandos do último rerun, os comandos SQL mais lentos do processo e as
+métricas do pool de conexões.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from db_manager import get_db_manager
+from instrumentacao import Medicao, registro
+
+RERUNS_EXIBIDOS = 20
+COMANDOS_EXIBIDOS = 15
+
+
+def _dataframe(medicoes):
+    df = pd.DataFrame(medicoes, columns=Medicao._fields)
+    df["instante"] = pd.to_datetime(df["instante"], unit="s")
+    return df
+
+
+def resumo_reruns(df, sessao):
+    """Uma linha por rerun da sessão: duração total, tempo em SQL e em espera por conexão, fases e restante."""
+    df = df[(df["sessao"] == sessao) & df["rerun"].notna()]
+    tempos = (
+        df.pivot_table(index="rerun", columns="tipo", values="duracao_ms", aggfunc="sum", fill_value=0)
+        .reindex(columns=["rerun", "sql", "conexao"], fill_value=0)
+    )
+    resumo = pd.DataFrame({
+        "inicio": df.groupby("rerun")["instante"].min(),
+        "total_ms": tempos["rerun"],
+        "sql_ms": tempos["sql"],
+        "comandos": df[df["tipo"] == "sql"].groupby("rerun").size(),
+        "conexao_ms": tempos["conexao"],
+    }).fillna({"comandos": 0})
+    resumo["outros_ms"] = resumo["total_ms"] - resumo["sql_ms"] - resumo["conexao_ms"]
+    fases = {
+        rerun: " · ".join(f"{nome} {duracao:.0f} ms" for nome, duracao in zip(grupo["nome"], grupo["duracao_ms"]))
+        for rerun, grupo in df[df["tipo"] == "fase"].groupby("rerun")
+    }
+    resumo["fases"] = resumo.index.map(fases)
+    return resumo.sort_values("inicio", ascending=False)
+
+
+def comandos_mais_lentos(df):
+    """Comandos SQL agrupados pela impressão digital, do maior para o menor tempo total."""
+    sql = df[df["tipo"] == "sql"]
+    tabela = sql.groupby("nome").agg(
+        execucoes=("duracao_ms", "size"),
+        total_ms=("duracao_ms", "sum"),
+        media_ms=("duracao_ms", "mean"),
+        p95_ms=("duracao_ms", lambda duracoes: duracoes.quantile(0.95)),
+        max_ms=("duracao_ms", "max"),
+        linhas_media=("linhas", "mean"),
+    )
+    return tabela.sort_values("total_ms", ascending=False)
+
+
+def exibir_metricas_pool(metricas):
+    """Espera por conexão, checkouts e reconexões do pool desde o início do processo (`PoolConexoes.metricas`)."""
+    st.write("**Pool de conexões**")
+    colunas = st.columns(6)
+    colunas[0].metric("Em uso", f"{metricas['em_uso']} / {metricas['tamanho_maximo']}")
+    colunas[1].metric("Checkouts", metricas["checkouts"])
+    colunas[2].metric("Espera média", f"{metricas['espera_media'] * 1000:.1f} ms")
+    colunas[3].metric("Espera máxima", f"{metricas['espera_max'] * 1000:.1f} ms")
+    colunas[4].metric("Reconexões", metricas["reconexoes"])
+    colunas[5].metric("Tempos esgotados", metricas["timeouts"])
+
+
+def exibir_painel(sessao):
+    medicoes = registro.medicoes()
+    with st.expander("Diagnóstico de latência", expanded=True):
+        exibir_metricas_pool(get_db_manager().metricas_pool())
+        if not medicoes:
+            st.info("Nenhuma medição registrada ainda.")
+            return
+        df = _dataframe(medicoes)
+        st.caption(f"{len(medicoes)} medições no buffer (processo inteiro), desde {df['instante'].min():%H:%M:%S}.")
+
+        reruns = resumo_reruns(df, sessao)
+        st.write("**Reruns recentes desta sessão**")
+        st.dataframe(reruns.head(RERUNS_EXIBIDOS), column_config={
+            coluna: st.column_config.NumberColumn(format="%.1f")
+            for coluna in ("total_ms", "sql_ms", "conexao_ms", "outros_ms")
+        })
+
+        if not reruns.empty:
+            # O painel é exibido depois que o rerun desta execução termina: ele é o mais recente do resumo
+            ultimo = df[df["rerun"] == reruns.index[0]]
+            st.write("**Último rerun concluído**")
+            st.dataframe(
+                ultimo[ultimo["tipo"].isin(["fase", "sql", "conexao"])][["tipo", "nome", "duracao_ms", "linhas"]],
+                hide_index=True,
+            )
+
+        st.write("**Comandos SQL mais lentos (tempo total)**")
+        st.dataframe(comandos_mais_lentos(df).head(COMANDOS_EXIBIDOS))
+
+        col1, col2 = st.columns(2)
+        col1.download_button(
+            "Exportar medições (JSON Lines)",
+            "\n".join(json.dumps(medicao._asdict(), ensure_ascii=False) for medicao in medicoes),
+            file_name="latencia.jsonl",
+            mime="application/jsonl",
+        )
+        if col2.button("Limpar medições"):
+            registro.limpar()
+            st.rerun()
@@ -0,0 +1,220 @@
+"""
+Diário local de eventos da marcação ao vivo (Análise Rápida), para uso offline.
+
+A página grava cada ação e shido em um diário SQLite local (modo WAL), o que leva menos de um milissegundo
+e não depende da rede. Um sincronizador em segundo plano envia os eventos pendentes em lotes para o Postgres
+(`DBManager.gravar_eventos_em_lote`); como cada evento tem um `evento_uid`, reenviar um lote nunca duplica linhas.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from db_manager import COLUNAS_ACAO, COLUNAS_SHIDO, FalhaGravacao, get_db_manager
+
+PASTA_DIARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diario")
+
+
+class DiarioEventos:
+    """Diário append-only de eventos em SQLite (WAL), seguro entre threads."""
+
+    def __init__(self, caminho=os.path.join(PASTA_DIARIO, "eventos.db")):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            # Com WAL, NORMAL mantém o diário íntegro em quedas do processo sem um fsync por evento
+            self._conn.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS eventos (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    evento_uid TEXT NOT NULL UNIQUE,
+                    tipo TEXT NOT NULL,
+                    dados TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    sincronizado_em REAL,
+                    erro TEXT
+                );
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_eventos_pendentes ON eventos (seq) "
+                "WHERE sincronizado_em IS NULL AND erro IS NULL;"
+            )
+
+    def registrar(self, tipo, dados, evento_uid=None):
+        """Acrescenta um evento ('acao' ou 'shido') ao diário e retorna o seu evento_uid."""
+        colunas = COLUNAS_ACAO if tipo == "acao" else COLUNAS_SHIDO
+        evento = {coluna: dados.get(coluna) for coluna in colunas}
+        evento_uid = evento_uid or str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO eventos (evento_uid, tipo, dados, criado_em) VALUES (?, ?, ?, ?);",
+                (evento_uid, tipo, json.dumps(evento), time.time()),
+            )
+        return evento_uid
+
+    def pendentes(self, limite=500):
+        """Retorna até `limite` eventos não sincronizados, do mais antigo ao mais novo, como (seq, tipo, evento)."""
+        with self._lock:
+            linhas = self._conn.execute(
+                """
+                SELECT seq, evento_uid, tipo, dados FROM eventos
+                WHERE sincronizado_em IS NULL AND erro IS NULL ORDER BY seq LIMIT ?;
+                """,
+                (limite,),
+            ).fetchall()
+        return [(seq, tipo, dict(json.loads(dados), evento_uid=evento_uid)) for seq, evento_uid, tipo, dados in linhas]
+
+    def marcar_sincronizados(self, seqs):
+        """Marca os eventos informados como gravados no Postgres."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE eventos SET sincronizado_em = ? WHERE seq = ?;",
+                [(time.time(), seq) for seq in seqs],
+            )
+
+    def marcar_rejeitado(self, seq, erro):
+        """Marca um evento recusado pelo banco (dados inválidos) para que não bloqueie os demais."""
+        with self._lock:
+            self._conn.execute("UPDATE eventos SET erro = ? WHERE seq = ?;", (erro, seq))
+
+    def limpar_sincronizados(self, idade=7 * 24 * 3600):
+        """Remove eventos sincronizados há mais de `idade` segundos."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM eventos WHERE sincronizado_em IS NOT NULL AND sincronizado_em < ?;",
+                (time.time() - idade,),
+            )
+
+    def resumo(self):
+        """
+        Retorna um dicionário com a quantidade de pendentes, o atraso (segundos) do pendente mais antigo
+        e a quantidade de eventos rejeitados pelo banco.
+        """
+        with self._lock:
+            pendentes, mais_antigo, rejeitados = self._conn.execute("""
+                SELECT COUNT(*) FILTER (WHERE erro IS NULL),
+                       MIN(criado_em) FILTER (WHERE erro IS NULL),
+                       COUNT(*) FILTER (WHERE erro IS NOT NULL)
+                FROM eventos WHERE sincronizado_em IS NULL;
+            """).fetchone()
+        return {
+            "pendentes": pendentes,
+            "atraso": time.time() - mais_antigo if mais_antigo else 0.0,
+            "rejeitados": rejeitados,
+        }
+
+
+class SincronizadorDiario:
+    """
+    Thread em segundo plano que replica o diário no Postgres.
+
+    A cada `intervalo` segundos (ou imediatamente após `acordar()`), envia os pendentes em lotes de até
+    `tamanho_lote` eventos. Em caso de falha (rede fora, banco indisponível) os eventos permanecem no diário
+    e a espera até a próxima tentativa dobra, até `espera_maxima` segundos. Só os eventos recusados pelo banco
+    por dados inválidos são marcados como rejeitados e deixam de ser reenviados.
+    """
+
+    def __init__(self, diario, db_manager, intervalo=2, tamanho_lote=500, espera_maxima=60):
+        self.diario = diario
+        self.db_manager = db_manager
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.espera_maxima = espera_maxima
+        self.ultima_sincronizacao = None
+        self.ultimo_erro = None
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._envio_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._executar, name="sincronizador-diario", daemon=True)
+        self._thread.start()
+
+    def sincronizar(self):
+        """
+        Envia todos os eventos pendentes, lote a lote.
+        Retorna a quantidade de eventos enviados ou uma string com a mensagem de erro.
+        """
+        enviados = 0
+        with self._envio_lock:
+            while True:
+                lote = self.diario.pendentes(self.tamanho_lote)
+                if not lote:
+                    break
+                resultado = self._enviar(lote)
+                if isinstance(resultado, FalhaGravacao):
+                    # Dados inválidos em algum evento: reenvia um a um para separar os recusados
+                    erro = self._isolar_rejeitados(lote) if resultado.rejeitado else resultado.mensagem
+                    if erro is not None:
+                        self.ultimo_erro = erro
+                        return erro
+                else:
+                    self.diario.marcar_sincronizados([seq for seq, _, _ in lote])
+                enviados += len(lote)
+            self.ultima_sincronizacao = time.time()
+            self.ultimo_erro = None
+        return enviados
+
+    def _enviar(self, lote):
+        acoes = [evento for _, tipo, evento in lote if tipo == "acao"]
+        shidos = [evento for _, tipo, evento in lote if tipo == "shido"]
+        return self.db_manager.gravar_eventos_em_lote(acoes, shidos)
+
+    def _isolar_rejeitados(self, lote):
+        """
+        Reenvia evento a evento um lote recusado pelo banco. Só os eventos com dados inválidos (IntegrityError,
+        DataError) são marcados como rejeitados; se a conexão cair no meio, os eventos restantes continuam
+        pendentes. Retorna a mensagem da falha de conexão, ou None se o lote inteiro foi resolvido.
+        """
+        for seq, tipo, evento in lote:
+            resultado = self._enviar([(seq, tipo, evento)])
+            if not isinstance(resultado, FalhaGravacao):
+                self.diario.marcar_sincronizados([seq])
+            elif resultado.rejeitado:
+                print(f"Evento {seq} rejeitado pelo banco:", resultado.mensagem)
+                self.diario.marcar_rejeitado(seq, resultado.mensagem)
+            else:
+                return resultado.mensagem
+        return None
+
+    def acordar(self):
+        """Antecipa a próxima sincronização."""
+        self._acordar.set()
+
+    def status(self):
+        """Retorna pendentes, atraso (s), ultima_sincronizacao (epoch) e ultimo_erro."""
+        return dict(
+            self.diario.resumo(),
+            ultima_sincronizacao=self.ultima_sincronizacao,
+            ultimo_erro=self.ultimo_erro,
+        )
+
+    def parar(self):
+        """Interrompe a thread após uma última tentativa de sincronização."""
+        self._parar.set()
+        self._acordar.set()
+        self._thread.join(timeout=10)
+
+    def _executar(self):
+        espera = self.intervalo
+        while not self._parar.is_set():
+            self._acordar.wait(espera)
+            self._acordar.clear()
+            resultado = self.sincronizar()
+            espera = min(espera * 2, self.espera_maxima) if isinstance(resultado, str) else self.intervalo
+        self.sincronizar()
+        self.diario.limpar_sincronizados()
+
+
+@st.cache_resource
+def obter_sincronizador():
+    """Retorna o sincronizador do processo, criando o diário e iniciando a thread na primeira chamada."""
+    diario = DiarioEventos()
+    sincronizador = SincronizadorDiario(diario, get_db_manager())
+    atexit.register(sincronizador.parar)
+    return sincronizador
@@ -0,0 +1,181 @@
+"""
+Entrada rápida de ações por sequência de teclas, para marcar lutas ao vivo.
+
+Uma ação inteira é digitada como uma linha curta, por exemplo `1 G M A W q3`:
+
+    1 | 2                  autor da ação (Atleta 1 ou Atleta 2)
+    [pegada] [pegada]      mão direita e mão esquerda (opcionais; sem elas valem as últimas do autor,
+                           e com apenas uma a mão esquerda é a última usada)
+    grupo                  grupo do golpe
+    efetividade            efetividade do golpe
+
+seguida, em qualquer ordem, dos campos opcionais com prefixo:
+
+    q1..q4                 quadrante do tatame
+    t0..t3 | tgs           tempo (minuto 0 a 3 ou golden score)
+    n1 | n2                ne-waza, com o atleta que fez a passagem
+    d<direção>             direção do ne-waza (DEF, F, DDF, LE, LD, DET, T, DDT)
+    p<partida>             de onde partiu a passagem
+    e<efetividade>         efetividade da passagem
+
+Letras maiúsculas ou minúsculas são equivalentes. Os códigos estão nos dicionários abaixo.
+"""
+from typing import NamedTuple, Optional
+
+import vocabulario
+
+AUTORES = {"1": "Atleta 1", "2": "Atleta 2"}
+
+PEGADAS = {
+    "UG": "Uma Mão (Gola)",
+    "G": "Gola",
+    "GC": "Gola Cruzada",
+    "GA": "Gola Alta",
+    "P": "Patolada",
+    "PC": "Patolada Cruzada",
+    "AD": "Arm Drag",
+    "UM": "Uma Mão (Manga)",
+    "M": "Manga",
+    "MC": "Manga Cruzada",
+    "C": "Cava",
+    "F": "Faixa",
+}
+
+GRUPOS_GOLPE = {
+    "T": "Te-Waza",
+    "A": "Ashi-Waza",
+    "K": "Koshi-Waza",
+    "S": "Sutemi-Waza",
+    "Y": "Yoko-Sutemi-waza",
+    "KA": "Kaeshi Waza",
+}
+
+EFETIVIDADES_GOLPE = {
+    "Y": "Yuko",
+    "W": "Waza-Ari",
+    "I": "Ippon",
+    "FA": "Golpe Falho",
+    "FS": "Golpe Falso",
+    "IR": "Irrelevante",
+    "CG": "Sofreu contra-golpe",
+}
+
+TEMPOS = {
+    "0": "00:00:00",
+    "1": "00:01:00",
+    "2": "00:02:00",
+    "3": "00:03:00",
+    "GS": "00:04:00",
+}
+
+DIRECOES_NEWAZA = {direcao: direcao for direcao in vocabulario.DIRECOES_NEWAZA}
+
+PARTIDAS_NEWAZA = {
+    "CA": "Cabeça",
+    "CO": "Costas",
+    "L": "Lateral",
+    "MG": "Meia-Guarda",
+    "G": "Guarda",
+    "O": "Oportunista",
+}
+
+EFETIVIDADES_NEWAZA = {
+    "Y": "Yuko",
+    "W": "Waza-Ari",
+    "I": "Ippon",
+    "N": "Nada",
+    "CA": "Sofreu Contra-Ataque",
+}
+
+
+class AcaoRapida(NamedTuple):
+    """Ação interpretada de uma sequência; autores como "Atleta 1"/"Atleta 2" e None nos campos omitidos."""
+    autor: str
+    mao_direita: Optional[str]
+    mao_esquerda: Optional[str]
+    grupo_golpe: str
+    efetividade_golpe: str
+    quadrante: Optional[int] = None
+    tempo: Optional[str] = None
+    newaza: bool = False
+    autor_newaza: Optional[str] = None
+    direcao: Optional[str] = None
+    partida: Optional[str] = None
+    efetividade_newaza: Optional[str] = None
+
+
+def _codigo(tabela, codigo, campo):
+    try:
+        return tabela[codigo]
+    except KeyError:
+        raise ValueError(f"Código de {campo} desconhecido: {codigo!r}.") from None
+
+
+def interpretar(sequencia, ultimas_pegadas=None):
+    """
+    Interpreta uma sequência de entrada rápida e retorna uma AcaoRapida.
+
+    `ultimas_pegadas` é um dicionário {autor: (mao_direita, mao_esquerda)} com as últimas pegadas de cada
+    atleta, usado quando a sequência omite as pegadas.
+    Levanta ValueError com uma mensagem legível se a sequência for inválida.
+    """
+    tokens = sequencia.upper().split()
+    if not tokens:
+        raise ValueError("Sequência vazia.")
+
+    autor = _codigo(AUTORES, tokens[0], "autor")
+
+    # Pegadas: até dois códigos antes do grupo do golpe
+    pegadas = []
+    posicao = 1
+    while posicao < len(tokens) and len(pegadas) < 2 and tokens[posicao] in PEGADAS:
+        pegadas.append(PEGADAS[tokens[posicao]])
+        posicao += 1
+    anterior = (ultimas_pegadas or {}).get(autor, (None, None))
+    mao_direita = pegadas[0] if pegadas else anterior[0]
+    mao_esquerda = pegadas[1] if len(pegadas) > 1 else anterior[1]
+
+    if len(tokens) < posicao + 2:
+        raise ValueError("Informe o grupo do golpe e a efetividade depois do autor e das pegadas.")
+    grupo_golpe = _codigo(GRUPOS_GOLPE, tokens[posicao], "grupo do golpe")
+    efetividade_golpe = _codigo(EFETIVIDADES_GOLPE, tokens[posicao + 1], "efetividade do golpe")
+    opcionais = tokens[posicao + 2:]
+
+    campos = {}
+    for token in opcionais:
+        prefixo, valor = token[0], token[1:]
+        if prefixo == "Q":
+            if valor not in ("1", "2", "3", "4"):
+                raise ValueError(f"Quadrante inválido: {token!r}.")
+            campos["quadrante"] = int(valor)
+        elif prefixo == "T":
+            campos["tempo"] = _codigo(TEMPOS, valor, "tempo")
+        elif prefixo == "N":
+            campos["newaza"] = True
+            campos["autor_newaza"] = _codigo(AUTORES, valor, "atleta do ne-waza")
+        elif prefixo == "D":
+            campos["direcao"] = _codigo(DIRECOES_NEWAZA, valor, "direção do ne-waza")
+        elif prefixo == "P":
+            campos["partida"] = _codigo(PARTIDAS_NEWAZA, valor, "partida do ne-waza")
+        elif prefixo == "E":
+            campos["efetividade_newaza"] = _codigo(EFETIVIDADES_NEWAZA, valor, "efetividade do ne-waza")
+        else:
+            raise ValueError(f"Campo desconhecido: {token!r}.")
+
+    detalhes_newaza = {"direcao", "partida", "efetividade_newaza"} & campos.keys()
+    if detalhes_newaza and not campos.get("newaza"):
+        raise ValueError("Informe o atleta do ne-waza (n1 ou n2) para registrar os dados da passagem.")
+
+    return AcaoRapida(autor, mao_direita, mao_esquerda, grupo_golpe, efetividade_golpe, **campos)
+
+
+def descrever(acao):
+    """Resumo legível de uma AcaoRapida, para confirmação na tela."""
+    partes = [acao.autor, f"{acao.mao_direita or '-'} / {acao.mao_esquerda or '-'}", acao.grupo_golpe,
+              acao.efetividade_golpe]
+    if acao.quadrante:
+        partes.append(f"Q{acao.quadrante}")
+    if acao.newaza:
+        partes.append(f"ne-waza {acao.autor_newaza} {acao.direcao or ''} {acao.partida or ''} "
+                      f"{acao.efetividade_newaza or ''}".strip())
+    return " · ".join(partes)
@@ -0,0 +1,125 @@
+"""
+Executor em segundo plano das exclusões e mesclagens de atletas.
+
+A exclusão de um atleta remove seus confrontos e todas as ações e shidos desses confrontos, o que pode chegar a
+dezenas de milhares de linhas. Em vez de um único DELETE com cascata (que bloquearia as tabelas durante a
+marcação ao vivo), as páginas enfileiram uma tarefa aqui: uma thread do processo executa os lotes de
+`DBManager.deletar_atletas_em_lotes`, com uma pausa entre eles, e atualiza o progresso da tarefa, exibido pelas
+páginas. As mesclagens de duplicados (`DBManager.mesclar_atletas`) só reescrevem as referências, em uma única
+transação, e passam pela mesma fila para não disputar as mesmas linhas com uma exclusão em andamento.
+"""
+import itertools
+import queue
+import threading
+import time
+from typing import Optional
+
+import streamlit as st
+
+from db_manager import get_db_manager
+
+# Pausa entre lotes, para que as gravações ao vivo sempre encontrem o banco livre
+PAUSA_ENTRE_LOTES = 0.05
+
+# Tarefas concluídas mantidas para exibição
+TAREFAS_MANTIDAS = 20
+
+
+class TarefaExclusao:
+    """Uma exclusão (ou mesclagem) enfileirada, com o progresso por tabela."""
+
+    _sequencia = itertools.count(1)
+
+    def __init__(self, tipo, descricao, atleta_ids, mapa=None, previsto=None):
+        self.id = next(TarefaExclusao._sequencia)
+        self.tipo = tipo
+        self.descricao = descricao
+        self.atleta_ids = list(atleta_ids)
+        self.mapa = mapa  # {duplicado_id: atleta_id mantido} nas mesclagens
+        self.previsto = previsto  # DependentesAtletas da prévia (None nas mesclagens)
+        self.processadas = {}
+        self.estado = "na fila"
+        self.erro: Optional[str] = None
+        self.inicio = None
+        self.fim = None
+
+    @property
+    def ativa(self):
+        return self.estado in ("na fila", "executando")
+
+    def fracao_concluida(self):
+        """Fração das linhas previstas já removidas (None se não houver prévia)."""
+        if self.estado == "concluída":
+            return 1.0
+        if not self.previsto or not sum(self.previsto):
+            return None
+        return min(1.0, sum(self.processadas.values()) / sum(self.previsto))
+
+
+class ExecutorExclusoes:
+    """Fila de tarefas de exclusão executadas, uma por vez, por uma thread do processo."""
+
+    def __init__(self, db_manager, pausa=PAUSA_ENTRE_LOTES):
+        self.db_manager = db_manager
+        self.pausa = pausa
+        self._fila = queue.Queue()
+        self._tarefas = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._executar, name="executor-exclusoes", daemon=True)
+        self._thread.start()
+
+    def excluir(self, atleta_ids, descricao, previsto=None):
+        """Enfileira a exclusão dos atletas com todos os seus dados. Retorna a TarefaExclusao."""
+        return self._enfileirar(TarefaExclusao("exclusao", descricao, atleta_ids, previsto=previsto))
+
+    def mesclar(self, mapa, descricao):
+        """Enfileira a mesclagem {duplicado_id: atleta_id mantido}. Retorna a TarefaExclusao."""
+        return self._enfileirar(TarefaExclusao("mesclagem", descricao, mapa, mapa=dict(mapa)))
+
+    def _enfileirar(self, tarefa):
+        with self._lock:
+            self._tarefas.append(tarefa)
+            concluidas = [t for t in self._tarefas if not t.ativa]
+            for antiga in concluidas[:-TAREFAS_MANTIDAS]:
+                self._tarefas.remove(antiga)
+        self._fila.put(tarefa)
+        return tarefa
+
+    def tarefas(self):
+        """Tarefas em andamento e as concluídas mais recentes, da mais nova para a mais antiga."""
+        with self._lock:
+            return list(reversed(self._tarefas))
+
+    def atletas_em_exclusao(self):
+        """IDs dos atletas com exclusão ou mesclagem ainda não concluída."""
+        with self._lock:
+            return {atleta_id for tarefa in self._tarefas if tarefa.ativa for atleta_id in tarefa.atleta_ids}
+
+    def _executar(self):
+        while True:
+            tarefa = self._fila.get()
+            tarefa.estado = "executando"
+            tarefa.inicio = time.time()
+            try:
+                if tarefa.tipo == "exclusao":
+                    for tabela, linhas in self.db_manager.deletar_atletas_em_lotes(tarefa.atleta_ids):
+                        tarefa.processadas[tabela] = tarefa.processadas.get(tabela, 0) + linhas
+                        time.sleep(self.pausa)
+                else:
+                    resultado = self.db_manager.mesclar_atletas(tarefa.mapa)
+                    if isinstance(resultado, str):
+                        raise RuntimeError(resultado)
+                    tarefa.processadas.update(resultado)
+                tarefa.estado = "concluída"
+            except Exception as e:
+                print(f"Erro na tarefa de {tarefa.tipo} {tarefa.id}:", e)
+                tarefa.erro = str(e)
+                tarefa.estado = "erro"
+            finally:
+                tarefa.fim = time.time()
+
+
+@st.cache_resource
+def obter_executor_exclusoes():
+    """Retorna o executor de exclusões do processo, iniciando a thread na primeira chamada."""
+    return ExecutorExclusoes(get_db_manager())
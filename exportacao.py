@@ -0,0 +1,126 @@
+"""
+Exportação dos dados marcados (confrontos, ações e shidos) para análise externa, em Parquet ou CSV compactado.
+
+As linhas são lidas do banco com um cursor nomeado, em blocos de tamanho fixo (`DBManager.iterar_exportacao`),
+e cada bloco é gravado no arquivo antes da leitura do próximo: o uso de memória não depende do tamanho da
+exportação. No Parquet, as colunas de vocabulário (pegadas, grupos de golpe, efetividades etc.) são gravadas
+com codificação de dicionário.
+
+Uso offline (lê as credenciais de `.streamlit/secrets.toml`, ou de --dsn):
+    python exportacao.py acoes --formato parquet --saida acoes_2024.parquet --inicio 2024-01-01 --fim 2024-12-31
+"""
+import argparse
+import csv
+import gzip
+from datetime import date
+
+from db_manager import CONSULTAS_EXPORTACAO, DBManager, PoolConexoes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é necessário apenas para o formato Parquet
+    pa = pq = None
+
+FORMATOS = {"parquet": ".parquet", "csv": ".csv.gz"}
+
+TAMANHO_BLOCO = 10_000
+
+# Colunas com poucos valores distintos, gravadas como dicionário (categorias) no Parquet
+COLUNAS_CATEGORICAS = {
+    "nome_competicao", "classe", "categoria", "clube", "clube1", "clube2", "mao_direita", "mao_esquerda",
+    "grupo_golpe", "efetividade_golpe", "direcao", "partida", "efetividade_newaza", "tipo",
+}
+
+
+def _tipo_arrow(oid):
+    # OIDs dos tipos do Postgres usados nas consultas de exportação
+    return {
+        16: pa.bool_(),
+        20: pa.int64(),
+        21: pa.int16(),
+        23: pa.int32(),
+        1082: pa.date32(),
+        1186: pa.duration("us"),
+    }.get(oid, pa.string())
+
+
+def _coluna_arrow(valores, tipo):
+    if pa.types.is_dictionary(tipo):
+        return pa.array(valores, type=pa.string()).dictionary_encode()
+    return pa.array(valores, type=tipo)
+
+
+def esquema_parquet(db_manager, conjunto):
+    """Esquema Arrow do conjunto, montado a partir dos tipos das colunas no banco."""
+    return pa.schema([
+        (coluna, pa.dictionary(pa.int32(), pa.string()) if coluna in COLUNAS_CATEGORICAS else _tipo_arrow(oid))
+        for coluna, oid in db_manager.tipos_exportacao(conjunto)
+    ])
+
+
+def exportar_parquet(db_manager, conjunto, destino, tamanho_bloco=TAMANHO_BLOCO, **filtros):
+    """Grava o conjunto em `destino` (caminho ou arquivo binário) em Parquet, um row group por bloco."""
+    if pa is None:
+        raise RuntimeError("A exportação em Parquet requer o pacote pyarrow.")
+    esquema = esquema_parquet(db_manager, conjunto)
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+        for colunas, linhas in db_manager.iterar_exportacao(conjunto, tamanho_bloco, **filtros):
+            valores = zip(*linhas)
+            tabela = pa.Table.from_arrays(
+                [_coluna_arrow(coluna, esquema.field(nome).type) for nome, coluna in zip(colunas, valores)],
+                schema=esquema,
+            )
+            escritor.write_table(tabela)
+            total += len(linhas)
+    return total
+
+
+def exportar_csv(db_manager, conjunto, destino, tamanho_bloco=TAMANHO_BLOCO, **filtros):
+    """Grava o conjunto em `destino` (caminho ou arquivo binário) como CSV compactado com gzip."""
+    total = 0
+    with gzip.open(destino, "wt", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(coluna for coluna, _ in db_manager.tipos_exportacao(conjunto))
+        for _, linhas in db_manager.iterar_exportacao(conjunto, tamanho_bloco, **filtros):
+            escritor.writerows(linhas)
+            total += len(linhas)
+    return total
+
+
+def exportar(db_manager, conjunto, destino, formato="parquet", tamanho_bloco=TAMANHO_BLOCO, **filtros):
+    """
+    Exporta `conjunto` ('confrontos', 'acoes' ou 'shido') no `formato` ('parquet' ou 'csv').
+    Aceita os filtros de `DBManager.carregar_dados_analise`. Retorna a quantidade de linhas exportadas.
+    """
+    if conjunto not in CONSULTAS_EXPORTACAO:
+        raise ValueError(f"Conjunto desconhecido: {conjunto!r}.")
+    exportador = exportar_parquet if formato == "parquet" else exportar_csv
+    return exportador(db_manager, conjunto, destino, tamanho_bloco, **filtros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta confrontos, ações ou shidos em Parquet ou CSV.")
+    parser.add_argument("conjunto", choices=list(CONSULTAS_EXPORTACAO))
+    parser.add_argument("--formato", choices=list(FORMATOS), default="parquet")
+    parser.add_argument("--saida", help="Arquivo de destino (padrão: <conjunto> com a extensão do formato)")
+    parser.add_argument("--inicio", type=date.fromisoformat, help="Data inicial das competições (AAAA-MM-DD)")
+    parser.add_argument("--fim", type=date.fromisoformat, help="Data final das competições (AAAA-MM-DD)")
+    parser.add_argument("--campeonato-id", type=int)
+    parser.add_argument("--atleta-id", type=int)
+    parser.add_argument("--dsn", help="String de conexão do Postgres (padrão: credenciais de st.secrets)")
+    args = parser.parse_args()
+
+    saida = args.saida or args.conjunto + FORMATOS[args.formato]
+    db_manager = DBManager(PoolConexoes(maxconn=1, dsn=args.dsn)) if args.dsn else DBManager()
+    try:
+        total = exportar(db_manager, args.conjunto, saida, args.formato, data_inicio=args.inicio,
+                         data_fim=args.fim, campeonato_id=args.campeonato_id, atleta_id=args.atleta_id)
+    finally:
+        db_manager.close()
+    print(f"{total} linhas exportadas para {saida}.")
+
+
+if __name__ == "__main__":
+    main()
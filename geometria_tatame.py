@@ -0,0 +1,151 @@
+"""
+Geometria do tatame: converte cliques nas imagens do tatame em zonas (quadrante, direção de ne-waza etc.).
+
+Cada geometria é definida de forma declarativa por zonas retangulares em coordenadas normalizadas
+(0 a 1 nos dois eixos, origem no canto superior esquerdo da imagem). Na criação, as zonas são reduzidas
+a uma tabela de células e a dois vetores de consulta por eixo, de modo que localizar um clique é apenas
+indexação (O(1)), independentemente do número de zonas e da largura em que a imagem é exibida.
+
+As mesmas geometrias organizam as contagens por zona na disposição do tatame para os mapas de calor
+(`GeometriaTatame.matriz`).
+"""
+from bisect import bisect_right
+from typing import Hashable, NamedTuple
+
+# Posições por eixo nos vetores de consulta; múltiplo de 2, 3, 4, 7 e 8 para que as divisões usuais
+# caiam exatamente em fronteiras de posição
+RESOLUCAO = 840
+
+# Largura (em pixels) com que as imagens do tatame são exibidas na Análise Rápida
+LARGURA_TATAME = 250
+
+
+class Zona(NamedTuple):
+    """Retângulo [x0, x1) x [y0, y1) em coordenadas normalizadas, identificado por `rotulo`."""
+    rotulo: Hashable
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+class GeometriaTatame:
+    """
+    Mapeia posições na imagem do tatame para zonas.
+    Em pontos cobertos por mais de uma zona vale a primeira da lista; pontos fora de todas retornam `padrao`.
+    """
+
+    def __init__(self, zonas, padrao=None, resolucao=RESOLUCAO):
+        self.zonas = tuple(zonas)
+        self.padrao = padrao
+        self.resolucao = resolucao
+
+        # Fronteiras distintas de cada eixo: as células entre fronteiras consecutivas têm uma única zona
+        xs = sorted({0.0, 1.0, *(z.x0 for z in self.zonas), *(z.x1 for z in self.zonas)})
+        ys = sorted({0.0, 1.0, *(z.y0 for z in self.zonas), *(z.y1 for z in self.zonas)})
+        self._celulas = tuple(
+            tuple(self._zona_em((xs[i] + xs[i + 1]) / 2, (ys[j] + ys[j + 1]) / 2) for i in range(len(xs) - 1))
+            for j in range(len(ys) - 1)
+        )
+        self._coluna = self._vetor_consulta(xs)
+        self._linha = self._vetor_consulta(ys)
+
+    def _zona_em(self, u, v):
+        for zona in self.zonas:
+            if zona.x0 <= u < zona.x1 and zona.y0 <= v < zona.y1:
+                return zona.rotulo
+        return self.padrao
+
+    def _vetor_consulta(self, fronteiras):
+        # Para cada posição do eixo, o índice da célula que contém o seu ponto médio
+        ultima = len(fronteiras) - 2
+        return tuple(
+            min(bisect_right(fronteiras, (i + 0.5) / self.resolucao) - 1, ultima) for i in range(self.resolucao)
+        )
+
+    def _posicao(self, coordenada, tamanho):
+        return min(max(int(coordenada / tamanho * self.resolucao), 0), self.resolucao - 1)
+
+    def localizar(self, x, y, largura=LARGURA_TATAME, altura=None):
+        """
+        Retorna o rótulo da zona no ponto (x, y), em pixels de uma imagem exibida com `largura` x `altura`
+        (altura igual à largura quando omitida). Pontos nas bordas da imagem pertencem à zona adjacente.
+        """
+        altura = altura or largura
+        return self._celulas[self._linha[self._posicao(y, altura)]][self._coluna[self._posicao(x, largura)]]
+
+    def localizar_clique(self, coordenadas, largura=LARGURA_TATAME):
+        """
+        Localiza o retorno de `streamlit_image_coordinates` ({"x", "y"} e, nas versões recentes, "width" e
+        "height" da imagem exibida). Retorna None se não houver clique.
+        """
+        if not coordenadas or "x" not in coordenadas or "y" not in coordenadas:
+            return None
+        largura = coordenadas.get("width") or largura
+        return self.localizar(float(coordenadas["x"]), float(coordenadas["y"]), largura,
+                              coordenadas.get("height") or largura)
+
+    @property
+    def rotulos(self):
+        """Rótulos das zonas, na ordem da definição."""
+        return [zona.rotulo for zona in self.zonas]
+
+    def matriz(self, valores, vazio=0):
+        """
+        Dispõe `valores` ({rotulo: valor}) na forma do tatame: uma lista de linhas com uma entrada por célula.
+        Células sem zona recebem None; zonas sem valor recebem `vazio`.
+        """
+        return [
+            [None if rotulo is None else valores.get(rotulo, vazio) for rotulo in linha]
+            for linha in self._celulas
+        ]
+
+
+def grade(linhas, colunas, rotulos=None, x0=0.0, y0=0.0, x1=1.0, y1=1.0):
+    """
+    Zonas de uma grade `linhas` x `colunas` sobre o retângulo informado, numeradas da esquerda para a direita
+    e de cima para baixo a partir de 1, ou com os `rotulos` dados na mesma ordem (None deixa a célula sem zona).
+    """
+    rotulos = list(rotulos) if rotulos is not None else list(range(1, linhas * colunas + 1))
+    if len(rotulos) != linhas * colunas:
+        raise ValueError("A quantidade de rótulos deve ser igual à de células da grade.")
+    largura, altura = (x1 - x0) / colunas, (y1 - y0) / linhas
+    return [
+        Zona(rotulos[linha * colunas + coluna],
+             x0 + coluna * largura, y0 + linha * altura, x0 + (coluna + 1) * largura, y0 + (linha + 1) * altura)
+        for linha in range(linhas)
+        for coluna in range(colunas)
+        if rotulos[linha * colunas + coluna] is not None
+    ]
+
+
+# Proporções da imagem do tatame: área de combate de 8 m com área de segurança de 3 m de cada lado (14 m),
+# e faixa de 1 m junto ao limite da área de combate
+MARGEM_SEGURANCA = 3 / 14
+FAIXA_BORDA = 1 / 14
+
+# Quadrantes de tachi-waza gravados em acoes.quadrante (1 e 2 em cima, 3 e 4 embaixo)
+QUADRANTES = GeometriaTatame(grade(2, 2))
+
+# Direções de ne-waza gravadas em acoes.direcao; o centro não tem direção
+DIRECOES_NEWAZA = GeometriaTatame(grade(3, 3, ["DEF", "F", "DDF", "LE", None, "LD", "DET", "T", "DDT"]))
+
+# Grades mais finas para análises de posição
+ZONAS_16 = GeometriaTatame(grade(4, 4))
+ZONAS_64 = GeometriaTatame(grade(8, 8))
+
+# Dentro ou fora da área de combate
+AREA_COMBATE = GeometriaTatame(
+    [Zona("Dentro", MARGEM_SEGURANCA, MARGEM_SEGURANCA, 1 - MARGEM_SEGURANCA, 1 - MARGEM_SEGURANCA)],
+    padrao="Fora",
+)
+
+# Centro ou borda da área de combate (fora dela: área de segurança)
+BORDA_CENTRO = GeometriaTatame(
+    [
+        Zona("Centro", MARGEM_SEGURANCA + FAIXA_BORDA, MARGEM_SEGURANCA + FAIXA_BORDA,
+             1 - MARGEM_SEGURANCA - FAIXA_BORDA, 1 - MARGEM_SEGURANCA - FAIXA_BORDA),
+        Zona("Borda", MARGEM_SEGURANCA, MARGEM_SEGURANCA, 1 - MARGEM_SEGURANCA, 1 - MARGEM_SEGURANCA),
+    ],
+    padrao="Segurança",
+)
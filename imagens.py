@@ -0,0 +1,53 @@
+"""
+Cache em memória das imagens do tatame usadas nos seletores de posição da Análise Rápida.
+
+Cada imagem é lida do disco, redimensionada e codificada em PNG uma única vez por processo (por imagem e
+largura) e compartilhada entre todas as sessões. Nas reexecuções da página nenhum arquivo é lido e nenhuma
+imagem é reprocessada: o componente recebe os bytes já prontos.
+"""
+import io
+import os
+
+import streamlit as st
+from PIL import Image
+
+from geometria_tatame import LARGURA_TATAME
+
+PASTA_ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+IMAGEM_TATAME = "tatame.png"
+IMAGEM_TATAME_NEWAZA = "tatame_newaza.png"
+
+
+class ImagemPNG:
+    """
+    Imagem já codificada em PNG, mantida em memória.
+    `streamlit_image_coordinates` aceita qualquer objeto com `save(arquivo, format=...)`, como uma imagem do
+    Pillow; aqui `save` apenas copia os bytes prontos, sem decodificar nem recodificar a imagem.
+    """
+
+    def __init__(self, png, largura, altura):
+        self.png = png
+        self.largura = largura
+        self.altura = altura
+
+    def save(self, arquivo, format=None, **kwargs):
+        arquivo.write(self.png)
+
+
+@st.cache_resource(show_spinner=False)
+def carregar_imagem(nome, largura=LARGURA_TATAME):
+    """Retorna a imagem `nome` da pasta assets redimensionada para `largura` pixels (proporção mantida)."""
+    with Image.open(os.path.join(PASTA_ASSETS, nome)) as imagem:
+        altura = round(imagem.height * largura / imagem.width)
+        if imagem.size != (largura, altura):
+            imagem = imagem.resize((largura, altura), Image.LANCZOS)
+        buffer = io.BytesIO()
+        imagem.save(buffer, format="PNG", optimize=True)
+    return ImagemPNG(buffer.getvalue(), largura, altura)
+
+
+def preaquecer(largura=LARGURA_TATAME):
+    """Carrega as imagens do tatame no cache, para que a primeira marcação não espere pelo disco."""
+    for nome in (IMAGEM_TATAME, IMAGEM_TATAME_NEWAZA):
+        carregar_imagem(nome, largura)
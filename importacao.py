@@ -0,0 +1,249 @@
+"""
+Importação em massa de atletas, competições e lutas (chaves de sorteio) a partir de planilhas CSV ou XLSX.
+
+O arquivo é lido em fluxo e processado em blocos: cada bloco é validado e deduplicado em memória (contra as
+chaves já cadastradas e as linhas anteriores do próprio arquivo) e gravado com um COPY para uma tabela
+temporária seguido de um único INSERT (ver `DBManager.importar_*`). Linhas inválidas não interrompem a
+importação; elas são devolvidas no relatório com o número da linha e o motivo.
+
+Colunas esperadas (cabeçalho na primeira linha; maiúsculas e acentos são ignorados):
+    atletas       nome, categoria, ano_nascimento ou data_nasc, clube
+    competicoes   nome_competicao, data_competicao, classe
+    confrontos    competicao, data_competicao (opcional), atleta1, atleta2, categoria
+
+Uso offline (lê as credenciais de `.streamlit/secrets.toml`, ou de --dsn):
+    python importacao.py atletas inscritos.xlsx
+"""
+import argparse
+import codecs
+import csv
+import io
+import os
+import unicodedata
+from datetime import date, datetime
+from itertools import islice
+from typing import NamedTuple
+
+from db_manager import DBManager, PoolConexoes
+
+CATEGORIAS = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+
+# Nomes alternativos aceitos no cabeçalho
+SINONIMOS = {
+    "ano": "ano_nascimento",
+    "ano_de_nascimento": "ano_nascimento",
+    "data_nascimento": "data_nasc",
+    "data_de_nascimento": "data_nasc",
+    "equipe": "clube",
+    "competicao": "nome_competicao",
+    "data": "data_competicao",
+    "atleta_1": "atleta1",
+    "atleta_2": "atleta2",
+}
+
+TAMANHO_BLOCO = 2000
+
+
+class ErroLinha(NamedTuple):
+    linha: int
+    mensagem: str
+
+
+class RelatorioImportacao(NamedTuple):
+    """Resultado de uma importação: linhas lidas, inseridas, já existentes (ignoradas) e erros por linha."""
+    lidas: int
+    inseridas: int
+    ja_cadastradas: int
+    erros: list
+
+
+def _normalizar_cabecalho(nome):
+    nome = unicodedata.normalize("NFKD", str(nome or "")).encode("ascii", "ignore").decode()
+    nome = "_".join(nome.strip().lower().split())
+    return SINONIMOS.get(nome, nome)
+
+
+def ler_linhas(arquivo, nome_arquivo):
+    """
+    Lê uma planilha CSV (separador ',' ou ';', UTF-8) ou XLSX em fluxo.
+    Gera tuplas (numero_linha, registro) com o registro como dicionário indexado pelo cabeçalho normalizado.
+    """
+    if nome_arquivo.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        planilha = load_workbook(arquivo, read_only=True, data_only=True).worksheets[0]
+        linhas = planilha.iter_rows(values_only=True)
+    else:
+        texto = codecs.getreader("utf-8-sig")(arquivo) if not isinstance(arquivo, io.TextIOBase) else arquivo
+        amostra = texto.read(4096)
+        separador = ";" if amostra.count(";") > amostra.count(",") else ","
+        linhas = csv.reader(_reencadear(amostra, texto), delimiter=separador)
+
+    cabecalho = [_normalizar_cabecalho(coluna) for coluna in next(linhas, [])]
+    for numero, valores in enumerate(linhas, start=2):
+        if not any(valor not in (None, "") for valor in valores):
+            continue
+        yield numero, dict(zip(cabecalho, valores))
+
+
+def _reencadear(amostra, texto):
+    # Devolve ao leitor CSV a amostra usada para detectar o separador, seguida do restante do arquivo
+    restante = amostra + texto.readline()
+    yield from io.StringIO(restante)
+    yield from texto
+
+
+def _texto(registro, campo, obrigatorio=True):
+    valor = registro.get(campo)
+    valor = str(valor).strip() if valor is not None else ""
+    if not valor and obrigatorio:
+        raise ValueError(f"Campo '{campo}' vazio ou ausente.")
+    return valor or None
+
+
+def _data(valor, campo):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor or "").strip()
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Data inválida em '{campo}': {texto!r} (use AAAA-MM-DD ou DD/MM/AAAA).")
+
+
+def _categoria(registro):
+    categoria = _texto(registro, "categoria", obrigatorio=False)
+    if categoria is not None and categoria not in CATEGORIAS:
+        raise ValueError(f"Categoria desconhecida: {categoria!r}.")
+    return categoria
+
+
+def _validar_atleta(registro):
+    nome = _texto(registro, "nome")
+    if registro.get("data_nasc") not in (None, ""):
+        data_nasc = _data(registro["data_nasc"], "data_nasc")
+    else:
+        ano = _texto(registro, "ano_nascimento")
+        try:
+            data_nasc = date(int(float(ano)), 1, 1)
+        except (ValueError, OverflowError):
+            raise ValueError(f"Ano de nascimento inválido: {ano!r}.") from None
+    clube = _texto(registro, "clube")
+    return (nome, data_nasc, clube), (nome, _categoria(registro), data_nasc, clube)
+
+
+def _validar_competicao(registro):
+    nome = _texto(registro, "nome_competicao")
+    data_competicao = _data(registro.get("data_competicao"), "data_competicao")
+    return (nome, data_competicao), (nome, data_competicao, _texto(registro, "classe", obrigatorio=False))
+
+
+class _ResolvedorConfrontos:
+    """Resolve nomes de competição e de atletas para IDs, a partir das listas já cadastradas."""
+
+    def __init__(self, db_manager):
+        self.atletas = {}
+        for atleta_id, nome, *_ in db_manager.listar_todos_atletas():
+            self.atletas.setdefault(nome.strip().casefold(), []).append(atleta_id)
+        self.competicoes = {}
+        for campeonato_id, nome, data_competicao, _ in db_manager.listar_competicoes():
+            self.competicoes.setdefault(nome.strip().casefold(), []).append((campeonato_id, data_competicao))
+
+    def _atleta(self, registro, campo):
+        nome = _texto(registro, campo)
+        ids = self.atletas.get(nome.casefold(), [])
+        if len(ids) != 1:
+            motivo = "não cadastrado" if not ids else "com mais de um cadastro"
+            raise ValueError(f"Atleta {nome!r} {motivo}.")
+        return ids[0]
+
+    def __call__(self, registro):
+        nome = _texto(registro, "nome_competicao")
+        candidatas = self.competicoes.get(nome.casefold(), [])
+        if registro.get("data_competicao") not in (None, ""):
+            data_competicao = _data(registro["data_competicao"], "data_competicao")
+            candidatas = [c for c in candidatas if c[1] == data_competicao]
+        if len(candidatas) != 1:
+            motivo = "não cadastrada" if not candidatas else "ambígua (informe data_competicao)"
+            raise ValueError(f"Competição {nome!r} {motivo}.")
+        atleta1_id, atleta2_id = self._atleta(registro, "atleta1"), self._atleta(registro, "atleta2")
+        if atleta1_id == atleta2_id:
+            raise ValueError("Atleta 1 e Atleta 2 são o mesmo atleta.")
+        linha = (candidatas[0][0], atleta1_id, atleta2_id, _categoria(registro))
+        return linha, linha
+
+
+def importar(db_manager, tipo, arquivo, nome_arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Importa uma planilha do `tipo` informado ('atletas', 'competicoes' ou 'confrontos').
+    Retorna um RelatorioImportacao. Um erro do banco em um bloco é registrado na primeira linha do bloco
+    e a importação continua com os blocos seguintes.
+    """
+    if tipo == "atletas":
+        validar, gravar = _validar_atleta, db_manager.importar_atletas
+        vistos = {(nome, data_nasc, clube) for _, nome, _, data_nasc, clube in db_manager.listar_todos_atletas()}
+    elif tipo == "competicoes":
+        validar, gravar = _validar_competicao, db_manager.importar_competicoes
+        vistos = {(nome, data_competicao) for _, nome, data_competicao, _ in db_manager.listar_competicoes()}
+    elif tipo == "confrontos":
+        # Confrontos já cadastrados são filtrados no INSERT; aqui só as repetições dentro do arquivo
+        validar, gravar, vistos = _ResolvedorConfrontos(db_manager), db_manager.importar_confrontos, set()
+    else:
+        raise ValueError(f"Tipo de importação desconhecido: {tipo!r}.")
+
+    lidas = inseridas = ja_cadastradas = 0
+    erros = []
+    registros = ler_linhas(arquivo, nome_arquivo)
+    while True:
+        bloco = list(islice(registros, tamanho_bloco))
+        if not bloco:
+            break
+        lidas += len(bloco)
+        validas = []
+        for numero, registro in bloco:
+            try:
+                chave, linha = validar(registro)
+            except ValueError as e:
+                erros.append(ErroLinha(numero, str(e)))
+                continue
+            if chave in vistos:
+                ja_cadastradas += 1
+                continue
+            vistos.add(chave)
+            validas.append(linha)
+        if not validas:
+            continue
+        resultado = gravar(validas)
+        if isinstance(resultado, str):
+            erros.append(ErroLinha(bloco[0][0], f"Bloco não gravado: {resultado}"))
+        else:
+            inseridas += resultado
+            ja_cadastradas += len(validas) - resultado
+    return RelatorioImportacao(lidas, inseridas, ja_cadastradas, erros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa atletas, competições ou lutas de uma planilha.")
+    parser.add_argument("tipo", choices=("atletas", "competicoes", "confrontos"))
+    parser.add_argument("arquivo", help="Planilha CSV ou XLSX")
+    parser.add_argument("--dsn", help="String de conexão do Postgres (padrão: credenciais de st.secrets)")
+    args = parser.parse_args()
+
+    db_manager = DBManager(PoolConexoes(maxconn=1, dsn=args.dsn)) if args.dsn else DBManager()
+    try:
+        with open(args.arquivo, "rb") as arquivo:
+            relatorio = importar(db_manager, args.tipo, arquivo, os.path.basename(args.arquivo))
+    finally:
+        db_manager.close()
+    print(f"{relatorio.lidas} linhas lidas, {relatorio.inseridas} inseridas, "
+          f"{relatorio.ja_cadastradas} já cadastradas, {len(relatorio.erros)} com erro.")
+    for erro in relatorio.erros:
+        print(f"  linha {erro.linha}: {erro.mensagem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Medição de latência por rerun: comandos SQL, retirada de conexões do pool e fases de renderização das páginas.
+
+As conexões do pool usam `CursorInstrumentado`, que cronometra cada `execute`, `executemany` e `copy_expert` e
+registra a impressão digital do SQL (texto normalizado, sem literais), as linhas afetadas/retornadas e a duração.
+As páginas marcam suas fases com `fase(nome)` ou `@cronometrar(nome)`, e `app.py` abre um `rerun()` em volta de
+cada execução do script; cada medição fica associada ao rerun e à sessão em que ocorreu. Fragmentos
+reexecutados sozinhos abrem o próprio rerun. Comandos de threads em segundo plano (sincronizador do diário)
+ficam sem rerun.
+
+As medições ficam em um buffer circular em memória (as mais antigas são descartadas), exibido pelo painel de
+diagnóstico (`diagnostico.py`, visível com `?diagnostico=1` na URL). Opcionalmente, cada medição também é
+gravada como uma linha JSON em um arquivo local (chave INSTRUMENTACAO_ARQUIVO em st.secrets["DB"]).
+"""
+import contextvars
+import functools
+import itertools
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+import psycopg2.extensions
+import streamlit as st
+
+TAMANHO_BUFFER = 5000
+
+# Tamanho máximo da impressão digital do SQL
+TAMANHO_IMPRESSAO = 300
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ARRAYS = re.compile(r"ARRAY\[[^\]]*\]", re.IGNORECASE)
+_TUPLAS = re.compile(r"\((?:\s*(?:\?|NULL|true|false)(?:::[\w\[\]]+)?\s*,?)+\)", re.IGNORECASE)
+_LISTAS_TUPLAS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_ESPACOS = re.compile(r"\s+")
+
+
+class Medicao(NamedTuple):
+    """Uma medição: `tipo` é 'rerun', 'fase', 'sql' ou 'conexao'; `linhas` é -1 quando não se aplica."""
+    instante: float
+    sessao: Optional[str]
+    rerun: Optional[int]
+    tipo: str
+    nome: str
+    duracao_ms: float
+    linhas: int = -1
+
+
+# (sessao, rerun) do script em execução na thread atual; None fora de um rerun
+_rerun_atual = contextvars.ContextVar("rerun_atual", default=None)
+_sequencia_reruns = itertools.count(1)
+
+
+def impressao_digital(sql):
+    """SQL normalizado para agrupar execuções do mesmo comando: literais viram '?' e listas de VALUES, '(...)'."""
+    texto = sql.decode(errors="replace") if isinstance(sql, bytes) else str(sql)
+    texto = _ARRAYS.sub("ARRAY[...]", _LITERAIS.sub("?", texto))
+    texto = _LISTAS_TUPLAS.sub("(...)", _TUPLAS.sub("(...)", texto))
+    return _ESPACOS.sub(" ", texto).strip()[:TAMANHO_IMPRESSAO]
+
+
+class RegistroLatencia:
+    """Buffer circular de medições, seguro entre threads, com gravação opcional em JSON Lines."""
+
+    def __init__(self, tamanho=TAMANHO_BUFFER, arquivo=None):
+        self._medicoes = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+        self._arquivo = None
+        self.configurar(tamanho, arquivo)
+
+    def configurar(self, tamanho=TAMANHO_BUFFER, arquivo=None):
+        """Ajusta o tamanho do buffer (mantendo as medições mais recentes) e o arquivo de log (None desliga)."""
+        with self._lock:
+            if tamanho != self._medicoes.maxlen:
+                self._medicoes = deque(self._medicoes, maxlen=tamanho)
+            if self._arquivo is not None:
+                self._arquivo.close()
+            self._arquivo = open(arquivo, "a", encoding="utf-8", buffering=1) if arquivo else None
+
+    def registrar(self, tipo, nome, duracao, linhas=-1):
+        """Registra uma medição de `duracao` segundos no rerun atual."""
+        sessao, rerun = _rerun_atual.get() or (None, None)
+        medicao = Medicao(time.time(), sessao, rerun, tipo, nome, duracao * 1000, linhas)
+        with self._lock:
+            self._medicoes.append(medicao)
+            if self._arquivo is not None:
+                self._arquivo.write(json.dumps(medicao._asdict(), ensure_ascii=False) + "\n")
+
+    def medicoes(self):
+        """Cópia das medições do buffer, da mais antiga para a mais recente."""
+        with self._lock:
+            return list(self._medicoes)
+
+    def limpar(self):
+        with self._lock:
+            self._medicoes.clear()
+
+
+# Registro único do processo, compartilhado por todas as sessões e pelo pool de conexões
+registro = RegistroLatencia()
+
+
+class CursorInstrumentado(psycopg2.extensions.cursor):
+    """Cursor que registra impressão digital, linhas e duração de cada comando em `registro`."""
+
+    def _medir(self, sql, executar, *argumentos):
+        inicio = time.perf_counter()
+        try:
+            return executar(*argumentos)
+        finally:
+            registro.registrar("sql", impressao_digital(sql), time.perf_counter() - inicio, self.rowcount)
+
+    def execute(self, query, vars=None):
+        return self._medir(query, super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._medir(query, super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._medir(sql, super().copy_expert, sql, file, size)
+
+
+@contextmanager
+def rerun(sessao=None):
+    """Agrupa as medições de uma execução do script (ou de um fragmento) sob um novo identificador de rerun."""
+    token = _rerun_atual.set((sessao, next(_sequencia_reruns)))
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.registrar("rerun", "rerun", time.perf_counter() - inicio)
+        _rerun_atual.reset(token)
+
+
+@contextmanager
+def fase(nome):
+    """Cronometra uma fase da renderização. Fora de um rerun (fragmento reexecutado sozinho), abre um."""
+    if _rerun_atual.get() is None:
+        with rerun(st.session_state.get("id_sessao")), fase(nome):
+            yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.registrar("fase", nome, time.perf_counter() - inicio)
+
+
+def cronometrar(nome=None):
+    """Decorador equivalente a `with fase(nome):` em volta da função (nome padrão: o da função)."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with fase(nome or funcao.__name__):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
@@ -0,0 +1,129 @@
+"""
+Migrações versionadas do esquema do banco de dados.
+
+Cada arquivo em `migracoes/` segue o formato `NNNN_descricao.sql` e é aplicado uma única vez, em ordem,
+dentro de uma transação própria. A versão aplicada é registrada na tabela `schema_version`.
+
+Uso offline (lê as credenciais de `.streamlit/secrets.toml`, ou de --dsn):
+    python migracoes.py            aplica as migrações pendentes
+    python migracoes.py --status   mostra a versão atual e as migrações pendentes
+"""
+import argparse
+import os
+import re
+
+import streamlit as st
+
+from db_manager import DBManager, PoolConexoes, get_db_manager
+
+PASTA_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migracoes")
+PADRAO_ARQUIVO = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Chave do advisory lock que serializa a aplicação de migrações entre processos
+CHAVE_LOCK_MIGRACOES = 4_207_001
+
+
+def listar_migracoes(pasta=PASTA_MIGRACOES):
+    """
+    Lista os arquivos de migração da pasta informada.
+    Retorna uma lista ordenada de tuplas (versao, nome, caminho).
+    """
+    migracoes = []
+    for arquivo in os.listdir(pasta):
+        correspondencia = PADRAO_ARQUIVO.match(arquivo)
+        if correspondencia:
+            versao = int(correspondencia.group(1))
+            migracoes.append((versao, correspondencia.group(2), os.path.join(pasta, arquivo)))
+    migracoes.sort()
+    versoes = [versao for versao, _, _ in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise ValueError("Existem arquivos de migração com a mesma versão.")
+    return migracoes
+
+
+def versao_atual(db_manager):
+    """Retorna a maior versão registrada em `schema_version` (0 se a tabela ainda não existir)."""
+    with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL;")
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version;")
+        return cursor.fetchone()[0]
+
+
+def aplicar_migracoes(db_manager, pasta=PASTA_MIGRACOES):
+    """
+    Aplica, em ordem, todas as migrações com versão maior que a registrada no banco.
+    Cada migração roda em sua própria transação, protegida por um advisory lock para que dois processos
+    iniciando ao mesmo tempo não apliquem a mesma versão.
+    Retorna a lista de tuplas (versao, nome) aplicadas.
+    """
+    aplicadas = []
+    atual = versao_atual(db_manager)
+    for versao, nome, caminho in listar_migracoes(pasta):
+        if versao <= atual:
+            continue
+        with open(caminho, encoding="utf-8") as arquivo:
+            sql = arquivo.read()
+        with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s);", (CHAVE_LOCK_MIGRACOES,))
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    versao INT PRIMARY KEY,
+                    nome TEXT NOT NULL,
+                    aplicada_em TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            cursor.execute("SELECT 1 FROM schema_version WHERE versao = %s;", (versao,))
+            if cursor.fetchone():
+                conn.commit()
+                continue
+            cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_version (versao, nome) VALUES (%s, %s);", (versao, nome))
+            conn.commit()
+        print(f"Migração {versao:04d}_{nome} aplicada com sucesso!")
+        aplicadas.append((versao, nome))
+    return aplicadas
+
+
+def garantir_esquema(db_manager, pasta=PASTA_MIGRACOES):
+    """
+    Verifica a versão do esquema e aplica as migrações pendentes.
+    Quando o banco já está atualizado o custo é apenas a consulta da versão, sem nenhum DDL.
+    """
+    migracoes = listar_migracoes(pasta)
+    if not migracoes or versao_atual(db_manager) >= migracoes[-1][0]:
+        return []
+    return aplicar_migracoes(db_manager, pasta)
+
+
+@st.cache_resource
+def garantir_esquema_uma_vez():
+    """Executa `garantir_esquema` uma única vez por processo do Streamlit."""
+    return garantir_esquema(get_db_manager())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica as migrações do esquema do banco de dados.")
+    parser.add_argument("--dsn", help="String de conexão do Postgres (padrão: credenciais de st.secrets)")
+    parser.add_argument("--status", action="store_true", help="Apenas mostra a versão atual e as pendências")
+    args = parser.parse_args()
+
+    db_manager = DBManager(PoolConexoes(maxconn=1, dsn=args.dsn)) if args.dsn else DBManager()
+    try:
+        atual = versao_atual(db_manager)
+        pendentes = [(versao, nome) for versao, nome, _ in listar_migracoes() if versao > atual]
+        print(f"Versão atual do esquema: {atual}")
+        if args.status:
+            for versao, nome in pendentes:
+                print(f"Pendente: {versao:04d}_{nome}")
+        elif not pendentes:
+            print("Nenhuma migração pendente.")
+        else:
+            aplicar_migracoes(db_manager)
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+-- Esquema inicial (antigo DBManager.criar_tabelas).
+-- Usa IF NOT EXISTS para adotar bancos criados antes do controle de versão.
+
+CREATE TABLE IF NOT EXISTS atletas (
+    id SERIAL PRIMARY KEY,
+    nome TEXT NOT NULL,
+    categoria TEXT,
+    data_nasc DATE,
+    clube TEXT
+);
+
+CREATE TABLE IF NOT EXISTS campeonato (
+    id SERIAL PRIMARY KEY,
+    nome_competicao TEXT NOT NULL,
+    data_competicao DATE NOT NULL,
+    classe TEXT
+);
+
+CREATE TABLE IF NOT EXISTS confrontos (
+    id SERIAL PRIMARY KEY,
+    campeonato_id INT NOT NULL REFERENCES campeonato(id) ON DELETE CASCADE,
+    atleta1_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    atleta2_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    vencedor_id INT REFERENCES atletas(id) ON DELETE SET NULL,
+    categoria TEXT,
+    tempo_luta INTERVAL
+);
+
+CREATE TABLE IF NOT EXISTS acoes (
+    id SERIAL PRIMARY KEY,
+    confronto_id INT NOT NULL REFERENCES confrontos(id) ON DELETE CASCADE,
+    atleta_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    quadrante INT,
+    grupo_golpe TEXT,
+    tempo_ocorrido INTERVAL,
+    mao_direita TEXT,
+    mao_esquerda TEXT,
+    efetividade_golpe TEXT,
+    newaza BOOLEAN,
+    atleta_id_nw INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    direcao TEXT,
+    partida TEXT,
+    efetividade_newaza TEXT
+);
+
+CREATE TABLE IF NOT EXISTS shido (
+    id SERIAL PRIMARY KEY,
+    confronto_id INT NOT NULL REFERENCES confrontos(id) ON DELETE CASCADE,
+    atleta_id INT NOT NULL REFERENCES atletas(id) ON DELETE CASCADE,
+    tipo TEXT,
+    tempo INTERVAL
+);
@@ -0,0 +1,68 @@
+-- Índices das chaves estrangeiras e colunas de busca usadas pelo DBManager.
+-- As restrições UNIQUE substituem as verificações "SELECT e depois INSERT" de
+-- adicionar_atleta e adicionar_competicao; duplicatas já existentes são mescladas antes
+-- das restrições: as referências passam para o registro de menor id e os demais são excluídos.
+
+CREATE INDEX IF NOT EXISTS idx_confrontos_campeonato ON confrontos (campeonato_id);
+CREATE INDEX IF NOT EXISTS idx_confrontos_atleta1 ON confrontos (atleta1_id);
+CREATE INDEX IF NOT EXISTS idx_confrontos_atleta2 ON confrontos (atleta2_id);
+CREATE INDEX IF NOT EXISTS idx_confrontos_vencedor ON confrontos (vencedor_id);
+
+CREATE INDEX IF NOT EXISTS idx_acoes_confronto ON acoes (confronto_id);
+CREATE INDEX IF NOT EXISTS idx_acoes_atleta ON acoes (atleta_id);
+CREATE INDEX IF NOT EXISTS idx_acoes_atleta_nw ON acoes (atleta_id_nw);
+
+CREATE INDEX IF NOT EXISTS idx_shido_confronto ON shido (confronto_id);
+CREATE INDEX IF NOT EXISTS idx_shido_atleta ON shido (atleta_id);
+
+CREATE INDEX IF NOT EXISTS idx_atletas_clube ON atletas (clube);
+
+-- Atletas repetidos (mesmo nome, data de nascimento e clube; NULLs não se repetem para a restrição)
+CREATE TEMPORARY TABLE atletas_repetidos ON COMMIT DROP AS
+SELECT id AS duplicado, mantido FROM (
+    SELECT id, min(id) OVER (PARTITION BY nome, data_nasc, clube) AS mantido FROM atletas
+    WHERE data_nasc IS NOT NULL AND clube IS NOT NULL
+) a
+WHERE id <> mantido;
+
+-- Uma luta entre dois cadastros do mesmo atleta viraria uma luta do atleta contra si mesmo (o mesmo caso que
+-- DBManager.mesclar_atletas recusa): a migração é interrompida para que essas lutas sejam corrigidas à mão
+DO $$
+DECLARE
+    lutas TEXT;
+BEGIN
+    SELECT string_agg(c.id::text, ', ' ORDER BY c.id) INTO lutas
+    FROM confrontos c
+    LEFT JOIN atletas_repetidos r1 ON r1.duplicado = c.atleta1_id
+    LEFT JOIN atletas_repetidos r2 ON r2.duplicado = c.atleta2_id
+    WHERE (r1.duplicado IS NOT NULL OR r2.duplicado IS NOT NULL)
+      AND COALESCE(r1.mantido, c.atleta1_id) = COALESCE(r2.mantido, c.atleta2_id);
+    IF lutas IS NOT NULL THEN
+        RAISE EXCEPTION 'Confrontos entre cadastros repetidos do mesmo atleta: %', lutas
+            USING HINT = 'Corrija os atletas desses confrontos (ou exclua-os) e aplique as migrações novamente.';
+    END IF;
+END $$;
+
+UPDATE confrontos t SET atleta1_id = r.mantido FROM atletas_repetidos r WHERE t.atleta1_id = r.duplicado;
+UPDATE confrontos t SET atleta2_id = r.mantido FROM atletas_repetidos r WHERE t.atleta2_id = r.duplicado;
+UPDATE confrontos t SET vencedor_id = r.mantido FROM atletas_repetidos r WHERE t.vencedor_id = r.duplicado;
+UPDATE acoes t SET atleta_id = r.mantido FROM atletas_repetidos r WHERE t.atleta_id = r.duplicado;
+UPDATE acoes t SET atleta_id_nw = r.mantido FROM atletas_repetidos r WHERE t.atleta_id_nw = r.duplicado;
+UPDATE shido t SET atleta_id = r.mantido FROM atletas_repetidos r WHERE t.atleta_id = r.duplicado;
+DELETE FROM atletas USING atletas_repetidos r WHERE atletas.id = r.duplicado;
+
+-- Competições repetidas (mesmo nome e data)
+CREATE TEMPORARY TABLE competicoes_repetidas ON COMMIT DROP AS
+SELECT id AS duplicado, mantido FROM (
+    SELECT id, min(id) OVER (PARTITION BY nome_competicao, data_competicao) AS mantido FROM campeonato
+) c
+WHERE id <> mantido;
+
+UPDATE confrontos t SET campeonato_id = r.mantido FROM competicoes_repetidas r WHERE t.campeonato_id = r.duplicado;
+DELETE FROM campeonato USING competicoes_repetidas r WHERE campeonato.id = r.duplicado;
+
+ALTER TABLE atletas
+    ADD CONSTRAINT uq_atletas_nome_nasc_clube UNIQUE (nome, data_nasc, clube);
+
+ALTER TABLE campeonato
+    ADD CONSTRAINT uq_campeonato_nome_data UNIQUE (nome_competicao, data_competicao);
@@ -0,0 +1,10 @@
+-- Identificador gerado no cliente para cada ação e shido. Permite reenviar lotes
+-- (spool local, novas tentativas) sem duplicar linhas: INSERT ... ON CONFLICT (evento_uid).
+ALTER TABLE acoes ADD COLUMN IF NOT EXISTS evento_uid UUID;
+ALTER TABLE shido ADD COLUMN IF NOT EXISTS evento_uid UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_acoes_evento_uid ON acoes (evento_uid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_shido_evento_uid ON shido (evento_uid);
+
+-- Ações sem ne-waza não têm atleta de ne-waza; a página sempre enviou NULL nesses casos.
+ALTER TABLE acoes ALTER COLUMN atleta_id_nw DROP NOT NULL;
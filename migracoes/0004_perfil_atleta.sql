@@ -0,0 +1,121 @@
+-- Perfil de scouting materializado por atleta: uma linha por atleta com as distribuições
+-- usadas antes de uma luta (pegadas, quadrantes, grupos de golpe, ne-waza e shidos).
+-- A leitura é uma busca pela chave primária; a função atualizar_perfis_atletas recalcula
+-- apenas os atletas informados e é chamada pelo DBManager na mesma transação que grava
+-- ações, shidos ou o resultado de um confronto.
+
+CREATE TABLE IF NOT EXISTS perfil_atleta (
+    atleta_id INT PRIMARY KEY REFERENCES atletas(id) ON DELETE CASCADE,
+    lutas INT NOT NULL,
+    vitorias INT NOT NULL,
+    acoes INT NOT NULL,
+    pegadas JSONB NOT NULL,
+    quadrantes JSONB NOT NULL,
+    grupos_golpe JSONB NOT NULL,
+    newaza_direcao JSONB NOT NULL,
+    newaza_partida JSONB NOT NULL,
+    shidos_tipo JSONB NOT NULL,
+    shidos_minuto JSONB NOT NULL,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Efetividades que contam como pontuação: a mesma lista de vocabulario.EFETIVIDADES_PONTUADAS,
+-- conferida por vocabulario.divergencias
+CREATE OR REPLACE FUNCTION efetividades_pontuadas() RETURNS TEXT[]
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT ARRAY['Yuko', 'Waza-Ari', 'Ippon'];
+$$;
+
+-- Distribuições no formato {"chave": {"total": n, "pontuadas": m}} (ne-waza: "sucessos")
+-- ou {"chave": n} (quadrantes e shidos). Lutas contam apenas confrontos finalizados.
+CREATE OR REPLACE FUNCTION atualizar_perfis_atletas(ids INT[]) RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO perfil_atleta (
+        atleta_id, lutas, vitorias, acoes, pegadas, quadrantes, grupos_golpe,
+        newaza_direcao, newaza_partida, shidos_tipo, shidos_minuto, atualizado_em
+    )
+    SELECT
+        a.id,
+        (SELECT count(*) FROM confrontos c
+         WHERE c.vencedor_id IS NOT NULL AND (c.atleta1_id = a.id OR c.atleta2_id = a.id)),
+        (SELECT count(*) FROM confrontos c WHERE c.vencedor_id = a.id),
+        (SELECT count(*) FROM acoes ac WHERE ac.atleta_id = a.id),
+        COALESCE((
+            SELECT jsonb_object_agg(chave, jsonb_build_object('total', total, 'pontuadas', pontuadas))
+            FROM (
+                SELECT concat_ws(' / ', ac.mao_direita, ac.mao_esquerda) AS chave, count(*) AS total,
+                       count(*) FILTER (WHERE ac.efetividade_golpe::text = ANY(efetividades_pontuadas())) AS pontuadas
+                FROM acoes ac WHERE ac.atleta_id = a.id
+                GROUP BY 1
+            ) x
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(ac.quadrante::text, total)
+            FROM (
+                SELECT quadrante, count(*) AS total FROM acoes
+                WHERE atleta_id = a.id AND quadrante IS NOT NULL
+                GROUP BY quadrante
+            ) ac
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(chave, jsonb_build_object('total', total, 'pontuadas', pontuadas))
+            FROM (
+                SELECT ac.grupo_golpe AS chave, count(*) AS total,
+                       count(*) FILTER (WHERE ac.efetividade_golpe::text = ANY(efetividades_pontuadas())) AS pontuadas
+                FROM acoes ac WHERE ac.atleta_id = a.id AND ac.grupo_golpe IS NOT NULL
+                GROUP BY 1
+            ) x
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(chave, jsonb_build_object('total', total, 'sucessos', sucessos))
+            FROM (
+                SELECT ac.direcao AS chave, count(*) AS total,
+                       count(*) FILTER (WHERE ac.efetividade_newaza::text = ANY(efetividades_pontuadas())) AS sucessos
+                FROM acoes ac WHERE ac.atleta_id_nw = a.id AND ac.newaza AND ac.direcao IS NOT NULL
+                GROUP BY 1
+            ) x
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(chave, jsonb_build_object('total', total, 'sucessos', sucessos))
+            FROM (
+                SELECT ac.partida AS chave, count(*) AS total,
+                       count(*) FILTER (WHERE ac.efetividade_newaza::text = ANY(efetividades_pontuadas())) AS sucessos
+                FROM acoes ac WHERE ac.atleta_id_nw = a.id AND ac.newaza AND ac.partida IS NOT NULL
+                GROUP BY 1
+            ) x
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(tipo, total)
+            FROM (
+                SELECT tipo, count(*) AS total FROM shido
+                WHERE atleta_id = a.id AND tipo IS NOT NULL
+                GROUP BY tipo
+            ) sh
+        ), '{}'),
+        COALESCE((
+            SELECT jsonb_object_agg(minuto::text, total)
+            FROM (
+                SELECT floor(extract(epoch FROM tempo) / 60)::int AS minuto, count(*) AS total FROM shido
+                WHERE atleta_id = a.id AND tempo IS NOT NULL
+                GROUP BY 1
+            ) sh
+        ), '{}'),
+        now()
+    FROM atletas a
+    WHERE a.id = ANY(ids)
+    ON CONFLICT (atleta_id) DO UPDATE SET
+        lutas = EXCLUDED.lutas,
+        vitorias = EXCLUDED.vitorias,
+        acoes = EXCLUDED.acoes,
+        pegadas = EXCLUDED.pegadas,
+        quadrantes = EXCLUDED.quadrantes,
+        grupos_golpe = EXCLUDED.grupos_golpe,
+        newaza_direcao = EXCLUDED.newaza_direcao,
+        newaza_partida = EXCLUDED.newaza_partida,
+        shidos_tipo = EXCLUDED.shidos_tipo,
+        shidos_minuto = EXCLUDED.shidos_minuto,
+        atualizado_em = EXCLUDED.atualizado_em;
+$$;
+
+-- Carga inicial com o histórico já gravado
+SELECT atualizar_perfis_atletas(array_agg(id)) FROM atletas;
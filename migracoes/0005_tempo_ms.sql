@@ -0,0 +1,13 @@
+-- Tempo de luta em milissegundos (inteiro) ao lado dos INTERVAL, para análises por janela de tempo
+-- com varreduras por faixa de inteiros. As colunas são geradas pelo banco a partir de tempo_ocorrido
+-- e tempo, então ficam sempre consistentes e as linhas existentes já são preenchidas.
+ALTER TABLE acoes
+    ADD COLUMN IF NOT EXISTS tempo_ms INT
+    GENERATED ALWAYS AS ((EXTRACT(epoch FROM tempo_ocorrido) * 1000)::int) STORED;
+
+ALTER TABLE shido
+    ADD COLUMN IF NOT EXISTS tempo_ms INT
+    GENERATED ALWAYS AS ((EXTRACT(epoch FROM tempo) * 1000)::int) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_acoes_atleta_tempo ON acoes (atleta_id, tempo_ms);
+CREATE INDEX IF NOT EXISTS idx_shido_atleta_tempo ON shido (atleta_id, tempo_ms);
@@ -0,0 +1,70 @@
+-- Vocabulário controlado das ações e shidos (ver vocabulario.py): as colunas de pegadas, grupo do golpe,
+-- efetividades, ne-waza e tipo de shido deixam de ser TEXT livre e passam a tipos ENUM, gravados com
+-- 4 bytes por linha e que recusam valores fora da lista.
+--
+-- Antes da conversão, variações de maiúsculas e espaços são corrigidas para o valor da lista; valores
+-- que continuam fora da lista (por exemplo 'Desconhecido' na direção do ne-waza) são copiados para
+-- vocabulario_descartado e a coluna fica NULL.
+CREATE TYPE pegada AS ENUM ('Uma Mão (Gola)', 'Gola', 'Gola Cruzada', 'Gola Alta', 'Patolada', 'Patolada Cruzada', 'Arm Drag', 'Uma Mão (Manga)', 'Manga', 'Manga Cruzada', 'Cava', 'Faixa');
+CREATE TYPE grupo_golpe AS ENUM ('Te-Waza', 'Ashi-Waza', 'Koshi-Waza', 'Sutemi-Waza', 'Yoko-Sutemi-waza', 'Kaeshi Waza');
+CREATE TYPE efetividade_golpe AS ENUM ('Yuko', 'Waza-Ari', 'Ippon', 'Golpe Falho', 'Golpe Falso', 'Irrelevante', 'Sofreu contra-golpe');
+CREATE TYPE direcao_newaza AS ENUM ('DEF', 'F', 'DDF', 'LE', 'LD', 'DET', 'T', 'DDT');
+CREATE TYPE partida_newaza AS ENUM ('Cabeça', 'Costas', 'Lateral', 'Meia-Guarda', 'Guarda', 'Oportunista');
+CREATE TYPE efetividade_newaza AS ENUM ('Yuko', 'Waza-Ari', 'Ippon', 'Nada', 'Sofreu Contra-Ataque');
+CREATE TYPE tipo_shido AS ENUM ('Golpe Falso', 'Falta de Combatividade', 'Desligar Kumi-Kata', 'Kumi-Kata Irregular', 'Pegar na Perna', 'Judô Negativo', 'Passou a Cabeça', 'Evitar Kumi-Kata');
+
+CREATE TABLE IF NOT EXISTS vocabulario_descartado (
+    id SERIAL PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    linha_id INT NOT NULL,
+    coluna TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    descartado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TEMPORARY TABLE colunas_vocabulario (tabela, coluna, tipo) ON COMMIT DROP AS VALUES
+    ('acoes', 'mao_direita', 'pegada'),
+    ('acoes', 'mao_esquerda', 'pegada'),
+    ('acoes', 'grupo_golpe', 'grupo_golpe'),
+    ('acoes', 'efetividade_golpe', 'efetividade_golpe'),
+    ('acoes', 'direcao', 'direcao_newaza'),
+    ('acoes', 'partida', 'partida_newaza'),
+    ('acoes', 'efetividade_newaza', 'efetividade_newaza'),
+    ('shido', 'tipo', 'tipo_shido');
+
+DO $$
+DECLARE
+    alvo RECORD;
+BEGIN
+    FOR alvo IN SELECT * FROM colunas_vocabulario LOOP
+        -- Variações de maiúsculas e espaços
+        EXECUTE format(
+            'UPDATE %1$I t SET %2$I = e.enumlabel
+             FROM pg_enum e
+             WHERE e.enumtypid = %3$L::regtype
+               AND lower(btrim(t.%2$I)) = lower(e.enumlabel) AND t.%2$I <> e.enumlabel',
+            alvo.tabela, alvo.coluna, alvo.tipo);
+        -- Valores fora da lista
+        EXECUTE format(
+            'INSERT INTO vocabulario_descartado (tabela, linha_id, coluna, valor)
+             SELECT %1$L, t.id, %2$L, t.%2$I FROM %1$I t
+             WHERE t.%2$I IS NOT NULL
+               AND t.%2$I NOT IN (SELECT enumlabel FROM pg_enum WHERE enumtypid = %3$L::regtype)',
+            alvo.tabela, alvo.coluna, alvo.tipo);
+        EXECUTE format(
+            'UPDATE %1$I SET %2$I = NULL
+             WHERE %2$I NOT IN (SELECT enumlabel FROM pg_enum WHERE enumtypid = %3$L::regtype)',
+            alvo.tabela, alvo.coluna, alvo.tipo);
+    END LOOP;
+
+    -- Um único ALTER TABLE por tabela: cada mudança de tipo reescreve a tabela inteira (sob ACCESS
+    -- EXCLUSIVE), e as colunas convertidas juntas são reescritas em uma só passada
+    FOR alvo IN
+        SELECT tabela, string_agg(format('ALTER COLUMN %1$I TYPE %2$I USING %1$I::%2$I', coluna, tipo), ', ')
+                   AS alteracoes
+        FROM colunas_vocabulario GROUP BY tabela
+    LOOP
+        EXECUTE format('ALTER TABLE %I ', alvo.tabela) || alvo.alteracoes;
+    END LOOP;
+END
+$$;
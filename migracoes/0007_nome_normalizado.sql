@@ -0,0 +1,21 @@
+-- Busca aproximada e deduplicação de atletas pelo nome.
+-- normalizar_nome remove acentos, maiúsculas, as partículas "da", "de", "do", "das", "dos" e "e" e espaços
+-- repetidos ("João da Silva" e "Joao Silva" ficam iguais). O nome normalizado é uma coluna gerada e tem um
+-- índice GiST de trigramas, usado pelos operadores de similaridade do pg_trgm (%, <%, <->, <<->) tanto na
+-- busca dos seletores (vizinhos mais próximos) quanto na procura de duplicados (um acesso ao índice por atleta).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() é STABLE (depende do dicionário padrão); com o dicionário explícito pode ser usada em colunas geradas
+CREATE OR REPLACE FUNCTION normalizar_nome(nome TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT btrim(regexp_replace(
+        regexp_replace(lower(unaccent('unaccent'::regdictionary, nome)), '\m(da|de|do|das|dos|e)\M', ' ', 'g'),
+        '\s+', ' ', 'g'
+    ));
+$$;
+
+ALTER TABLE atletas
+    ADD COLUMN IF NOT EXISTS nome_normalizado TEXT GENERATED ALWAYS AS (normalizar_nome(nome)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_atletas_nome_trgm ON atletas USING gist (nome_normalizado gist_trgm_ops);
@@ -0,0 +1,11 @@
+-- Busca incremental (typeahead) de atletas e competições pelos seletores das páginas.
+-- O prefixo do nome normalizado usa um índice B-tree com text_pattern_ops (LIKE 'joao sil%' independe da
+-- collation); os nomes de competição ganham a mesma normalização e o mesmo índice GiST de trigramas dos atletas.
+CREATE INDEX IF NOT EXISTS idx_atletas_nome_prefixo ON atletas (nome_normalizado text_pattern_ops);
+
+ALTER TABLE campeonato
+    ADD COLUMN IF NOT EXISTS nome_normalizado TEXT GENERATED ALWAYS AS (normalizar_nome(nome_competicao)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_campeonato_nome_prefixo ON campeonato (nome_normalizado text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_campeonato_nome_trgm ON campeonato USING gist (nome_normalizado gist_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_campeonato_data ON campeonato (data_competicao DESC, id DESC);
@@ -0,0 +1,16 @@
+-- Paginação por chave (keyset) das tabelas de lutas e atletas.
+-- Cada página continua a partir da chave da última linha da página anterior ("(chave) > (cursor)"), então os
+-- índices abaixo cobrem a ordenação de cada listagem e seus filtros mais comuns: a página custa o mesmo
+-- qualquer que seja o número de lutas ou atletas cadastrados. A ordenação das competições por data já é
+-- coberta por idx_campeonato_data (0008).
+CREATE INDEX IF NOT EXISTS idx_confrontos_campeonato_id ON confrontos (campeonato_id, id);
+CREATE INDEX IF NOT EXISTS idx_confrontos_categoria_id ON confrontos (categoria, id);
+CREATE INDEX IF NOT EXISTS idx_confrontos_vencedor_id ON confrontos (vencedor_id, id);
+
+CREATE INDEX IF NOT EXISTS idx_atletas_nome_id ON atletas (nome, id);
+CREATE INDEX IF NOT EXISTS idx_atletas_clube_nome_id ON atletas (clube, nome, id);
+
+-- Os índices compostos substituem os de coluna única de 0002
+DROP INDEX IF EXISTS idx_confrontos_campeonato;
+DROP INDEX IF EXISTS idx_confrontos_vencedor;
+DROP INDEX IF EXISTS idx_atletas_clube;
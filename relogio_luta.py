@@ -0,0 +1,92 @@
+"""
+Relógio de luta da Análise Rápida: hajime/matte, tempo regulamentar e golden score.
+
+O estado do relógio (tempo acumulado e instante do último hajime) fica no servidor, em st.session_state, e só
+muda quando o operador clica em Hajime, Matte ou Zerar. A contagem exibida na tela é feita no navegador a
+partir desse estado, sem nenhuma comunicação com o servidor a cada segundo. Cada ação marcada recebe o tempo
+decorrido de luta calculado no servidor no momento do envio.
+"""
+import json
+import time
+
+import streamlit.components.v1 as components
+
+# Tempo regulamentar da luta, em segundos; depois dele o relógio passa a contar o golden score
+DURACAO_REGULAMENTAR = 240
+
+
+class RelogioLuta:
+    """Cronômetro de tempo efetivo de luta (corre apenas entre hajime e matte)."""
+
+    def __init__(self):
+        self.acumulado = 0.0
+        self.inicio = None
+
+    @property
+    def rodando(self):
+        return self.inicio is not None
+
+    @property
+    def iniciado(self):
+        return self.rodando or self.acumulado > 0
+
+    def hajime(self):
+        if not self.rodando:
+            self.inicio = time.monotonic()
+
+    def matte(self):
+        if self.rodando:
+            self.acumulado += time.monotonic() - self.inicio
+            self.inicio = None
+
+    def zerar(self):
+        self.acumulado = 0.0
+        self.inicio = None
+
+    def decorrido(self):
+        """Tempo efetivo de luta, em segundos."""
+        return self.acumulado + (time.monotonic() - self.inicio if self.rodando else 0.0)
+
+    def golden_score(self):
+        return self.decorrido() >= DURACAO_REGULAMENTAR
+
+    def intervalo(self):
+        """Tempo decorrido no formato 'HH:MM:SS.mmm', aceito pelas colunas INTERVAL do banco."""
+        milissegundos = int(self.decorrido() * 1000)
+        segundos, milissegundos = divmod(milissegundos, 1000)
+        minutos, segundos = divmod(segundos, 60)
+        horas, minutos = divmod(minutos, 60)
+        return f"{horas:02d}:{minutos:02d}:{segundos:02d}.{milissegundos:03d}"
+
+
+def exibir(relogio, altura=70):
+    """Mostra o relógio; a contagem corre no navegador a partir do estado atual do servidor."""
+    estado = json.dumps({"decorrido": relogio.decorrido(), "rodando": relogio.rodando,
+                         "regulamentar": DURACAO_REGULAMENTAR})
+    components.html(
+        f"""
+        <div id="relogio" style="font-family: monospace; font-size: 40px; text-align: center;"></div>
+        <script>
+            const estado = {estado};
+            const carregado = performance.now();
+            function formatar(segundos) {{
+                const s = Math.floor(segundos);
+                return Math.floor(s / 60) + ":" + String(s % 60).padStart(2, "0");
+            }}
+            function atualizar() {{
+                const decorrido = estado.decorrido + (estado.rodando ? (performance.now() - carregado) / 1000 : 0);
+                const elemento = document.getElementById("relogio");
+                if (decorrido < estado.regulamentar) {{
+                    elemento.textContent = formatar(estado.regulamentar - decorrido);
+                    elemento.style.color = estado.rodando ? "inherit" : "gray";
+                }} else {{
+                    elemento.textContent = "GS " + formatar(decorrido - estado.regulamentar);
+                    elemento.style.color = estado.rodando ? "goldenrod" : "gray";
+                }}
+            }}
+            atualizar();
+            if (estado.rodando) setInterval(atualizar, 200);
+        </script>
+        """,
+        height=altura,
+    )
@@ -1,3 +1,4 @@
+import pandas as pd
 import streamlit as st
 
 def exibir_texto_centralizado(texto, tamanho=20):
@@ -19,4 +20,85 @@ def exibir_texto_centralizado(texto, tamanho=20):
         </style>
 
         <div class="texto-centralizado">{texto}</div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
+
+def seletor_busca(rotulo, buscar, formatar, key, placeholder="Digite parte do nome"):
+    """
+    Seletor com busca no servidor (typeahead): a cada texto digitado, `buscar(texto)` consulta o banco e só as
+    opções retornadas (no máximo algumas dezenas) são enviadas ao navegador, qualquer que seja o tamanho da tabela.
+    A opção já escolhida continua na lista quando o texto muda.
+
+    Parâmetros:
+        rotulo (str): Rótulo do seletor.
+        buscar (callable): Recebe o texto digitado (vazio para as sugestões iniciais) e retorna as opções.
+        formatar (callable): Texto exibido para cada opção.
+        key (str): Chave do seletor; a caixa de busca usa f"{key}_busca".
+
+    Retorna a opção escolhida ou None.
+    """
+    texto = st.text_input(f"Buscar {rotulo.lower()}", key=f"{key}_busca", placeholder=placeholder)
+    opcoes = list(buscar(texto.strip()))
+    escolhida = st.session_state.get(key)
+    if escolhida is not None and escolhida not in opcoes:
+        opcoes.insert(0, escolhida)
+    return st.selectbox(rotulo, options=opcoes, index=None, key=key, format_func=formatar)
+
+
+def selecionar_atleta(db_manager, rotulo="Atleta", key="atleta", categoria=None, clube=None):
+    """
+    Seletor de atleta com busca aproximada pelo nome (`DBManager.buscar_atletas`, que ignora acentos e partículas
+    como "da"), opcionalmente restrito a uma categoria e a um clube.
+
+    Retorna a tupla (id, nome, categoria, data_nasc, clube) do atleta escolhido ou None.
+    """
+    return seletor_busca(
+        rotulo, lambda texto: db_manager.buscar_atletas(texto, categoria=categoria, clube=clube), key=key,
+        formatar=lambda atleta: f"{atleta[1]} ({atleta[4]}, {atleta[2]})",
+    )
+
+
+def selecionar_competicao(db_manager, rotulo="Competição", key="competicao"):
+    """
+    Seletor de competição com busca pelo nome (`DBManager.buscar_competicoes`); sem texto, sugere as mais recentes.
+
+    Retorna a tupla (id, nome_competicao, data_competicao, classe) da competição escolhida ou None.
+    """
+    return seletor_busca(
+        rotulo, lambda texto: db_manager.buscar_competicoes(texto), key=key,
+        formatar=lambda competicao: f"{competicao[1]} - {competicao[2]}",
+    )
+
+
+def cursor_pagina(key, filtros=()):
+    """
+    Cursor da página atual da tabela paginada `key` (None na primeira página), para carregar a Pagina exibida
+    por `tabela_paginada`. A pilha de cursores das páginas visitadas fica no session_state; quando `filtros`
+    (filtros e ordenação da tabela) mudam, volta para a primeira página.
+    """
+    estado = st.session_state.setdefault(key, {"filtros": None, "cursores": [None]})
+    if estado["filtros"] != filtros:
+        estado.update(filtros=filtros, cursores=[None])
+    return estado["cursores"][-1]
+
+
+def tabela_paginada(key, pagina, colunas, column_config=None):
+    """
+    Exibe uma página de uma tabela paginada no servidor, com botões de página anterior e seguinte.
+
+    Parâmetros:
+        key (str): Chave da tabela, a mesma usada em `cursor_pagina`.
+        pagina (Pagina): Página do DBManager carregada com o cursor de `cursor_pagina(key, ...)`.
+        colunas (list): Nomes das colunas das linhas da página.
+        column_config (dict): Repassado para st.dataframe.
+    """
+    cursores = st.session_state[key]["cursores"]
+    st.dataframe(pd.DataFrame(pagina.linhas, columns=colunas), hide_index=True, column_config=column_config)
+
+    col_anterior, col_pagina, col_proxima = st.columns([1, 4, 1])
+    if col_anterior.button("Anterior", key=f"{key}_anterior", disabled=len(cursores) == 1):
+        cursores.pop()
+        st.rerun()
+    col_pagina.caption(f"Página {len(cursores)}")
+    if col_proxima.button("Próxima", key=f"{key}_proxima", disabled=pagina.proximo is None):
+        cursores.append(pagina.proximo)
+        st.rerun()
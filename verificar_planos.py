@@ -0,0 +1,180 @@
+"""
+Verificação dos planos de consulta do DBManager em um Postgres local descartável.
+
+Aplica as migrações, popula o banco com dados sintéticos (milhares de confrontos e centenas de milhares
+de ações) e executa cada método do DBManager com um cursor que roda `EXPLAIN` antes de cada comando.
+A verificação falha se algum comando fizer Seq Scan com filtro em uma tabela grande, ou seja,
+se um predicado que deveria usar índice estiver varrendo a tabela inteira.
+
+ATENÇÃO: o banco informado é modificado; use apenas um banco de testes.
+    python verificar_planos.py --dsn postgresql://postgres@localhost/scoutjudo_teste
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+import psycopg2.extensions
+
+import dados_sinteticos
+import migracoes
+import vocabulario
+from db_manager import DBManager, PoolConexoes
+
+COMANDOS_VERIFICADOS = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+class CursorExplain(psycopg2.extensions.cursor):
+    """Cursor que registra o plano (EXPLAIN FORMAT JSON) de cada comando antes de executá-lo."""
+
+    planos = []
+    capturando = False
+
+    def execute(self, query, vars=None):
+        texto = query.decode() if isinstance(query, bytes) else query
+        if CursorExplain.capturando and texto.lstrip().upper().startswith(COMANDOS_VERIFICADOS):
+            # EXPLAIN em um cursor à parte: cursores nomeados (do lado do servidor) executam um único comando
+            with self.connection.cursor(cursor_factory=psycopg2.extensions.cursor) as explain:
+                explain.execute("EXPLAIN (FORMAT JSON) " + texto, vars)
+                CursorExplain.planos.append((texto, explain.fetchone()[0][0]["Plan"]))
+        return super().execute(query, vars)
+
+
+def _nos(plano):
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho)
+
+
+def varreduras_suspeitas(plano, linhas_por_tabela, minimo_linhas):
+    """Retorna as tabelas com Seq Scan filtrado cujo volume estimado é de pelo menos `minimo_linhas`."""
+    return [
+        no["Relation Name"]
+        for no in _nos(plano)
+        if no["Node Type"] == "Seq Scan" and "Filter" in no
+        and linhas_por_tabela.get(no["Relation Name"], 0) >= minimo_linhas
+    ]
+
+
+def exercitar_db_manager(db_manager):
+    """
+    Chama todos os métodos do DBManager com parâmetros válidos do banco populado.
+    Retorna as mensagens de falha dos comportamentos conferidos no caminho.
+    """
+    falhas = []
+    with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT id, campeonato_id, atleta1_id, atleta2_id FROM confrontos ORDER BY id LIMIT 3;")
+        (confronto_id, campeonato_id, atleta1_id, atleta2_id), (confronto_descartavel, *_), \
+            (_, _, atleta_descartavel, duplicado) = cursor.fetchall()
+        cursor.execute("SELECT nome, data_nasc, clube FROM atletas WHERE id = %s;", (atleta1_id,))
+        nome, data_nasc, clube = cursor.fetchone()
+        # Atleta que nunca enfrentou o descartável, para uma mesclagem válida
+        cursor.execute("""
+            SELECT id FROM atletas a WHERE id <> %(atleta)s AND NOT EXISTS (
+                SELECT 1 FROM confrontos c
+                WHERE (c.atleta1_id, c.atleta2_id) IN ((a.id, %(atleta)s), (%(atleta)s, a.id))
+            ) ORDER BY id LIMIT 1;
+        """, {"atleta": atleta_descartavel})
+        sem_luta_comum = cursor.fetchone()[0]
+
+    CursorExplain.capturando = True
+    try:
+        db_manager.listar_atletas_por_clube(clube)
+        db_manager.listar_atletas_pagina(clube, "-73")
+        db_manager.listar_atletas_pagina(ordem="cadastro", descendente=True)
+        db_manager.listar_competicoes_pagina(data_inicio=data_nasc)
+        pagina_lutas = db_manager.listar_lutas_pagina(categoria="-73")
+        db_manager.listar_lutas_pagina(categoria="-73", cursor=pagina_lutas.proximo)
+        db_manager.listar_lutas_pagina(campeonato_id=campeonato_id, ordem="cadastro")
+        db_manager.listar_lutas_pagina(vencedor_id=atleta1_id)
+        db_manager.listar_todos_atletas()
+        db_manager.listar_competicoes()
+        db_manager.listar_lutas_por_competicao(campeonato_id)
+        db_manager.obter_confronto(confronto_id)
+        db_manager.contar_golpes(atleta_id=atleta1_id)
+        db_manager.contar_quadrantes(campeonato_id=campeonato_id)
+        db_manager.contar_shidos(atleta_id=atleta1_id)
+        db_manager.contar_acoes_por_janela(atleta_id=atleta1_id, inicio_s=0, fim_s=60)
+        for conjunto in ("confrontos", "acoes", "shido"):
+            next(db_manager.iterar_exportacao(conjunto, campeonato_id=campeonato_id), None)
+        db_manager.desempenho_atletas(campeonato_id=campeonato_id)
+        db_manager.obter_perfil_atleta(atleta1_id)
+        db_manager.atualizar_perfis([atleta1_id, atleta2_id])
+        db_manager.adicionar_atleta(nome, "-73", data_nasc.year, clube)
+        db_manager.editar_atleta(atleta1_id, nome, "-73", data_nasc.year, clube)
+        novo_campeonato = db_manager.adicionar_competicao("Verificação de Planos", date.today(), "Treino")
+        db_manager.adicionar_confronto(campeonato_id, atleta1_id, atleta2_id, "-73", None)
+        db_manager.importar_atletas([(nome, "-73", data_nasc, clube)])
+        db_manager.importar_confrontos([(campeonato_id, atleta1_id, atleta2_id, "-73")])
+        db_manager.adicionar_acao(confronto_id, atleta1_id, 1, "Te-Waza", "00:01:00", "Gola", "Manga",
+                                  "Yuko", False, atleta1_id, None, None, None)
+        db_manager.adicionar_shido(confronto_id, atleta2_id, "Judô Negativo", "00:02:00")
+        db_manager.finalizar_confronto(confronto_id, atleta1_id, "00:04:00")
+        db_manager.deletar_confronto(confronto_descartavel)
+        if isinstance(novo_campeonato, int):
+            db_manager.deletar_competicao(novo_campeonato)
+        db_manager.contar_dependentes_atletas([atleta_descartavel])
+        db_manager.buscar_atletas(nome[:5])
+        db_manager.buscar_atletas(nome[:3], categoria="-73", clube=clube)
+        db_manager.buscar_competicoes("")
+        db_manager.buscar_competicoes("Compet")
+        db_manager.candidatos_duplicados(limite=10)
+        # Os dois atletas da mesma luta: a mesclagem criaria uma luta do atleta contra si mesmo
+        if not isinstance(db_manager.mesclar_atletas({duplicado: atleta_descartavel}), str):
+            falhas.append("mesclar_atletas aceitou mesclar os dois atletas de uma mesma luta.")
+        if isinstance(db_manager.mesclar_atletas({sem_luta_comum: atleta_descartavel}), str):
+            falhas.append("mesclar_atletas recusou mesclar atletas sem lutas em comum.")
+        db_manager.deletar_atleta(atleta_descartavel)
+    finally:
+        CursorExplain.capturando = False
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica se as consultas do DBManager usam índices.")
+    parser.add_argument("--dsn", default=os.environ.get("SCOUTJUDO_DSN_TESTE"),
+                        help="Banco Postgres descartável (padrão: variável SCOUTJUDO_DSN_TESTE)")
+    parser.add_argument("--minimo-linhas", type=int, default=1000,
+                        help="Tamanho mínimo de tabela em que um Seq Scan filtrado é considerado falha")
+    parser.add_argument("--sem-popular", action="store_true", help="Não insere dados sintéticos")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("Informe --dsn ou defina SCOUTJUDO_DSN_TESTE.")
+
+    db_manager = DBManager(PoolConexoes(maxconn=2, dsn=args.dsn, cursor_factory=CursorExplain))
+    try:
+        migracoes.aplicar_migracoes(db_manager)
+        divergencias = vocabulario.divergencias(db_manager)
+        with db_manager.pool.conexao() as conn:
+            if not args.sem_popular:
+                print("Dados inseridos:", dados_sinteticos.popular(conn))
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT relname, reltuples::bigint FROM pg_class
+                    WHERE relname IN ('atletas', 'campeonato', 'confrontos', 'acoes', 'shido');
+                """)
+                linhas_por_tabela = dict(cursor.fetchall())
+
+        falhas_comportamento = exercitar_db_manager(db_manager)
+    finally:
+        db_manager.close()
+
+    falhas = len(divergencias) + len(falhas_comportamento)
+    for mensagem in divergencias + falhas_comportamento:
+        print(f"FALHA  {mensagem}")
+    for sql, plano in CursorExplain.planos:
+        suspeitas = varreduras_suspeitas(plano, linhas_por_tabela, args.minimo_linhas)
+        resumo = " ".join(sql.split())[:100]
+        if suspeitas:
+            falhas += 1
+            print(f"FALHA  Seq Scan em {', '.join(suspeitas)}: {resumo}")
+        else:
+            print(f"OK     {resumo}")
+    print(f"{len(CursorExplain.planos)} comandos verificados, "
+          f"{falhas - len(divergencias) - len(falhas_comportamento)} com varredura sequencial, "
+          f"{len(divergencias)} divergência(s) de vocabulário, {len(falhas_comportamento)} falha(s) de comportamento.")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import functools
+import os
+import tempfile
+import time
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+import consultas_paralelas
+import exportacao
+from db_manager import ContagemGolpe, ContagemJanela, ContagemQuadrante, ContagemShido, DesempenhoAtleta, get_db_manager
+from geometria_tatame import QUADRANTES
+from utils import selecionar_atleta, selecionar_competicao
+
+db_manager = get_db_manager()
+
+categorias = ['-48', "-60", "-52", "-66", '-57', '-73', '-63', '-81', '-70', '-90', '-78', '-100', '+78', '+100']
+
+
+# Relatório montado apenas com agregados calculados no banco: nenhuma linha de ação é trazida para a página
+@st.cache_data(ttl=60, show_spinner="Calculando relatório...")
+def carregar_relatorio(atleta_id, campeonato_id, categoria, data_inicio, data_fim):
+    filtros = dict(atleta_id=atleta_id, campeonato_id=campeonato_id, categoria=categoria,
+                   data_inicio=data_inicio, data_fim=data_fim)
+    # As cinco agregações são independentes e rodam em paralelo
+    consultas = {
+        "golpes": (db_manager.contar_golpes, ContagemGolpe),
+        "quadrantes": (db_manager.contar_quadrantes, ContagemQuadrante),
+        "shidos": (db_manager.contar_shidos, ContagemShido),
+        "janelas": (db_manager.contar_acoes_por_janela, ContagemJanela),
+        "desempenho": (db_manager.desempenho_atletas, DesempenhoAtleta),
+    }
+    resultados = consultas_paralelas.reunir(
+        **{nome: functools.partial(metodo, **filtros) for nome, (metodo, _) in consultas.items()}
+    )
+    return {nome: pd.DataFrame(resultados[nome], columns=tipo._fields) for nome, (_, tipo) in consultas.items()}
+
+
+st.header("Vizualização Análise")
+
+# ----- Filtros do relatório -----
+col_atleta, col_competicao, col_categoria, col_periodo = st.columns(4)
+with col_atleta:
+    atleta_selecionado = selecionar_atleta(db_manager)
+with col_competicao:
+    competicao_selecionada = selecionar_competicao(db_manager)
+with col_categoria:
+    categoria = st.selectbox("Categoria", options=categorias, index=None)
+with col_periodo:
+    periodo = st.date_input("Período", value=())
+
+filtros = dict(
+    atleta_id=atleta_selecionado[0] if atleta_selecionado else None,
+    campeonato_id=competicao_selecionada[0] if competicao_selecionada else None,
+    categoria=categoria, data_inicio=periodo[0] if len(periodo) > 0 else None,
+    data_fim=periodo[1] if len(periodo) > 1 else None,
+)
+
+# ----- Exportação da seleção -----
+# Arquivos exportados ficam em disco até o download (ou até a próxima exportação da sessão); os de sessões
+# encerradas sem download são removidos na próxima exportação de qualquer sessão depois de VALIDADE_EXPORTACAO_S
+PASTA_EXPORTACOES = os.path.join(tempfile.gettempdir(), "scoutjudo_exportacoes")
+VALIDADE_EXPORTACAO_S = 3600
+
+
+def remover_exportacao():
+    """Remove o arquivo da exportação desta sessão, depois do download ou antes de uma nova exportação."""
+    caminho = st.session_state.pop("arquivo_exportacao", (None,))[0]
+    if caminho and os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def remover_exportacoes_antigas():
+    """Remove os arquivos exportados há mais de VALIDADE_EXPORTACAO_S segundos e nunca baixados."""
+    limite = time.time() - VALIDADE_EXPORTACAO_S
+    for entrada in os.scandir(PASTA_EXPORTACOES):
+        try:
+            if entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except FileNotFoundError:
+            pass
+
+
+with st.expander("Exportar dados da seleção"):
+    col_conjunto, col_formato, col_botao = st.columns([2, 2, 1], vertical_alignment="bottom")
+    with col_conjunto:
+        conjunto = st.selectbox("Dados", options=["acoes", "shido", "confrontos"],
+                                format_func={"acoes": "Ações", "shido": "Shidos", "confrontos": "Lutas"}.get)
+    with col_formato:
+        formato = st.selectbox("Formato", options=list(exportacao.FORMATOS),
+                               format_func={"parquet": "Parquet", "csv": "CSV (gzip)"}.get)
+    with col_botao:
+        gerar = st.button("Gerar arquivo", key="gerar_exportacao")
+    if gerar:
+        remover_exportacao()
+        os.makedirs(PASTA_EXPORTACOES, exist_ok=True)
+        remover_exportacoes_antigas()
+        # As linhas vão do cursor do banco direto para o arquivo temporário, bloco a bloco;
+        # a sessão guarda apenas o caminho, e o arquivo é lido do disco pelo botão de download
+        with st.spinner("Exportando..."), tempfile.NamedTemporaryFile(
+            dir=PASTA_EXPORTACOES, prefix=f"{conjunto}_", suffix=exportacao.FORMATOS[formato], delete=False
+        ) as arquivo:
+            total = exportacao.exportar(db_manager, conjunto, arquivo, formato, **filtros)
+        st.session_state["arquivo_exportacao"] = (arquivo.name, total)
+    if "arquivo_exportacao" in st.session_state:
+        caminho, total = st.session_state["arquivo_exportacao"]
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as arquivo:
+                st.download_button(f"Baixar {total} linhas", data=arquivo, file_name=os.path.basename(caminho),
+                                   on_click=remover_exportacao)
+        else:
+            # Removido por outra sessão por ter expirado
+            st.session_state.pop("arquivo_exportacao")
+
+relatorio = carregar_relatorio(**filtros)
+
+golpes = relatorio["golpes"]
+if golpes.empty:
+    st.write("Nenhuma ação encontrada para a seleção.")
+    st.stop()
+
+# ----- Golpes x efetividade -----
+total_geral = int(golpes.loc[golpes["grupo_golpe"].isna() & golpes["subtotal"], "total"].sum())
+st.caption(f"{total_geral} ações na seleção.")
+
+col_golpes, col_quadrantes = st.columns(2)
+with col_golpes:
+    st.subheader("Golpes x efetividade")
+    detalhe = golpes[~golpes["subtotal"]]
+    tabela_golpes = detalhe.pivot_table(index="grupo_golpe", columns="efetividade_golpe", values="total",
+                                        aggfunc="sum", fill_value=0)
+    # Subtotais por grupo vêm prontos do GROUPING SETS
+    tabela_golpes["Total"] = golpes[golpes["subtotal"] & golpes["grupo_golpe"].notna()].set_index("grupo_golpe")["total"]
+    st.dataframe(tabela_golpes)
+
+with col_quadrantes:
+    st.subheader("Mapa de calor do tatame")
+    quadrantes = relatorio["quadrantes"].dropna(subset=["quadrante"])
+    if not quadrantes.empty:
+        tabela_quadrantes = quadrantes.pivot_table(index="grupo_golpe", columns="quadrante", values="total",
+                                                   aggfunc="sum", fill_value=0)
+        st.plotly_chart(px.imshow(tabela_quadrantes, text_auto=True, aspect="auto"), use_container_width=True)
+        pontuadas = quadrantes.groupby("quadrante")[["total", "pontuadas"]].sum()
+        pontuadas["taxa_pontuacao"] = pontuadas["pontuadas"] / pontuadas["total"]
+        # Ações por quadrante na disposição do tatame (1 e 2 em cima, 3 e 4 embaixo)
+        st.plotly_chart(px.imshow(QUADRANTES.matriz(pontuadas["total"].to_dict()), text_auto=True,
+                                  x=["Esquerda", "Direita"], y=["Cima", "Baixo"]), use_container_width=True)
+        st.dataframe(pontuadas, column_config={
+            "taxa_pontuacao": st.column_config.ProgressColumn("Taxa de pontuação", format="percent"),
+        })
+
+# ----- Shidos e desempenho -----
+col_shidos, col_desempenho = st.columns(2)
+with col_shidos:
+    st.subheader("Shidos por tipo")
+    shidos = relatorio["shidos"]
+    if not shidos.empty:
+        st.bar_chart(shidos[shidos["subtotal"]].set_index("tipo")["total"])
+        with st.expander("Por tempo de luta"):
+            st.dataframe(shidos[~shidos["subtotal"]].drop(columns="subtotal"), hide_index=True)
+
+with col_desempenho:
+    st.subheader("Desempenho dos atletas")
+    st.dataframe(relatorio["desempenho"], hide_index=True, column_config={
+        "atleta_id": None,
+        "taxa_vitoria": st.column_config.ProgressColumn("Taxa de vitória", format="percent"),
+    })
+
+# ----- Ações ao longo da luta -----
+janelas = relatorio["janelas"]
+if not janelas.empty:
+    st.subheader("Ações a cada 30 segundos de luta")
+    st.bar_chart(janelas.set_index("inicio_s")[["total", "pontuadas"]], stack=False)
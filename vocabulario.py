@@ -0,0 +1,98 @@
+"""
+Vocabulário controlado da marcação: pegadas, grupos de golpe, efetividades, ne-waza e tipos de shido.
+
+Estas listas são a única definição das opções usadas pelas páginas, pelos geradores de dados e pelo banco,
+onde cada vocabulário é um tipo ENUM do Postgres (migração 0006): os valores ocupam 4 bytes por linha em
+vez do texto repetido, e variações com erro de digitação são recusadas na gravação. Ao acrescentar um valor,
+crie uma migração com `ALTER TYPE <tipo> ADD VALUE` e atualize a lista aqui; `divergencias` aponta diferenças
+entre as listas e o banco (inclusive nas efetividades pontuadas da função SQL efetividades_pontuadas).
+"""
+PEGADAS = (
+    "Uma Mão (Gola)", "Gola", "Gola Cruzada", "Gola Alta", "Patolada", "Patolada Cruzada", "Arm Drag",
+    "Uma Mão (Manga)", "Manga", "Manga Cruzada", "Cava", "Faixa",
+)
+GRUPOS_GOLPE = ("Te-Waza", "Ashi-Waza", "Koshi-Waza", "Sutemi-Waza", "Yoko-Sutemi-waza", "Kaeshi Waza")
+EFETIVIDADES_GOLPE = (
+    "Yuko", "Waza-Ari", "Ippon", "Golpe Falho", "Golpe Falso", "Irrelevante", "Sofreu contra-golpe",
+)
+DIRECOES_NEWAZA = ("DEF", "F", "DDF", "LE", "LD", "DET", "T", "DDT")
+PARTIDAS_NEWAZA = ("Cabeça", "Costas", "Lateral", "Meia-Guarda", "Guarda", "Oportunista")
+EFETIVIDADES_NEWAZA = ("Yuko", "Waza-Ari", "Ippon", "Nada", "Sofreu Contra-Ataque")
+TIPOS_SHIDO = (
+    "Golpe Falso", "Falta de Combatividade", "Desligar Kumi-Kata", "Kumi-Kata Irregular", "Pegar na Perna",
+    "Judô Negativo", "Passou a Cabeça", "Evitar Kumi-Kata",
+)
+
+# Efetividades que contam como pontuação (golpe ou passagem de ne-waza)
+EFETIVIDADES_PONTUADAS = ("Yuko", "Waza-Ari", "Ippon")
+
+# Tipo ENUM do Postgres de cada vocabulário
+TIPOS_ENUM = {
+    "pegada": PEGADAS,
+    "grupo_golpe": GRUPOS_GOLPE,
+    "efetividade_golpe": EFETIVIDADES_GOLPE,
+    "direcao_newaza": DIRECOES_NEWAZA,
+    "partida_newaza": PARTIDAS_NEWAZA,
+    "efetividade_newaza": EFETIVIDADES_NEWAZA,
+    "tipo_shido": TIPOS_SHIDO,
+}
+
+# Colunas (tabela, coluna) gravadas com cada tipo ENUM
+COLUNAS_ENUM = {
+    ("acoes", "mao_direita"): "pegada",
+    ("acoes", "mao_esquerda"): "pegada",
+    ("acoes", "grupo_golpe"): "grupo_golpe",
+    ("acoes", "efetividade_golpe"): "efetividade_golpe",
+    ("acoes", "direcao"): "direcao_newaza",
+    ("acoes", "partida"): "partida_newaza",
+    ("acoes", "efetividade_newaza"): "efetividade_newaza",
+    ("shido", "tipo"): "tipo_shido",
+}
+
+# Vocabulário de cada coluna, pelo nome da coluna nas consultas de análise
+VOCABULARIO_COLUNAS = {coluna: TIPOS_ENUM[tipo] for (_, coluna), tipo in COLUNAS_ENUM.items()}
+
+
+def sql_tipos():
+    """DDL (CREATE TYPE ... AS ENUM) dos vocabulários, na forma usada pela migração 0006."""
+    return "\n".join(
+        f"CREATE TYPE {tipo} AS ENUM ({', '.join(_literal(valor) for valor in valores)});"
+        for tipo, valores in TIPOS_ENUM.items()
+    )
+
+
+def _literal(valor):
+    return "'" + valor.replace("'", "''") + "'"
+
+
+def divergencias(db_manager):
+    """
+    Compara os vocabulários com os tipos ENUM do banco e EFETIVIDADES_PONTUADAS com a função
+    efetividades_pontuadas() usada pelos perfis materializados.
+    Retorna uma lista de mensagens (vazia se as listas e o banco coincidem, inclusive na ordem).
+    """
+    with db_manager.pool.conexao() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT t.typname, array_agg(e.enumlabel::text ORDER BY e.enumsortorder)
+            FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid
+            WHERE t.typname = ANY(%s)
+            GROUP BY t.typname;
+        """, (list(TIPOS_ENUM),))
+        no_banco = dict(cursor.fetchall())
+        cursor.execute("SELECT to_regproc('efetividades_pontuadas') IS NOT NULL;")
+        if cursor.fetchone()[0]:
+            cursor.execute("SELECT efetividades_pontuadas();")
+            pontuadas = cursor.fetchone()[0]
+        else:
+            pontuadas = None
+    mensagens = []
+    for tipo, valores in TIPOS_ENUM.items():
+        if tipo not in no_banco:
+            mensagens.append(f"Tipo {tipo} não existe no banco.")
+        elif tuple(no_banco[tipo]) != valores:
+            mensagens.append(f"Tipo {tipo} difere do vocabulário: banco {no_banco[tipo]}, código {list(valores)}.")
+    if pontuadas is None:
+        mensagens.append("Função efetividades_pontuadas não existe no banco.")
+    elif tuple(pontuadas) != EFETIVIDADES_PONTUADAS:
+        mensagens.append(f"Efetividades pontuadas diferem: banco {pontuadas}, código {list(EFETIVIDADES_PONTUADAS)}.")
+    return mensagens